@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+find_all_matches基准测试
+在密集重复图标的合成画面上对比逐像素Python循环实现与向量化峰值提取 + NMS实现
+
+运行方式（在项目根目录）:
+    python -m benchmarks.bench_find_all_matches
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from python.template_matching import TemplateMatchingEngine
+
+
+def make_icon_grid(width: int, height: int, icon_size: int, spacing: int, seed: int = 0):
+    """生成由重复图标组成的网格画面，返回 (画面, 图标, 图标左上角坐标列表)"""
+    rng = np.random.default_rng(seed)
+
+    icon = np.full((icon_size, icon_size, 3), 230, np.uint8)
+    cv2.circle(icon, (icon_size // 2, icon_size // 2), icon_size // 3, (40, 90, 200), -1)
+    cv2.rectangle(icon, (2, 2), (icon_size // 3, icon_size // 3), (20, 160, 40), -1)
+
+    frame = rng.integers(0, 60, (height, width, 3), dtype=np.uint8)
+    positions = []
+    for y in range(4, height - icon_size, spacing):
+        for x in range(4, width - icon_size, spacing):
+            frame[y : y + icon_size, x : x + icon_size] = icon
+            positions.append((x, y))
+
+    noise = rng.normal(0, 4, frame.shape)
+    frame = np.clip(frame.astype(np.float32) + noise, 0, 255).astype(np.uint8)
+    return frame, icon, positions
+
+
+def legacy_find_all(template, screenshot, method, threshold, max_matches):
+    """原实现：逐像素构造Python列表、排序并做O(n·k)重叠检查"""
+    result = cv2.matchTemplate(screenshot, template, method)
+    locations = np.where(result >= threshold)
+    template_h, template_w = template.shape[:2]
+
+    match_points = []
+    for pt in zip(*locations[::-1]):
+        match_points.append((pt, result[pt[1], pt[0]]))
+    match_points.sort(key=lambda x: x[1], reverse=True)
+
+    matches = []
+    for pt, confidence in match_points[: max_matches * 3]:
+        x, y = pt
+        overlap = False
+        for existing in matches:
+            if (
+                abs(x - existing["left"]) < template_w * 0.5
+                and abs(y - existing["top"]) < template_h * 0.5
+            ):
+                overlap = True
+                break
+        if not overlap:
+            matches.append({"left": int(x), "top": int(y), "confidence": float(confidence)})
+            if len(matches) >= max_matches:
+                break
+    return matches
+
+
+def recall(matches, positions, tolerance: int = 2) -> float:
+    """统计真实图标位置被找到的比例"""
+    if not positions:
+        return 0.0
+    found = {(m["left"], m["top"]) for m in matches}
+    hits = 0
+    for x, y in positions:
+        if any(
+            (x + dx, y + dy) in found
+            for dx in range(-tolerance, tolerance + 1)
+            for dy in range(-tolerance, tolerance + 1)
+        ):
+            hits += 1
+    return hits / len(positions)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="find_all_matches基准测试")
+    parser.add_argument("--threshold", type=float, default=0.5, help="匹配阈值")
+    parser.add_argument("--icon-size", type=int, default=24, help="图标边长")
+    parser.add_argument("--spacing", type=int, default=32, help="图标间距")
+    parser.add_argument(
+        "--skip-legacy", action="store_true", help="跳过原实现（4K下原实现需要数分钟）"
+    )
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+
+    engine = TemplateMatchingEngine()
+    config = engine.default_config.copy()
+    config.update({"threshold": args.threshold})
+    method = cv2.TM_CCOEFF_NORMED
+
+    print(f"{'分辨率':>10} {'图标数':>6} {'实现':>6} {'耗时(ms)':>9} {'匹配数':>6} {'召回率':>7}")
+
+    for width, height in [(1920, 1080), (3840, 2160)]:
+        frame, icon, positions = make_icon_grid(
+            width, height, args.icon_size, args.spacing
+        )
+        max_matches = len(positions) + 10
+
+        cases = [
+            ("原实现", lambda: legacy_find_all(icon, frame, method, args.threshold, max_matches)),
+            ("向量化", lambda: engine.find_all_matches_in_image(icon, frame, config, max_matches)),
+        ]
+        if args.skip_legacy:
+            cases = cases[1:]
+
+        for name, func in cases:
+            start = time.perf_counter()
+            matches = func()
+            elapsed = (time.perf_counter() - start) * 1000
+            print(f"{width}x{height:<5} {len(positions):>6} {name:>6} {elapsed:>9.1f} "
+                  f"{len(matches):>6} {recall(matches, positions):>7.3f}")
+
+
+if __name__ == "__main__":
+    main()
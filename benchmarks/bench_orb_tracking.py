@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+ORB跟踪模式基准测试
+在合成的移动目标序列上对比逐帧完整ORB匹配与光流跟踪模式的耗时和定位误差
+
+运行方式（在项目根目录）:
+    python -m benchmarks.bench_orb_tracking
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_template_pyramid import make_synthetic_frame
+from python.feature_matching import ORBFeatureMatchingEngine
+
+
+def make_textured_template(width: int, height: int, seed: int = 1) -> np.ndarray:
+    """生成纹理丰富的模板（色块 + 文字 + 线条），保证有足够的ORB特征点"""
+    rng = np.random.default_rng(seed)
+    template = np.full((height, width, 3), 230, dtype=np.uint8)
+
+    for _ in range(25):
+        x, y = int(rng.integers(0, width - 10)), int(rng.integers(0, height - 10))
+        w, h = int(rng.integers(8, 60)), int(rng.integers(8, 40))
+        color = tuple(int(c) for c in rng.integers(0, 255, 3))
+        cv2.rectangle(template, (x, y), (x + w, y + h), color, -1)
+
+    for _ in range(12):
+        p1 = tuple(int(v) for v in rng.integers(0, (width, height)))
+        p2 = tuple(int(v) for v in rng.integers(0, (width, height)))
+        cv2.line(template, p1, p2, (20, 20, 20), 2)
+
+    for i in range(4):
+        cv2.putText(template, f"BTN{int(rng.integers(0, 99))}", (10, 30 + i * 35),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 0), 2)
+
+    return template
+
+
+def make_sequence(background: np.ndarray, template: np.ndarray, frames: int):
+    """生成目标沿轨迹平移的帧序列，返回 (帧, 真实中心点) 列表"""
+    bh, bw = background.shape[:2]
+    th, tw = template.shape[:2]
+    sequence = []
+    for i in range(frames):
+        t = i / max(frames - 1, 1)
+        x = int(100 + t * (bw - tw - 200) + 20 * np.sin(i / 5))
+        y = int(80 + t * (bh - th - 160) + 15 * np.cos(i / 7))
+        frame = background.copy()
+        frame[y : y + th, x : x + tw] = template
+        sequence.append((frame, (x + tw / 2, y + th / 2)))
+    return sequence
+
+
+def run(engine: ORBFeatureMatchingEngine, template, sequence, config):
+    """逐帧运行匹配，返回每帧耗时（毫秒）、定位误差和跟踪帧数"""
+    timings, errors, tracked = [], [], 0
+    for frame, (cx, cy) in sequence:
+        start = time.perf_counter()
+        result = engine.match_features(template, frame, config)
+        timings.append((time.perf_counter() - start) * 1000)
+        if result is None or result["center_point"] is None:
+            errors.append(float("inf"))
+            continue
+        center = result["center_point"]
+        errors.append(float(np.hypot(center["x"] - cx, center["y"] - cy)))
+        tracked += int(result.get("tracked", False))
+    return np.array(timings), np.array(errors), tracked
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ORB跟踪模式基准测试")
+    parser.add_argument("--frames", type=int, default=120, help="序列帧数")
+    parser.add_argument("--width", type=int, default=1920, help="画面宽度")
+    parser.add_argument("--height", type=int, default=1080, help="画面高度")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+
+    background = make_synthetic_frame(args.width, args.height)
+    template = make_textured_template(260, 180)
+    sequence = make_sequence(background, template, args.frames)
+
+    engine = ORBFeatureMatchingEngine()
+    config = {"max_retries": 1}
+
+    print(f"{'模式':>6} {'平均(ms)':>9} {'p95(ms)':>8} {'中位误差(px)':>12} "
+          f"{'最大误差(px)':>12} {'失败帧':>6} {'跟踪帧':>6}")
+
+    for name, extra in [("完整", {"tracking": False}), ("跟踪", {"tracking": True})]:
+        engine.reset_tracking()
+        timings, errors, tracked = run(engine, template, sequence, {**config, **extra})
+        finite = errors[np.isfinite(errors)]
+        print(
+            f"{name:>6} {timings.mean():9.1f} {np.percentile(timings, 95):8.1f} "
+            f"{np.median(finite) if finite.size else float('nan'):12.2f} "
+            f"{finite.max() if finite.size else float('nan'):12.2f} "
+            f"{int((~np.isfinite(errors)).sum()):6d} {tracked:6d}"
+        )
+
+
+if __name__ == "__main__":
+    main()
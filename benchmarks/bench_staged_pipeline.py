@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+分级流水线基准测试
+在回放的移动目标序列上对比逐帧串行（截图 → 推理 → 后处理）与分级流水线
+（各阶段独立线程、有界队列）的持续帧率和端到端延迟 p50/p95/p99
+
+截图耗时用 --capture-ms 模拟：真实截图的大部分时间在等待系统/显卡返回画面，
+等待期间不占用CPU，分级流水线可以把它与上一帧的推理重叠
+
+运行方式（在项目根目录）:
+    python -m benchmarks.bench_staged_pipeline
+"""
+
+import argparse
+import itertools
+import logging
+import os
+import sys
+import tempfile
+import time
+
+import cv2
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_template_pyramid import make_synthetic_frame
+from benchmarks.bench_orb_tracking import make_textured_template, make_sequence
+from python.realtime_detection import create_realtime_pipeline
+from python.staged_pipeline import (
+    StagedPipeline,
+    build_realtime_stages,
+    format_stats,
+    run_sequential,
+)
+
+
+def make_replay_source(sequence, capture_ms: float):
+    """按顺序循环回放序列帧，每次截图额外等待 capture_ms 毫秒"""
+    frames = itertools.cycle([frame for frame, _ in sequence])
+
+    def capture():
+        if capture_ms > 0:
+            time.sleep(capture_ms / 1000)
+        return next(frames).copy()
+
+    return capture
+
+
+def main():
+    parser = argparse.ArgumentParser(description="分级流水线基准测试")
+    parser.add_argument("--algorithm", type=int, default=0, help="0: 模板, 1: ORB")
+    parser.add_argument("--frames", type=int, default=30, help="回放序列帧数")
+    parser.add_argument("--width", type=int, default=1280, help="画面宽度")
+    parser.add_argument("--height", type=int, default=720, help="画面高度")
+    parser.add_argument("--capture-ms", type=float, default=15.0, help="模拟的截图等待时间（毫秒）")
+    parser.add_argument("--duration", type=float, default=10.0, help="每种模式的运行时长（秒）")
+    parser.add_argument("--queue-size", type=int, default=1, help="阶段之间的队列长度")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+
+    background = make_synthetic_frame(args.width, args.height)
+    template = make_textured_template(260, 180)
+    sequence = make_sequence(background, template, args.frames)
+
+    template_path = os.path.join(tempfile.gettempdir(), "bench_staged_template.png")
+    cv2.imwrite(template_path, template)
+    area_rect = {"x": 0, "y": 0, "width": args.width, "height": args.height}
+
+    print(f"画面 {args.width}x{args.height}，模拟截图等待 {args.capture_ms:.0f}ms，"
+          f"每种模式运行 {args.duration:.0f}s\n")
+
+    for title in ["逐帧串行", "分级流水线"]:
+        pipeline = create_realtime_pipeline(args.algorithm, template_path)
+        source, stages = build_realtime_stages(
+            make_replay_source(sequence, args.capture_ms), pipeline, area_rect
+        )
+
+        if title == "逐帧串行":
+            stats = run_sequential(source, stages, duration=args.duration)
+        else:
+            staged = StagedPipeline(source, stages, queue_size=args.queue_size)
+            staged.start()
+            time.sleep(args.duration)
+            staged.stop()
+            stats = staged.get_stats()
+
+        print(format_stats(title, stats))
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+ORB模板库基准测试
+对比逐个模板ORB匹配与LSH模板库一次查询的耗时和召回率，以及模板库保存/加载的启动耗时
+
+运行方式（在项目根目录）:
+    python -m benchmarks.bench_template_library
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_orb_tracking import make_textured_template
+from benchmarks.bench_template_pyramid import make_synthetic_frame
+from python.feature_matching import ORBFeatureMatchingEngine, ORBTemplateLibrary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ORB模板库基准测试")
+    parser.add_argument("--templates", type=int, default=200, help="模板库大小")
+    parser.add_argument("--present", type=int, default=3, help="画面中出现的模板数量")
+    parser.add_argument("--frames", type=int, default=5, help="测试帧数")
+    parser.add_argument("--skip-linear", action="store_true", help="跳过逐个模板匹配")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+
+    engine = ORBFeatureMatchingEngine()
+    templates = [make_textured_template(200, 150, seed=i) for i in range(args.templates)]
+
+    start = time.perf_counter()
+    library = ORBTemplateLibrary(engine)
+    for i, template in enumerate(templates):
+        library.add_template(f"template_{i}", template)
+    library.build_index()
+    build_time = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "library.npz")
+        library.save(path)
+        start = time.perf_counter()
+        library = ORBTemplateLibrary.load(path, engine)
+        load_time = time.perf_counter() - start
+
+    print(f"模板库: {args.templates} 个模板, 从图像构建 {build_time:.2f}s, "
+          f"从磁盘加载 {load_time:.3f}s")
+
+    rng = np.random.default_rng(7)
+    linear_times, library_times = [], []
+    linear_hits = library_hits = total = 0
+
+    for frame_id in range(args.frames):
+        frame = make_synthetic_frame(1920, 1080, seed=frame_id)
+        present = rng.choice(args.templates, args.present, replace=False)
+        for slot, template_id in enumerate(present):
+            x, y = 100 + slot * 500, 200 + int(rng.integers(0, 600))
+            frame[y : y + 150, x : x + 200] = templates[template_id]
+        expected = {f"template_{i}" for i in present}
+        total += len(expected)
+
+        start = time.perf_counter()
+        results = library.query(frame, {"top_k": args.present + 2})
+        library_times.append((time.perf_counter() - start) * 1000)
+        library_hits += len(expected & {r["template_name"] for r in results})
+
+        if args.skip_linear:
+            continue
+
+        start = time.perf_counter()
+        found = set()
+        for i, template in enumerate(templates):
+            result = engine.match_features(template, frame, {"max_retries": 1})
+            if result and result["num_inliers"] >= 8 and result["inlier_ratio"] > 0.2:
+                found.add(f"template_{i}")
+        linear_times.append((time.perf_counter() - start) * 1000)
+        linear_hits += len(expected & found)
+
+    print(f"{'方式':>6} {'每帧(ms)':>10} {'召回率':>7}")
+    if linear_times:
+        print(f"{'逐个':>6} {np.mean(linear_times):10.1f} {linear_hits / total:7.2f}")
+    print(f"{'模板库':>6} {np.mean(library_times):10.1f} {library_hits / total:7.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+模板匹配金字塔搜索基准测试
+在合成的1080p/4K画面上对比全图穷举匹配与金字塔由粗到精匹配的准确性和耗时
+
+运行方式（在项目根目录）:
+    python -m benchmarks.bench_template_pyramid
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from python.template_matching import TemplateMatchingEngine
+
+
+def make_synthetic_frame(width: int, height: int, seed: int = 0) -> np.ndarray:
+    """生成类似桌面UI的合成画面：渐变背景 + 随机色块 + 文字 + 噪声"""
+    rng = np.random.default_rng(seed)
+
+    gradient = np.linspace(40, 200, width, dtype=np.float32)
+    frame = np.repeat(gradient[None, :, None], height, axis=0)
+    frame = np.repeat(frame, 3, axis=2).astype(np.uint8)
+
+    for _ in range(width * height // 20000):
+        x, y = int(rng.integers(0, width - 20)), int(rng.integers(0, height - 20))
+        w, h = int(rng.integers(10, 200)), int(rng.integers(10, 120))
+        color = tuple(int(c) for c in rng.integers(0, 255, 3))
+        cv2.rectangle(frame, (x, y), (x + w, y + h), color, -1)
+
+    for _ in range(width * height // 40000):
+        x, y = int(rng.integers(0, width - 100)), int(rng.integers(20, height))
+        color = tuple(int(c) for c in rng.integers(0, 255, 3))
+        cv2.putText(frame, f"item{int(rng.integers(0, 999))}", (x, y),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 1)
+
+    noise = rng.normal(0, 3, frame.shape)
+    return np.clip(frame.astype(np.float32) + noise, 0, 255).astype(np.uint8)
+
+
+def time_call(func, repeats: int):
+    """多次运行取中位数耗时（毫秒）和最后一次结果"""
+    timings = []
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return float(np.median(timings)), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="模板匹配金字塔搜索基准测试")
+    parser.add_argument("--repeats", type=int, default=5, help="每个用例重复次数")
+    parser.add_argument("--cases", type=int, default=5, help="每种分辨率的模板数量")
+    parser.add_argument("--method", default="TM_CCOEFF_NORMED", help="匹配方法")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+
+    engine = TemplateMatchingEngine()
+    method = engine.matching_methods[args.method]
+    config = engine.default_config.copy()
+    config.update({"method": args.method, "threshold": 0.5, "use_pyramid": True})
+
+    print(f"{'分辨率':>10} {'模板':>9} {'穷举(ms)':>10} {'金字塔(ms)':>11} "
+          f"{'加速比':>7} {'位置误差':>8} {'置信度差':>9}")
+
+    rng = np.random.default_rng(42)
+    for width, height in [(1920, 1080), (3840, 2160)]:
+        frame = make_synthetic_frame(width, height)
+        for case in range(args.cases):
+            tw, th = int(rng.integers(48, 160)), int(rng.integers(32, 120))
+            tx, ty = int(rng.integers(0, width - tw)), int(rng.integers(0, height - th))
+            template = frame[ty : ty + th, tx : tx + tw].copy()
+
+            exhaustive_ms, exhaustive = time_call(
+                lambda: engine._single_scale_match(template, frame, method, 0.5),
+                args.repeats,
+            )
+            pyramid_ms, pyramid = time_call(
+                lambda: engine._pyramid_match(template, frame, method, 0.5, config),
+                args.repeats,
+            )
+
+            if exhaustive and pyramid:
+                error = abs(pyramid["left"] - exhaustive["left"]) + abs(
+                    pyramid["top"] - exhaustive["top"]
+                )
+                conf_diff = exhaustive["confidence"] - pyramid["confidence"]
+                error_text, conf_text = f"{error:d}px", f"{conf_diff:.4f}"
+            else:
+                error_text, conf_text = "未命中", "-"
+
+            print(f"{width}x{height:<5} {tw:>4}x{th:<4} {exhaustive_ms:>10.1f} "
+                  f"{pyramid_ms:>11.1f} {exhaustive_ms / pyramid_ms:>6.1f}x "
+                  f"{error_text:>8} {conf_text:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+YOLO推理后端基准测试
+用同一个ONNX模型对比各推理后端在CPU上的单帧延迟（预处理 + 推理 + 解析 + NMS）
+
+运行方式（在项目根目录）:
+    python -m benchmarks.bench_yolo_backends --model yolov8n.onnx
+    python -m benchmarks.bench_yolo_backends --model yolov8n.onnx --image screenshot.png --threads 4
+"""
+
+import argparse
+import importlib.util
+import logging
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_template_pyramid import make_synthetic_frame
+from python.yolo_matching_pure import PureYOLOMatchingEngine
+
+# 后端名称 -> 运行所需的模块
+BACKEND_REQUIREMENTS = {
+    "pytorch": ["torch", "ultralytics"],
+    "onnxruntime": ["onnxruntime"],
+    "opencv_dnn": [],
+}
+
+
+def missing_modules(backend: str):
+    """后端缺少的依赖模块"""
+    return [
+        name for name in BACKEND_REQUIREMENTS[backend]
+        if importlib.util.find_spec(name) is None
+    ]
+
+
+def run(engine: PureYOLOMatchingEngine, image, config, runs: int, warmup: int):
+    """逐次运行检测，返回每次耗时（毫秒）和最后一次的检测数量"""
+    for _ in range(warmup):
+        engine.detect_objects_yolo(image, config)
+
+    timings, detections = [], []
+    for _ in range(runs):
+        start = time.perf_counter()
+        detections = engine.detect_objects_yolo(image, config)
+        timings.append((time.perf_counter() - start) * 1000)
+    return np.array(timings), len(detections)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="YOLO推理后端基准测试")
+    parser.add_argument("--model", required=True, help=".onnx模型路径")
+    parser.add_argument("--image", default="", help="测试图片（默认使用合成画面）")
+    parser.add_argument("--width", type=int, default=1920, help="合成画面宽度")
+    parser.add_argument("--height", type=int, default=1080, help="合成画面高度")
+    parser.add_argument("--input-size", type=int, default=640, help="动态输入模型使用的输入尺寸")
+    parser.add_argument("--threads", type=int, default=0, help="ONNX Runtime算子内线程数，0表示自动")
+    parser.add_argument("--runs", type=int, default=50, help="计时次数")
+    parser.add_argument("--warmup", type=int, default=5, help="预热次数")
+    parser.add_argument("--backends", default=",".join(BACKEND_REQUIREMENTS),
+                        help="参与对比的后端，逗号分隔")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+
+    if args.image:
+        image = cv2.imread(args.image, cv2.IMREAD_COLOR)
+        if image is None:
+            parser.error(f"无法读取图片: {args.image}")
+    else:
+        image = make_synthetic_frame(args.width, args.height)
+
+    engine = PureYOLOMatchingEngine()
+    engine.set_device("cpu")
+    base_config = {
+        "model_path": args.model,
+        "confidence_threshold": 0.25,
+        "nms_threshold": 0.45,
+        "input_size": (args.input_size, args.input_size),
+        "ort_intra_op_threads": args.threads,
+    }
+
+    print(f"模型: {args.model}，画面: {image.shape[1]}x{image.shape[0]}，计时 {args.runs} 次\n")
+    print(f"{'后端':>12} {'平均(ms)':>9} {'p50(ms)':>8} {'p95(ms)':>8} {'FPS':>6} {'目标数':>6}")
+
+    for backend in args.backends.split(","):
+        backend = backend.strip()
+        if backend not in BACKEND_REQUIREMENTS:
+            print(f"{backend:>12} 未知后端")
+            continue
+        missing = missing_modules(backend)
+        if missing:
+            print(f"{backend:>12} 跳过（未安装 {', '.join(missing)}）")
+            continue
+
+        config = {**base_config, "backend": backend}
+        timings, count = run(engine, image, config, args.runs, args.warmup)
+        print(
+            f"{backend:>12} {timings.mean():9.1f} {np.percentile(timings, 50):8.1f} "
+            f"{np.percentile(timings, 95):8.1f} {1000 / timings.mean():6.1f} {count:6d}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+YOLO多区域批量检测基准测试
+同时监控多个屏幕区域时，对比逐区域调用 detect_objects_array（每个区域一次前向推理）
+与 detect_batch_array（多个区域letterbox到同一个批次，一次前向推理）在CPU上的吞吐量
+
+批量推理需要动态批大小的ONNX模型（导出时 dynamic=True）；
+静态批大小为1的模型会逐张推理，两种方式的结果应当接近。
+CPU上批量推理的收益来自更少的调用开销和更充分的多核并行，单核机器上可能没有加速
+
+运行方式（在项目根目录）:
+    python -m benchmarks.bench_yolo_batch --model yolov8n_dynamic.onnx
+    python -m benchmarks.bench_yolo_batch --model yolov8n_dynamic.onnx --backend opencv_dnn --batch-sizes 1,4,16
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_template_pyramid import make_synthetic_frame
+from python.yolo_matching_pure import PureYOLOMatchingEngine
+
+
+def make_regions(frame: np.ndarray, count: int, width: int, height: int):
+    """从画面中按网格裁剪出 count 个监控区域，返回区域图像和左上角坐标"""
+    frame_height, frame_width = frame.shape[:2]
+    columns = max(1, (frame_width - width) // max(1, width // 2) + 1)
+    regions, origins = [], []
+    for i in range(count):
+        x = min((i % columns) * (width // 2), frame_width - width)
+        y = min((i // columns) * (height // 2) % max(1, frame_height - height + 1), frame_height - height)
+        regions.append(frame[y : y + height, x : x + width])
+        origins.append((x, y))
+    return regions, origins
+
+
+def timed(function, runs: int):
+    """预热一次后计时，返回每次耗时（毫秒）"""
+    function()
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - start) * 1000)
+    return np.array(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="YOLO多区域批量检测基准测试")
+    parser.add_argument("--model", required=True, help="YOLO模型路径（.onnx / .pt）")
+    parser.add_argument("--image", default="", help="测试图片（默认使用合成画面）")
+    parser.add_argument("--backend", default="auto", help="推理后端 pytorch / onnxruntime / opencv_dnn / auto")
+    parser.add_argument("--region-width", type=int, default=480, help="监控区域宽度")
+    parser.add_argument("--region-height", type=int, default=360, help="监控区域高度")
+    parser.add_argument("--batch-sizes", default="1,2,4,8,12,16", help="区域数（批大小），逗号分隔")
+    parser.add_argument("--threads", type=int, default=0, help="ONNX Runtime算子内线程数，0表示自动")
+    parser.add_argument("--runs", type=int, default=10, help="计时次数")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+
+    if args.image:
+        frame = cv2.imread(args.image, cv2.IMREAD_COLOR)
+        if frame is None:
+            parser.error(f"无法读取图片: {args.image}")
+    else:
+        frame = make_synthetic_frame(1920, 1080)
+
+    engine = PureYOLOMatchingEngine()
+    engine.set_device("cpu")
+    batch_sizes = [int(v) for v in args.batch_sizes.split(",")]
+    config = {
+        "model_path": args.model,
+        "backend": args.backend,
+        "confidence_threshold": 0.25,
+        "nms_threshold": 0.45,
+        "ort_intra_op_threads": args.threads,
+        "max_batch_size": max(batch_sizes),
+    }
+
+    print(
+        f"模型: {args.model}，区域 {args.region_width}x{args.region_height}，"
+        f"后端: {engine.resolve_backend(args.backend, args.model)}，计时 {args.runs} 次\n"
+    )
+    print(
+        f"{'区域数':>6} {'逐区域(ms)':>11} {'批量(ms)':>9} "
+        f"{'逐区域 区域/s':>13} {'批量 区域/s':>11} {'加速':>6} {'目标数一致':>10}"
+    )
+
+    for count in batch_sizes:
+        regions, origins = make_regions(frame, count, args.region_width, args.region_height)
+
+        sequential = timed(
+            lambda: [engine.detect_objects_array(region, config) for region in regions], args.runs
+        )
+        batched = timed(lambda: engine.detect_batch_array(regions, config, origins), args.runs)
+
+        sequential_counts = [len(engine.detect_objects_array(region, config)) for region in regions]
+        batched_counts = [len(detections) for detections in engine.detect_batch_array(regions, config)]
+
+        print(
+            f"{count:6d} {sequential.mean():11.1f} {batched.mean():9.1f} "
+            f"{count * 1000 / sequential.mean():13.1f} {count * 1000 / batched.mean():11.1f} "
+            f"{sequential.mean() / batched.mean():5.2f}x {'是' if sequential_counts == batched_counts else '否':>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
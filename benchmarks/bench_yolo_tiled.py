@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+YOLO切片推理基准测试
+在大画面上对比不同输入尺寸的整帧单次推理与切片推理的延迟和召回率
+
+召回率的参考标注：
+- 提供 --labels（YOLO格式txt：class cx cy w h，坐标为0-1相对值）时使用标注
+- 否则以"小切片 + 整帧"组合的检测结果作为伪标注（只用于横向比较）
+
+运行方式（在项目根目录）:
+    python -m benchmarks.bench_yolo_tiled --model yolov8n.onnx --image screen_4k.png
+    python -m benchmarks.bench_yolo_tiled --model yolov8n.onnx --image screen_4k.png --labels screen_4k.txt
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_template_pyramid import make_synthetic_frame
+from python.yolo_matching_pure import PureYOLOMatchingEngine
+
+
+def load_labels(path: str, width: int, height: int) -> np.ndarray:
+    """读取YOLO格式标注，返回 (N, 5) class, x1, y1, x2, y2（像素）"""
+    rows = np.loadtxt(path, ndmin=2)
+    cx, cy = rows[:, 1] * width, rows[:, 2] * height
+    w, h = rows[:, 3] * width, rows[:, 4] * height
+    return np.stack([rows[:, 0], cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], axis=1)
+
+
+def to_boxes(detections: np.ndarray) -> np.ndarray:
+    """检测结果结构化数组转换为 (N, 5) class, x1, y1, x2, y2"""
+    return np.stack(
+        [
+            detections["class_id"].astype(np.float64),
+            detections["x"],
+            detections["y"],
+            detections["x"] + detections["width"],
+            detections["y"] + detections["height"],
+        ],
+        axis=1,
+    )
+
+
+def recall(reference: np.ndarray, boxes: np.ndarray, iou_threshold: float = 0.5) -> float:
+    """同类别IoU超过阈值即视为召回"""
+    if len(reference) == 0:
+        return float("nan")
+    if len(boxes) == 0:
+        return 0.0
+
+    ref, det = reference[:, None, 1:], boxes[None, :, 1:]
+    width = (np.minimum(ref[..., 2], det[..., 2]) - np.maximum(ref[..., 0], det[..., 0])).clip(0)
+    height = (np.minimum(ref[..., 3], det[..., 3]) - np.maximum(ref[..., 1], det[..., 1])).clip(0)
+    intersection = width * height
+    area_ref = (ref[..., 2] - ref[..., 0]) * (ref[..., 3] - ref[..., 1])
+    area_det = (det[..., 2] - det[..., 0]) * (det[..., 3] - det[..., 1])
+    iou = intersection / (area_ref + area_det - intersection + 1e-7)
+    iou[reference[:, 0][:, None] != boxes[:, 0][None, :]] = 0
+    return float((iou.max(axis=1) >= iou_threshold).mean())
+
+
+def run(engine: PureYOLOMatchingEngine, image, config, runs: int):
+    """预热一次后计时，返回每次耗时（毫秒）和最后一次的检测结果"""
+    detections = engine.detect_objects_array(image, config)
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        detections = engine.detect_objects_array(image, config)
+        timings.append((time.perf_counter() - start) * 1000)
+    return np.array(timings), detections
+
+
+def main():
+    parser = argparse.ArgumentParser(description="YOLO切片推理基准测试")
+    parser.add_argument("--model", required=True, help="YOLO模型路径（.onnx / .pt）")
+    parser.add_argument("--image", default="", help="测试图片（默认使用4K合成画面）")
+    parser.add_argument("--labels", default="", help="YOLO格式标注文件（可选）")
+    parser.add_argument("--backend", default="auto", help="推理后端 pytorch / onnxruntime / opencv_dnn / auto")
+    parser.add_argument("--input-sizes", default="640,960,1280",
+                        help="整帧单次推理的输入尺寸（需要动态输入的模型），逗号分隔")
+    parser.add_argument("--tile-size", type=int, default=640, help="切片边长")
+    parser.add_argument("--overlap", type=float, default=0.2, help="切片重叠比例")
+    parser.add_argument("--batch-sizes", default="1,4,8", help="切片推理的批大小，逗号分隔")
+    parser.add_argument("--runs", type=int, default=5, help="计时次数")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+
+    if args.image:
+        image = cv2.imread(args.image, cv2.IMREAD_COLOR)
+        if image is None:
+            parser.error(f"无法读取图片: {args.image}")
+    else:
+        image = make_synthetic_frame(3840, 2160)
+    height, width = image.shape[:2]
+
+    engine = PureYOLOMatchingEngine()
+    base_config = {
+        "model_path": args.model,
+        "backend": args.backend,
+        "confidence_threshold": 0.25,
+        "nms_threshold": 0.45,
+    }
+    tile_config = {
+        **base_config,
+        "tiled_inference": True,
+        "tile_size": args.tile_size,
+        "tile_overlap": args.overlap,
+    }
+
+    if args.labels:
+        reference = load_labels(args.labels, width, height)
+        reference_name = "标注"
+    else:
+        # 伪标注：半尺寸切片 + 整帧，尽量找全所有目标
+        _, detections = run(
+            engine, image, {**tile_config, "tile_size": max(160, args.tile_size // 2)}, 0
+        )
+        reference = to_boxes(detections)
+        reference_name = "伪标注（半尺寸切片 + 整帧）"
+
+    print(f"模型: {args.model}，画面: {width}x{height}，参考: {reference_name} {len(reference)} 个目标\n")
+    print(f"{'模式':>24} {'平均(ms)':>9} {'p95(ms)':>8} {'目标数':>6} {'召回率':>7}")
+
+    def report(name, timings, detections):
+        print(
+            f"{name:>24} {timings.mean():9.1f} {np.percentile(timings, 95):8.1f} "
+            f"{len(detections):6d} {recall(reference, to_boxes(detections)):7.1%}"
+        )
+
+    for size in [int(v) for v in args.input_sizes.split(",")]:
+        config = {**base_config, "input_size": (size, size)}
+        timings, detections = run(engine, image, config, args.runs)
+        report(f"整帧 {size}", timings, detections)
+
+    for batch_size in [int(v) for v in args.batch_sizes.split(",")]:
+        config = {**tile_config, "tile_batch_size": batch_size}
+        timings, detections = run(engine, image, config, args.runs)
+        report(f"切片 {args.tile_size} 批{batch_size}", timings, detections)
+
+    config = {**tile_config, "tile_include_full_frame": False}
+    timings, detections = run(engine, image, config, args.runs)
+    report(f"切片 {args.tile_size} 无整帧", timings, detections)
+
+
+if __name__ == "__main__":
+    main()
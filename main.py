@@ -2,22 +2,29 @@ import ctypes
 import sys
 import os
 import json
+import threading
+import time
+from collections import deque
 import numpy as np
 import logging
 
 
 from PySide6.QtGui import QGuiApplication, QIcon
 from PySide6.QtQml import QmlElement, QQmlApplicationEngine
-from PySide6.QtCore import QObject, Signal, Slot, Property, QUrl, Qt
+from PySide6.QtCore import (
+    QObject, QRunnable, QThreadPool, QTimer, Signal, Slot, Property, QUrl, Qt
+)
 from PySide6.QtWidgets import QApplication, QMenu, QSystemTrayIcon
 from PySide6.QtGui import QAction
 print("策略：", QGuiApplication.highDpiScaleFactorRoundingPolicy())
 
 from python.template_matching import template_matcher
 from python.feature_matching import orb_matcher
-from python.screen_capture import screen_capture
+from python.screen_capture import screen_capture, capture_service
+from python.live_image_provider import LiveImageProvider
 from python.yolo_orb_matching import yolo_orb_matcher
-from python.yolo_matching_pure import pure_yolo_matcher
+from python.yolo_matching_pure import pure_yolo_matcher, detections_to_dicts
+from python.realtime_detection import create_realtime_pipeline, to_display_detections
 
 QML_IMPORT_NAME = "ImageMatcher"
 
@@ -26,6 +33,294 @@ logger = logging.getLogger(__name__)
 QML_IMPORT_MAJOR_VERSION = 1
 
 
+class MatchJob(QRunnable):
+    """
+    可取消的匹配任务
+    任务函数以 fn(job) 的形式调用，通过 job.cancel_event 把取消传递给匹配引擎，
+    在输出结果前检查 job.cancelled，并可通过 job.report_progress 报告进度
+    """
+
+    def __init__(self, executor, job_id, view, fn, previous=None):
+        super().__init__()
+        self.executor = executor
+        self.job_id = job_id
+        self.view = view
+        self.fn = fn
+        self.cancel_event = threading.Event()
+        self.done_event = threading.Event()
+        self._previous = previous
+
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def report_progress(self, percent, message=""):
+        """报告任务进度（已取消的任务不再报告）"""
+        if not self.cancelled:
+            self.executor.jobProgress.emit(self.view, self.job_id, int(percent), message)
+
+    def run(self):
+        executor = self.executor
+        outcome = (executor.jobCancelled, (self.view, self.job_id))
+        try:
+            # 同一视图的任务串行执行：先等被取代的旧任务退出，避免两个任务同时使用同一个引擎
+            if self._previous is not None:
+                self._previous.done_event.wait()
+                self._previous = None
+
+            if not self.cancelled:
+                executor.jobStarted.emit(self.view, self.job_id)
+                start_time = time.perf_counter()
+                self.fn(self)
+                elapsed_ms = (time.perf_counter() - start_time) * 1000
+                if not self.cancelled:
+                    outcome = (executor.jobFinished, (self.view, self.job_id, elapsed_ms))
+
+        except Exception as e:
+            logger.error(f"匹配任务 {self.job_id} 执行失败: {e}")
+            outcome = (executor.jobFailed, (self.view, self.job_id, str(e)))
+
+        finally:
+            # 先登记完成再发结果信号，接收方查询 is_busy 时状态已经更新
+            self.done_event.set()
+            executor._job_done(self)
+
+        signal, args = outcome
+        signal.emit(*args)
+
+
+class MatchJobExecutor(QObject):
+    """
+    匹配任务执行器
+    在QThreadPool中运行匹配任务，使界面线程保持响应；
+    同一视图提交新任务时取消该视图的旧任务（新请求取代旧请求）
+    """
+
+    jobStarted = Signal(str, int)  # 任务开始 (view, job_id)
+    jobProgress = Signal(str, int, int, str)  # 任务进度 (view, job_id, percent, message)
+    jobFinished = Signal(str, int, float)  # 任务完成 (view, job_id, elapsed_ms)
+    jobCancelled = Signal(str, int)  # 任务被取消或被取代 (view, job_id)
+    jobFailed = Signal(str, int, str)  # 任务异常 (view, job_id, error)
+
+    def __init__(self, max_threads=2, parent=None):
+        super().__init__(parent)
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(max_threads)
+        self._lock = threading.Lock()
+        self._jobs = {}  # view -> 该视图最新的任务
+        self._pending = 0  # 已提交但尚未结束的任务数（含已取消但仍在退出的任务）
+        self._next_job_id = 0
+
+    def submit(self, view, fn):
+        """
+        提交任务，取消同一视图尚未完成的旧任务
+
+        Args:
+            view: 视图名称，同一视图同时只保留最新的任务
+            fn: 任务函数 fn(job)
+
+        Returns:
+            任务编号
+        """
+        with self._lock:
+            self._next_job_id += 1
+            previous = self._jobs.get(view)
+            if previous is not None:
+                previous.cancel()
+            job = MatchJob(self, self._next_job_id, view, fn, previous)
+            self._jobs[view] = job
+            self._pending += 1
+
+        self._pool.start(job)
+        return job.job_id
+
+    def cancel(self, view=None):
+        """取消指定视图（None表示全部）正在执行或排队的任务"""
+        with self._lock:
+            jobs = list(self._jobs.values()) if view is None else [self._jobs.get(view)]
+        for job in jobs:
+            if job is not None:
+                job.cancel()
+
+    def is_busy(self, view=None):
+        """指定视图（None表示任意视图）是否有未完成的任务"""
+        with self._lock:
+            if view is None:
+                return bool(self._jobs)
+            return view in self._jobs
+
+    def pending_count(self):
+        """已提交但尚未结束的任务数"""
+        with self._lock:
+            return self._pending
+
+    def shutdown(self, timeout_ms=3000):
+        """取消全部任务并等待线程池退出"""
+        self.cancel()
+        return self._pool.waitForDone(timeout_ms)
+
+    def _job_done(self, job):
+        with self._lock:
+            self._pending -= 1
+            if self._jobs.get(job.view) is job:
+                del self._jobs[job.view]
+
+
+class RealtimeScheduler(QObject):
+    """
+    自适应实时检测调度器
+    按实测的端到端延迟（截图 + 推理 + 发送结果）调整触发间隔：
+    间隔取 目标帧间隔 与 平均延迟 / CPU预算 中的较大者；
+    上一次检测尚未完成时到来的触发直接丢弃，同一区域不会并发推理
+    """
+
+    statsUpdated = Signal(dict)  # 调度统计更新（每完成一次检测）
+    failed = Signal(str)  # 检测任务异常 (error)
+
+    VIEW = "realtime"
+
+    def __init__(self, target_fps=2.0, cpu_budget=0.8, parent=None):
+        super().__init__(parent)
+        self._executor = MatchJobExecutor(max_threads=1, parent=self)
+        self._executor.jobFinished.connect(self._onJobFinished)
+        self._executor.jobCancelled.connect(self._onJobCancelled)
+        self._executor.jobFailed.connect(self._onJobFailed)
+
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self._tick)
+
+        self._task = None
+        self.target_fps = target_fps
+        self.cpu_budget = cpu_budget
+        self._tick_times = {}  # job_id -> 触发时间
+        self._completions = deque(maxlen=30)  # 最近完成时间，用于计算实际FPS
+        self._latency_ema = 0.0
+        self._inference_ema = 0.0
+        self.stats = {}
+        self._reset_stats()
+
+    def _reset_stats(self):
+        self._tick_times.clear()
+        self._completions.clear()
+        self._latency_ema = 0.0
+        self._inference_ema = 0.0
+        self.stats = {
+            "fps": 0.0,  # 实际完成帧率
+            "latency_ms": 0.0,  # 端到端延迟（平滑）
+            "inference_ms": 0.0,  # 后台任务耗时（平滑）
+            "interval_ms": self._target_interval_ms(),  # 当前触发间隔
+            "target_fps": self.target_fps,
+            "ticks": 0,  # 触发次数
+            "completed": 0,  # 完成的检测次数
+            "dropped_ticks": 0,  # 上一次检测未完成而丢弃的触发次数
+            "queue_depth": 0,  # 已提交未完成的检测数
+        }
+
+    def _target_interval_ms(self):
+        return 1000.0 / max(self.target_fps, 0.1)
+
+    def is_running(self):
+        return self._task is not None
+
+    def start(self, task):
+        """
+        开始调度
+
+        Args:
+            task: 检测任务函数 task(job)，在后台线程执行
+        """
+        self.stop()
+        self._task = task
+        self._reset_stats()
+        self._timer.start(int(self._target_interval_ms()))
+        self._tick()
+
+    def stop(self):
+        """停止调度并取消正在执行的检测"""
+        self._timer.stop()
+        self._task = None
+        self._executor.cancel()
+
+    def shutdown(self):
+        self.stop()
+        self._executor.shutdown()
+
+    def set_target_fps(self, fps):
+        """设置目标帧率（实际间隔仍受CPU预算限制）"""
+        self.target_fps = max(0.1, float(fps))
+        self.stats["target_fps"] = self.target_fps
+        self._adapt_interval()
+
+    def set_cpu_budget(self, budget):
+        """设置CPU预算：检测耗时占墙钟时间的最大比例 (0, 1]"""
+        self.cpu_budget = min(1.0, max(0.05, float(budget)))
+        self._adapt_interval()
+
+    def _tick(self):
+        if self._task is None:
+            return
+
+        self.stats["ticks"] += 1
+        queue_depth = self._executor.pending_count()
+        if queue_depth > 0:
+            # 上一次检测还在进行，丢弃本次触发而不是排队
+            self.stats["dropped_ticks"] += 1
+            self.stats["queue_depth"] = queue_depth
+            return
+
+        job_id = self._executor.submit(self.VIEW, self._task)
+        self._tick_times[job_id] = time.perf_counter()
+        self.stats["queue_depth"] = self._executor.pending_count()
+
+    def _adapt_interval(self):
+        """按平滑后的端到端延迟和CPU预算调整触发间隔"""
+        interval_ms = max(self._target_interval_ms(), self._latency_ema / self.cpu_budget)
+        self.stats["interval_ms"] = interval_ms
+        # 变化超过10%才重设定时器，避免频繁重启
+        if self._timer.isActive() and abs(interval_ms - self._timer.interval()) > 0.1 * self._timer.interval():
+            self._timer.setInterval(int(interval_ms))
+
+    @Slot(str, int, float)
+    def _onJobFinished(self, view, job_id, elapsed_ms):
+        tick_time = self._tick_times.pop(job_id, None)
+        if tick_time is None or self._task is None:
+            return
+
+        now = time.perf_counter()
+        latency_ms = (now - tick_time) * 1000
+        alpha = 0.3
+        if self.stats["completed"] == 0:
+            self._latency_ema, self._inference_ema = latency_ms, elapsed_ms
+        else:
+            self._latency_ema += alpha * (latency_ms - self._latency_ema)
+            self._inference_ema += alpha * (elapsed_ms - self._inference_ema)
+
+        self._completions.append(now)
+        if len(self._completions) >= 2:
+            span = self._completions[-1] - self._completions[0]
+            self.stats["fps"] = (len(self._completions) - 1) / span if span > 0 else 0.0
+
+        self.stats["completed"] += 1
+        self.stats["latency_ms"] = self._latency_ema
+        self.stats["inference_ms"] = self._inference_ema
+        self.stats["queue_depth"] = self._executor.pending_count()
+        self._adapt_interval()
+        self.statsUpdated.emit(dict(self.stats))
+
+    @Slot(str, int)
+    def _onJobCancelled(self, view, job_id):
+        self._tick_times.pop(job_id, None)
+
+    @Slot(str, int, str)
+    def _onJobFailed(self, view, job_id, error):
+        self._tick_times.pop(job_id, None)
+        if self._task is not None:
+            self.failed.emit(error)
+
+
 @QmlElement
 class ImageMatcherController(QObject):
     # 信号定义
@@ -36,7 +331,7 @@ class ImageMatcherController(QObject):
     needleImage = Signal(str)  # 第一张图片选择信号
     haystackImage = Signal(str)  # 第二张图片选择信号
     windowSelected = Signal(str)  # 屏幕窗口选择信号
-    screenAreaImageChanged = Signal(str)  # 屏幕区域图片变更信号
+    screenAreaImageChanged = Signal(str)  # 屏幕区域图片变更信号 (image_url)
     logAdded = Signal(str, str)  # 日志添加信号 (message, type)
     showMatchResult = Signal(str, str)  # 显示匹配结果信号 (image_path, title)
     showScreenMatchOverlay = Signal(
@@ -45,11 +340,21 @@ class ImageMatcherController(QObject):
     showMultipleDetections = Signal(str)  # 显示多个检测结果 (detections_json)
     realtimeDetectionStateChanged = Signal(bool)  # 实时检测状态变化 (active)
     clearAllDetections = Signal()  # 清除所有检测结果
-    performanceInfoUpdated = Signal(float, float, str)  # 性能信息更新 (fps, latency_ms, device)
+    performanceInfoUpdated = Signal(
+        float, float, str, str
+    )  # 性能信息更新 (fps, latency_ms, device, stats_json)
     showControlWindowSignal = Signal()  # 显示控制窗口信号
     hideControlWindowSignal = Signal()  # 隐藏控制窗口信号
     showDisplayWindowSignal = Signal()  # 显示显示窗口信号
     hideDisplayWindowSignal = Signal()  # 隐藏显示窗口信号
+    matchingBusyChanged = Signal(bool)  # 匹配任务执行状态变化 (busy)
+    matchingProgress = Signal(int, str)  # 匹配任务进度 (percent, message)
+
+    # 匹配任务所属的视图，同一视图的新请求会取代旧请求
+    MATCH_VIEW = "match"
+
+    # 屏幕区域实时画面在图像提供器中的名称
+    SCREEN_AREA_IMAGE = "screen_area"
 
     def __init__(self):
         super().__init__()
@@ -59,13 +364,27 @@ class ImageMatcherController(QObject):
         self._image2_path = ""
         self._selected_window = ""
         self._selected_window_rect = {"x": 0, "y": 0, "width": 0, "height": 0}
-        self._screen_area_image_path = ""  # 屏幕区域截图路径
+        self._screen_area_image_url = ""  # 屏幕区域实时画面地址 (image://live/...)
+        self.live_image_provider = LiveImageProvider()  # 内存中的实时画面，由QML引擎注册
         self._area_capture_timer = None  # 区域截取定时器
+        self._area_frame_id = 0  # 区域显示最近使用的捕获帧编号
+
+        # 匹配任务在后台线程执行，界面线程只负责校验参数和提交任务
+        self._job_executor = MatchJobExecutor(parent=self)
+        self._job_executor.jobProgress.connect(self._onMatchJobProgress)
+        self._job_executor.jobFinished.connect(self._onMatchJobFinished)
+        self._job_executor.jobCancelled.connect(self._onMatchJobCancelled)
+        self._job_executor.jobFailed.connect(self._onMatchJobFailed)
         
         # 实时检测相关
         self._realtime_detection_active = False
-        self._realtime_timer = None
-        self._realtime_interval = 500  # 毫秒，检测间隔
+        self._realtime_interval = 500  # 毫秒，最小检测间隔（目标帧率 = 1000 / 间隔）
+        self._realtime_scheduler = RealtimeScheduler(
+            target_fps=1000.0 / self._realtime_interval, parent=self
+        )
+        self._realtime_scheduler.statsUpdated.connect(self._onRealtimeStats)
+        self._realtime_pipeline = None  # 当前算法的实时检测流水线（保留模板缓存和位置先验）
+        self._realtime_scheduler.failed.connect(self._onRealtimeFailed)
         
         # 动态颜色映射
         self._class_colors = {}  # 类别ID到颜色的映射
@@ -94,6 +413,7 @@ class ImageMatcherController(QObject):
                 "max_retries": 3,
                 "use_ratio_test": False,
                 "use_cross_check": False,
+                "tracking": False,
             },
             2: {  # YOLO+ORB混合
                 "yolo_confidence": 0.5,
@@ -105,6 +425,8 @@ class ImageMatcherController(QObject):
                 "confidence_threshold": 0.5,
                 "nms_threshold": 0.4,
                 "model_path": "",
+                "backend": "pytorch",  # 推理后端: pytorch, onnxruntime, opencv_dnn, auto
+                "skip_unchanged_frames": True,  # 画面未变化时复用上一次的检测结果
             },
         }
 
@@ -158,8 +480,8 @@ class ImageMatcherController(QObject):
         return self._current_device
 
     @Property(str, notify=screenAreaImageChanged)
-    def screenAreaImagePath(self):
-        return self._screen_area_image_path
+    def screenAreaImageUrl(self):
+        return self._screen_area_image_url
 
     @Slot(int)
     def switchMode(self, mode):
@@ -168,7 +490,9 @@ class ImageMatcherController(QObject):
         if mode == 0 and self._area_capture_timer:
             self._area_capture_timer.stop()
             self._area_capture_timer = None
-            self._screen_area_image_path = ""
+            capture_service.stop()
+            self.live_image_provider.clear(self.SCREEN_AREA_IMAGE)
+            self._screen_area_image_url = ""
             self.screenAreaImageChanged.emit("")
             self.logAdded.emit("已停止屏幕区域实时显示", "info")
 
@@ -178,6 +502,10 @@ class ImageMatcherController(QObject):
     @Slot(int)
     def switchAlgorithmMode(self, mode):
         """切换算法模式"""
+        # 实时检测流水线与算法绑定，切换算法时先停止
+        if self._realtime_detection_active and mode != self._algorithm_mode:
+            self.stopRealtimeDetection()
+
         self.algorithmMode = mode
         algorithm_names = [
             "模板匹配",
@@ -257,7 +585,11 @@ class ImageMatcherController(QObject):
                 self._area_capture_timer.stop()
                 self._area_capture_timer = None
 
-            # 创建定时器，每33ms截取一次屏幕区域（30FPS）
+            # 后台捕获服务持续截取选定区域，界面和检测共用同一份画面
+            capture_service.start(self._selectedPhysicalRegion(), target_fps=30)
+            self._area_frame_id = 0
+
+            # 创建定时器，每33ms刷新一次屏幕区域显示（30FPS）
             self._area_capture_timer = QTimer()
             self._area_capture_timer.timeout.connect(self._captureScreenArea)
             self._area_capture_timer.start(33)  # 33ms间隔，约30FPS
@@ -279,94 +611,124 @@ class ImageMatcherController(QObject):
     def _captureScreenArea(self):
         """截取屏幕区域"""
         try:
-            import os
-            import tempfile
-            import cv2
-            import logging
-            from datetime import datetime
-            
-            logger = logging.getLogger(__name__)
-
             if (
                 self._selected_window_rect["width"] <= 0
                 or self._selected_window_rect["height"] <= 0
             ):
                 return
 
-            # 获取QML传递的逻辑坐标
-            logical_x = self._selected_window_rect["x"]
-            logical_y = self._selected_window_rect["y"]
-            logical_width = self._selected_window_rect["width"]
-            logical_height = self._selected_window_rect["height"]
-            
-            # 将逻辑坐标转换为物理坐标
-            # QML返回的是逻辑坐标，需要乘以DPI缩放因子得到物理像素坐标
-            physical_x = int(logical_x * screen_capture.dpi_scale)
-            physical_y = int(logical_y * screen_capture.dpi_scale)
-            physical_width = int(logical_width * screen_capture.dpi_scale)
-            physical_height = int(logical_height * screen_capture.dpi_scale)
-            
-            region = (physical_x, physical_y, physical_width, physical_height)
-          
-            # 使用我们修复的截图功能
-            screenshot_cv = screen_capture.capture_screen(region)
-            
-            if screenshot_cv is None:
+            # 从后台捕获服务取最新帧（没有新帧时不重复刷新）
+            frame = self._getSelectedRegionFrame(copy=False)
+
+            if frame is None:
                 print("屏幕区域截图失败")
                 return
 
-            # 保存到临时文件
-            temp_dir = tempfile.gettempdir()
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")[:-3]
-            filename = f"screen_area_{timestamp}.png"
-            filepath = os.path.join(temp_dir, filename)
-
-            # 使用OpenCV保存图像
-            success = cv2.imwrite(filepath, screenshot_cv)
-            if not success:
-                print(f"保存截图失败: {filepath}")
+            if frame.frame_id and frame.frame_id == self._area_frame_id:
                 return
-            
-            # 清理旧文件（保留最近5个）
-            self._cleanupOldScreenshots(temp_dir)
+            self._area_frame_id = frame.frame_id
 
-            # 更新路径并发送信号
-            old_path = self._screen_area_image_path
-            self._screen_area_image_path = filepath
-            self.screenAreaImageChanged.emit(filepath)
-
-            # 删除旧文件
-            if old_path and os.path.exists(old_path) and old_path != filepath:
-                try:
-                    os.remove(old_path)
-                except:
-                    pass
+            # 画面直接交给图像提供器，QML通过版本化的image://地址重新请求
+            self._screen_area_image_url = self.live_image_provider.set_image(
+                self.SCREEN_AREA_IMAGE, frame.image
+            )
+            self.screenAreaImageChanged.emit(self._screen_area_image_url)
 
         except Exception as e:
             print(f"截取屏幕区域失败: {e}")
             self.logAdded.emit(f"截取屏幕区域失败: {str(e)}", "error")
 
-    def _cleanupOldScreenshots(self, temp_dir):
-        """清理旧的截图文件"""
-        try:
-            import glob
-            import os
+    def _selectedPhysicalRegion(self):
+        """选定区域的物理像素坐标 (x, y, width, height)"""
+        # QML返回的是逻辑坐标，需要乘以DPI缩放因子得到物理像素坐标
+        return (
+            int(self._selected_window_rect["x"] * screen_capture.dpi_scale),
+            int(self._selected_window_rect["y"] * screen_capture.dpi_scale),
+            int(self._selected_window_rect["width"] * screen_capture.dpi_scale),
+            int(self._selected_window_rect["height"] * screen_capture.dpi_scale),
+        )
 
-            # 找到所有screen_area_开头的文件
-            pattern = os.path.join(temp_dir, "screen_area_*.png")
-            files = glob.glob(pattern)
+    def _getSelectedRegionFrame(self, copy=True):
+        """
+        获取选定区域的最新画面
+        捕获服务正在截取该区域时直接取其最新帧，否则同步截图一次
 
-            # 按修改时间排序，保留最新的5个
-            files.sort(key=os.path.getmtime, reverse=True)
+        Returns:
+            CapturedFrame，失败返回None
+        """
+        from python.screen_capture import CapturedFrame
+
+        region = self._selectedPhysicalRegion()
+        if capture_service.is_running() and capture_service.region == region:
+            frame = capture_service.get_latest(copy=copy)
+            if frame is None:
+                frame = capture_service.wait_next(0, timeout=0.2, copy=copy)
+            if frame is not None:
+                return frame
+
+        image = screen_capture.capture_screen(region)
+        if image is None:
+            return None
+        return CapturedFrame(0, time.time(), image, region)
+
+    def _captureSelectedWindow(self):
+        """捕获选定窗口/区域的画面（区域实时显示时复用捕获服务的最新帧）"""
+        if capture_service.is_running():
+            frame = self._getSelectedRegionFrame(copy=True)
+            if frame is not None:
+                return frame.image
+
+        return screen_capture.capture_window(
+            self._selected_window, self._selected_window_rect
+        )
 
-            # 删除多余的文件
-            for file_to_delete in files[5:]:
-                try:
-                    os.remove(file_to_delete)
-                except:
-                    pass
-        except Exception as e:
-            print(f"清理旧截图失败: {e}")
+    @Slot(result=str)
+    def saveScreenAreaSnapshot(self):
+        """把当前区域画面保存为临时PNG（供外部程序打开），失败返回空字符串"""
+        frame = self._getSelectedRegionFrame(copy=False)
+        if frame is None:
+            return ""
+        return screen_capture.save_screenshot(frame.image)
+
+    @Property(bool, notify=matchingBusyChanged)
+    def matchingBusy(self):
+        """是否有匹配任务正在执行"""
+        return self._job_executor.is_busy(self.MATCH_VIEW)
+
+    def _submitMatchJob(self, execute):
+        """把匹配提交到后台任务执行器（取代尚未完成的旧匹配）"""
+        self._job_executor.submit(self.MATCH_VIEW, execute)
+        self.matchingBusyChanged.emit(True)
+
+    @Slot()
+    def cancelMatching(self):
+        """取消正在执行的匹配"""
+        self._job_executor.cancel(self.MATCH_VIEW)
+
+    def shutdown(self):
+        """退出前取消后台任务并等待线程结束"""
+        self._realtime_scheduler.shutdown()
+        self._job_executor.shutdown()
+
+    @Slot(str, int, int, str)
+    def _onMatchJobProgress(self, view, job_id, percent, message):
+        self.matchingProgress.emit(percent, message)
+
+    @Slot(str, int, float)
+    def _onMatchJobFinished(self, view, job_id, elapsed_ms):
+        logger.info(f"匹配任务 {job_id} 完成，耗时 {elapsed_ms:.1f}ms")
+        self.matchingProgress.emit(100, "完成")
+        self.matchingBusyChanged.emit(self._job_executor.is_busy(view))
+
+    @Slot(str, int)
+    def _onMatchJobCancelled(self, view, job_id):
+        self.logAdded.emit(f"匹配任务 {job_id} 已取消", "info")
+        self.matchingBusyChanged.emit(self._job_executor.is_busy(view))
+
+    @Slot(str, int, str)
+    def _onMatchJobFailed(self, view, job_id, error):
+        self.logAdded.emit(f"匹配过程中发生错误: {error}", "error")
+        self.matchingBusyChanged.emit(self._job_executor.is_busy(view))
 
     @Slot()
     def startMatching(self):
@@ -407,13 +769,13 @@ class ImageMatcherController(QObject):
             )
 
             if self._algorithm_mode == 0:  # 模板匹配
-                self._executeImageTemplateMatching()
+                self._submitMatchJob(self._executeImageTemplateMatching)
             elif self._algorithm_mode == 1:  # ORB特征匹配
-                self._executeORBMatching()
+                self._submitMatchJob(self._executeORBMatching)
             elif self._algorithm_mode == 2:  # YOLO+ORB混合
-                self._executeYOLOORBMatching()
+                self._submitMatchJob(self._executeYOLOORBMatching)
             elif self._algorithm_mode == 3:  # 纯YOLO
-                self._executePureYOLOMatching()
+                self._submitMatchJob(self._executePureYOLOMatching)
 
         else:
             # 屏幕窗口匹配模式
@@ -438,15 +800,15 @@ class ImageMatcherController(QObject):
             self.logAdded.emit(f"目标窗口: {self._selected_window}", "info")
 
             if self._algorithm_mode == 0:  # 模板匹配
-                self._executeScreenTemplateMatching()
+                self._submitMatchJob(self._executeScreenTemplateMatching)
             elif self._algorithm_mode == 1:  # ORB特征匹配
-                self._executeScreenORBMatching()
+                self._submitMatchJob(self._executeScreenORBMatching)
             elif self._algorithm_mode == 2:  # YOLO+ORB混合
-                self._executeScreenYOLOORBMatching()
+                self._submitMatchJob(self._executeScreenYOLOORBMatching)
             elif self._algorithm_mode == 3:  # 纯YOLO
-                self._executeScreenPureYOLOMatching()
+                self._submitMatchJob(self._executeScreenPureYOLOMatching)
 
-    def _executeImageTemplateMatching(self):
+    def _executeImageTemplateMatching(self, job):
         """执行图片间的模板匹配"""
         try:
             import cv2
@@ -480,9 +842,14 @@ class ImageMatcherController(QObject):
             self.logAdded.emit(f"开始模板匹配，方法: {method_name}", "info")
 
             # 执行匹配
+            job.report_progress(50, "正在匹配")
             result = cv2.matchTemplate(target, template, method)
             min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
 
+            # 已被新的匹配请求取代时不再输出结果
+            if job.cancelled:
+                return
+
             # 根据方法选择合适的值和位置
             if method in [cv2.TM_SQDIFF, cv2.TM_SQDIFF_NORMED]:
                 match_val = min_val
@@ -521,11 +888,18 @@ class ImageMatcherController(QObject):
         except Exception as e:
             self.logAdded.emit(f"模板匹配过程中发生错误: {str(e)}", "error")
 
-    def _executeScreenTemplateMatching(self):
+    def _executeScreenTemplateMatching(self, job):
         """执行屏幕模板匹配"""
         try:
             config = self.getCurrentAlgorithmSettings()
-            result = template_matcher.find_template_on_screen(self._image1_path, config)
+            job.report_progress(50, "正在匹配")
+            result = template_matcher.find_template_on_screen(
+                self._image1_path, config, cancel_event=job.cancel_event
+            )
+
+            # 已被新的匹配请求取代时不再输出结果
+            if job.cancelled:
+                return
 
             if result:
                 self.logAdded.emit("屏幕匹配成功！", "success")
@@ -546,7 +920,7 @@ class ImageMatcherController(QObject):
         except Exception as e:
             self.logAdded.emit(f"屏幕匹配过程中发生错误: {str(e)}", "error")
 
-    def _executeORBMatching(self):
+    def _executeORBMatching(self, job):
         """执行ORB特征匹配"""
         try:
             import cv2
@@ -570,7 +944,14 @@ class ImageMatcherController(QObject):
             )
 
             # 执行ORB匹配
-            result = orb_matcher.match_features(template, target, config)
+            job.report_progress(50, "正在匹配")
+            result = orb_matcher.match_features(
+                template, target, config, cancel_event=job.cancel_event
+            )
+
+            # 已被新的匹配请求取代时不再输出结果
+            if job.cancelled:
+                return
 
             if result and result["num_matches"] >= config.get("min_matches", 10):
                 # 匹配成功
@@ -615,7 +996,7 @@ class ImageMatcherController(QObject):
         except Exception as e:
             self.logAdded.emit(f"ORB特征匹配过程中发生错误: {str(e)}", "error")
 
-    def _executeScreenORBMatching(self):
+    def _executeScreenORBMatching(self, job):
         """执行屏幕ORB特征匹配"""
         try:
             import cv2
@@ -637,16 +1018,21 @@ class ImageMatcherController(QObject):
             )
 
             # 捕获窗口截图
-            window_screenshot = screen_capture.capture_window(
-                self._selected_window, self._selected_window_rect
-            )
+            window_screenshot = self._captureSelectedWindow()
 
             if window_screenshot is None:
                 self.logAdded.emit("窗口截图失败", "error")
                 return
 
             # 执行ORB匹配
-            result = orb_matcher.match_features(template, window_screenshot, config)
+            job.report_progress(50, "正在匹配")
+            result = orb_matcher.match_features(
+                template, window_screenshot, config, cancel_event=job.cancel_event
+            )
+
+            # 已被新的匹配请求取代时不再输出结果
+            if job.cancelled:
+                return
 
             if result and result["num_matches"] >= config.get("min_matches", 10):
                 # 匹配成功
@@ -724,7 +1110,7 @@ class ImageMatcherController(QObject):
         except Exception as e:
             self.logAdded.emit(f"屏幕ORB特征匹配过程中发生错误: {str(e)}", "error")
 
-    def _executeScreenYOLOORBMatching(self):
+    def _executeScreenYOLOORBMatching(self, job):
         """执行屏幕YOLO+ORB混合匹配"""
         try:
             import cv2
@@ -749,19 +1135,22 @@ class ImageMatcherController(QObject):
                 self.logAdded.emit(f"使用YOLO模型: {model_path}", "info")
 
             # 捕获窗口截图
-            window_screenshot = screen_capture.capture_window(
-                self._selected_window, self._selected_window_rect
-            )
+            window_screenshot = self._captureSelectedWindow()
 
             if window_screenshot is None:
                 self.logAdded.emit("窗口截图失败", "error")
                 return
 
             # 执行YOLO+ORB匹配
+            job.report_progress(50, "正在匹配")
             result = yolo_orb_matcher.match_with_yolo_orb(
                 template, window_screenshot, config
             )
 
+            # 已被新的匹配请求取代时不再输出结果
+            if job.cancelled:
+                return
+
             if result and result.get("confidence", 0) > 0.5:
                 # 匹配成功
                 method = result.get("method", "YOLO+ORB")
@@ -842,15 +1231,12 @@ class ImageMatcherController(QObject):
         except Exception as e:
             self.logAdded.emit(f"屏幕YOLO+ORB匹配过程中发生错误: {str(e)}", "error")
 
-    def _executeScreenPureYOLOMatching(self):
+    def _executeScreenPureYOLOMatching(self, job):
         """执行屏幕纯YOLO匹配"""
         logger.info("🔍 开始执行_executeScreenPureYOLOMatching方法")
         try:
-            import cv2
-            import tempfile
-
             # 检查屏幕区域截图
-            if not self._screen_area_image_path:
+            if not self._screen_area_image_url:
                 self.logAdded.emit("请先选择屏幕区域", "error")
                 return
 
@@ -866,10 +1252,8 @@ class ImageMatcherController(QObject):
             else:
                 self.logAdded.emit("使用模拟YOLO检测进行演示", "info")
 
-            # 读取屏幕截图
-            window_screenshot = cv2.imread(
-                self._screen_area_image_path, cv2.IMREAD_COLOR
-            )
+            # 获取屏幕区域画面（复用捕获服务的最新帧）
+            window_screenshot = self._captureSelectedWindow()
 
             if window_screenshot is None:
                 self.logAdded.emit("屏幕截图加载失败", "error")
@@ -877,9 +1261,16 @@ class ImageMatcherController(QObject):
 
             # 对于纯YOLO，我们只需要检测窗口截图中的对象，不需要模板
             # 直接使用YOLO检测器检测所有对象
-            detections = pure_yolo_matcher.detect_objects_yolo(
+            job.report_progress(50, "正在匹配")
+            detection_array = pure_yolo_matcher.detect_objects_array(
                 window_screenshot, config
             )
+            class_names = pure_yolo_matcher.class_names
+            detections = detections_to_dicts(detection_array, class_names)
+
+            # 已被新的匹配请求取代时不再输出结果
+            if job.cancelled:
+                return
             
             # 获取性能统计
             performance_stats = pure_yolo_matcher.get_performance_stats()
@@ -899,6 +1290,8 @@ class ImageMatcherController(QObject):
                     "method": "Pure_YOLO_Screen",
                     "detection_count": len(detections),
                     "all_detections": detections,
+                    "detection_array": detection_array,
+                    "class_names": class_names,
                     "performance": performance_stats,
                 }
             else:
@@ -963,45 +1356,14 @@ class ImageMatcherController(QObject):
 
                 # 发送多个检测结果到前端显示
                 if all_detections:
-                    # 转换坐标到屏幕坐标系和相对坐标
-                    screen_detections = []
-                    
-                    # 获取区域尺寸
-                    area_width = self._selected_window_rect["width"]
-                    area_height = self._selected_window_rect["height"]
-                    
-                    for detection in all_detections:
-                        screen_detection = detection.copy()
-                        
-                        # YOLO检测返回的是物理像素坐标，需要转换为逻辑坐标再加上偏移
-                        # 物理坐标 -> 逻辑坐标
-                        logical_x = detection["x"] / screen_capture.dpi_scale
-                        logical_y = detection["y"] / screen_capture.dpi_scale
-                        logical_width = detection["width"] / screen_capture.dpi_scale
-                        logical_height = detection["height"] / screen_capture.dpi_scale
-                        
-                        # 逻辑坐标 + 逻辑偏移 = 屏幕逻辑坐标
-                        screen_detection["screen_x"] = (
-                            self._selected_window_rect["x"] + logical_x
-                        )
-                        screen_detection["screen_y"] = (
-                            self._selected_window_rect["y"] + logical_y
-                        )
-                        # 更新尺寸为逻辑坐标
-                        screen_detection["width"] = logical_width
-                        screen_detection["height"] = logical_height
-                        
-                        # 计算相对坐标（0-1范围）
-                        screen_detection["relative_x"] = logical_x / area_width
-                        screen_detection["relative_y"] = logical_y / area_height
-                        screen_detection["relative_width"] = logical_width / area_width
-                        screen_detection["relative_height"] = logical_height / area_height
-                        
-                        # 添加动态颜色信息
-                        class_id = detection.get("class_id", 0)
-                        screen_detection["border_color"] = self._get_class_color(class_id)
-                        
-                        screen_detections.append(screen_detection)
+                    # 结构化数组整体转换为屏幕逻辑坐标和相对坐标，并添加动态颜色信息
+                    screen_detections = to_display_detections(
+                        result["detection_array"],
+                        self._selected_window_rect,
+                        screen_capture.dpi_scale,
+                        self._get_class_color,
+                        result["class_names"],
+                    )
 
                     # 发送检测结果到前端
                     detections_json = json.dumps(screen_detections)
@@ -1041,11 +1403,12 @@ class ImageMatcherController(QObject):
             logger.info(f"准备发送性能信息，performance_stats是否存在: {bool(performance_stats)}")
             if performance_stats:
                 device_info = self._current_device if hasattr(self, '_current_device') else "CPU"
-                logger.info(f"发送性能信息: FPS={performance_stats.get('fps', 0.0):.1f}, 延迟={performance_stats.get('latency_ms', 0.0):.1f}ms, 设备={device_info}")
+                logger.info(f"发送性能信息: FPS={performance_stats.get('fps', 0.0):.1f}, 延迟={performance_stats.get('latency_ms', 0.0):.1f}ms, 设备={device_info}, 跳帧率={performance_stats.get('skip_ratio', 0.0):.1%}")
                 self.performanceInfoUpdated.emit(
                     float(performance_stats.get("fps", 0.0)),
                     float(performance_stats.get("latency_ms", 0.0)), 
-                    str(device_info)
+                    str(device_info),
+                    json.dumps(performance_stats),
                 )
                 logger.info("性能信息信号已发送")
             else:
@@ -1054,7 +1417,7 @@ class ImageMatcherController(QObject):
         except Exception as e:
             self.logAdded.emit(f"屏幕纯YOLO匹配过程中发生错误: {str(e)}", "error")
 
-    def _executeYOLOORBMatching(self):
+    def _executeYOLOORBMatching(self, job):
         """执行YOLO+ORB混合匹配"""
         try:
             import cv2
@@ -1078,8 +1441,13 @@ class ImageMatcherController(QObject):
                 self.logAdded.emit(f"使用YOLO模型: {model_path}", "info")
 
             # 执行YOLO+ORB匹配
+            job.report_progress(50, "正在匹配")
             result = yolo_orb_matcher.match_with_yolo_orb(template, target, config)
 
+            # 已被新的匹配请求取代时不再输出结果
+            if job.cancelled:
+                return
+
             if result and result.get("confidence", 0) > 0.5:
                 # 匹配成功
                 method = result.get("method", "YOLO+ORB")
@@ -1127,7 +1495,7 @@ class ImageMatcherController(QObject):
         except Exception as e:
             self.logAdded.emit(f"YOLO+ORB匹配过程中发生错误: {str(e)}", "error")
 
-    def _executePureYOLOMatching(self):
+    def _executePureYOLOMatching(self, job):
         """执行纯YOLO匹配"""
         try:
             import cv2
@@ -1156,8 +1524,13 @@ class ImageMatcherController(QObject):
                 self.logAdded.emit(f"使用YOLO模型: {model_path}", "info")
 
             # 执行纯YOLO匹配
+            job.report_progress(50, "正在匹配")
             result = pure_yolo_matcher.match_with_pure_yolo(template, target, config)
 
+            # 已被新的匹配请求取代时不再输出结果
+            if job.cancelled:
+                return
+
             if result:
                 confidence = result.get("confidence", 0)
                 class_name = result.get("class_name", "unknown")
@@ -1685,15 +2058,27 @@ class ImageMatcherController(QObject):
             self.logAdded.emit("请先选择检测区域", "error")
             return
             
-        # 只有纯YOLO模式支持实时检测
-        if self._algorithm_mode != 3:
-            self.logAdded.emit("实时检测仅支持纯YOLO模式", "warning")
+        # 除纯YOLO外的算法需要模板图片
+        if self._algorithm_mode != 3 and (
+            not self._image1_path or not os.path.exists(self._image1_path)
+        ):
+            self.logAdded.emit("请先选择模板图片", "error")
             return
-            
+
+        try:
+            self._realtime_pipeline = create_realtime_pipeline(
+                self._algorithm_mode,
+                self._image1_path,
+                self._algorithm_settings.get(self._algorithm_mode, {}),
+            )
+        except Exception as e:
+            self.logAdded.emit(f"创建实时检测失败: {str(e)}", "error")
+            return
+
         self._realtime_detection_active = True
-        self._setupRealtimeTimer()
+        self._realtime_scheduler.start(self._performRealtimeDetection)
         self.realtimeDetectionStateChanged.emit(True)
-        self.logAdded.emit("开始实时YOLO检测", "success")
+        self.logAdded.emit(f"开始实时{self._realtime_pipeline.name}检测", "success")
 
     @Slot()
     def stopRealtimeDetection(self):
@@ -1702,9 +2087,8 @@ class ImageMatcherController(QObject):
             return
             
         self._realtime_detection_active = False
-        if self._realtime_timer:
-            self._realtime_timer.stop()
-            self._realtime_timer = None
+        self._realtime_scheduler.stop()
+        self._realtime_pipeline = None
         
         # 清除所有检测结果
         self.clearAllDetections.emit()
@@ -1713,118 +2097,79 @@ class ImageMatcherController(QObject):
 
     @Slot(int)
     def setRealtimeInterval(self, interval_ms):
-        """设置实时检测间隔（毫秒）"""
+        """设置实时检测的最小间隔（毫秒），调度器会在检测较慢时自动拉长间隔"""
         self._realtime_interval = max(100, min(5000, interval_ms))  # 限制在100ms-5s之间
-        if self._realtime_timer and self._realtime_detection_active:
-            self._realtime_timer.setInterval(self._realtime_interval)
+        self._realtime_scheduler.set_target_fps(1000.0 / self._realtime_interval)
 
     @Property(bool, notify=realtimeDetectionStateChanged)
     def realtimeDetectionActive(self):
         """实时检测状态属性"""
         return self._realtime_detection_active
 
-    def _setupRealtimeTimer(self):
-        """设置实时检测定时器"""
-        from PySide6.QtCore import QTimer
+    @Slot(dict)
+    def _onRealtimeStats(self, stats):
+        """把调度器统计作为性能信息发送到界面"""
+        if not self._realtime_detection_active:
+            return
+
+        device_info = self._current_device if hasattr(self, '_current_device') else "CPU"
+        logger.info(
+            f"实时检测性能信息: FPS={stats['fps']:.1f}, 延迟={stats['latency_ms']:.1f}ms, "
+            f"间隔={stats['interval_ms']:.0f}ms, 丢弃触发={stats['dropped_ticks']}, "
+            f"队列深度={stats['queue_depth']}, 设备={device_info}"
+        )
+        self.performanceInfoUpdated.emit(
+            float(stats["fps"]),
+            float(stats["latency_ms"]),
+            str(device_info),
+            json.dumps(stats),
+        )
+
+    @Slot(str)
+    def _onRealtimeFailed(self, error):
+        logger.error(f"实时检测错误: {error}")
+        # 发生错误时停止实时检测
+        self.stopRealtimeDetection()
+
+    def _performRealtimeDetection(self, job):
+        """执行一次实时检测（由实时调度器在后台线程调用，异常交给调度器处理）"""
+        pipeline = self._realtime_pipeline
+        if not self._realtime_detection_active or pipeline is None:
+            return
+
+        # 界面修改的算法参数在下一帧生效
+        pipeline.configure(self._algorithm_settings.get(self._algorithm_mode, {}))
         
-        if self._realtime_timer:
-            self._realtime_timer.stop()
+        # 取捕获服务的最新帧（检测期间生产者会继续写入环形缓冲区，因此复制一份）
+        frame = self._getSelectedRegionFrame(copy=True)
+        
+        if frame is None:
+            return
+        screenshot_cv = frame.image
             
-        self._realtime_timer = QTimer()
-        self._realtime_timer.timeout.connect(self._performRealtimeDetection)
-        self._realtime_timer.setInterval(self._realtime_interval)
-        self._realtime_timer.start()
+        # 执行当前算法的检测（所有算法输出相同格式的检测结果）
+        all_detections, class_names = pipeline.process(screenshot_cv)
 
-    def _performRealtimeDetection(self):
-        """执行一次实时检测"""
-        if not self._realtime_detection_active:
+        # 检测期间已停止实时检测时不再刷新界面
+        if job.cancelled or not self._realtime_detection_active:
             return
-            
-        try:
-            # 获取当前算法配置
-            config = self._algorithm_settings.get(self._algorithm_mode, {})
-            
-            # 获取QML传递的逻辑坐标
-            logical_x = self._selected_window_rect["x"]
-            logical_y = self._selected_window_rect["y"]
-            logical_width = self._selected_window_rect["width"]
-            logical_height = self._selected_window_rect["height"]
-            
-            # 将逻辑坐标转换为物理坐标
-            physical_x = int(logical_x * screen_capture.dpi_scale)
-            physical_y = int(logical_y * screen_capture.dpi_scale)
-            physical_width = int(logical_width * screen_capture.dpi_scale)
-            physical_height = int(logical_height * screen_capture.dpi_scale)
-            
-            region = (physical_x, physical_y, physical_width, physical_height)
-            
-            # 截取屏幕区域
-            screenshot_cv = screen_capture.capture_screen(region)
-            
-            if screenshot_cv is None:
-                return
-                
-            # 执行YOLO检测
-            result = pure_yolo_matcher.match_with_pure_yolo(None, screenshot_cv, config)
-            
-            # 发送性能信息（实时检测）
-            if result and result.get("performance"):
-                perf = result["performance"]
-                device_info = self._current_device if hasattr(self, '_current_device') else "CPU"
-                logger.info(f"实时检测性能信息: FPS={perf.get('fps', 0.0):.1f}, 延迟={perf.get('latency_ms', 0.0):.1f}ms, 设备={device_info}")
-                self.performanceInfoUpdated.emit(
-                    float(perf.get("fps", 0.0)),
-                    float(perf.get("latency_ms", 0.0)), 
-                    str(device_info)
-                )
-            
-            if result and result.get("all_detections"):
-                # 转换检测结果坐标
-                all_detections = result["all_detections"]
-                screen_detections = []
-                
-                # 获取区域尺寸
-                area_width = self._selected_window_rect["width"]
-                area_height = self._selected_window_rect["height"]
-                
-                for detection in all_detections:
-                    screen_detection = detection.copy()
-                    
-                    # 物理坐标转换为逻辑坐标
-                    logical_det_x = detection["x"] / screen_capture.dpi_scale
-                    logical_det_y = detection["y"] / screen_capture.dpi_scale
-                    logical_det_width = detection["width"] / screen_capture.dpi_scale
-                    logical_det_height = detection["height"] / screen_capture.dpi_scale
-                    
-                    # 逻辑坐标 + 逻辑偏移 = 屏幕逻辑坐标
-                    screen_detection["screen_x"] = logical_x + logical_det_x
-                    screen_detection["screen_y"] = logical_y + logical_det_y
-                    screen_detection["width"] = logical_det_width
-                    screen_detection["height"] = logical_det_height
-                    
-                    # 计算相对坐标（0-1范围）
-                    screen_detection["relative_x"] = logical_det_x / area_width
-                    screen_detection["relative_y"] = logical_det_y / area_height
-                    screen_detection["relative_width"] = logical_det_width / area_width
-                    screen_detection["relative_height"] = logical_det_height / area_height
-                    
-                    # 添加动态颜色信息
-                    class_id = detection.get("class_id", 0)
-                    screen_detection["border_color"] = self._get_class_color(class_id)
-                    
-                    screen_detections.append(screen_detection)
-                
-                # 发送检测结果到前端（实时更新）
-                detections_json = json.dumps(screen_detections)
-                self.showMultipleDetections.emit(detections_json)
-            else:
-                # 没有检测到目标，清除显示
-                self.clearAllDetections.emit()
-                
-        except Exception as e:
-            logger.error(f"实时检测错误: {e}")
-            # 发生错误时停止实时检测
-            self.stopRealtimeDetection()
+
+        if len(all_detections):
+            # 转换为屏幕逻辑坐标和区域内相对坐标，并添加动态颜色信息
+            screen_detections = to_display_detections(
+                all_detections,
+                self._selected_window_rect,
+                screen_capture.dpi_scale,
+                self._get_class_color,
+                class_names,
+            )
+
+            # 发送检测结果到前端（实时更新）
+            detections_json = json.dumps(screen_detections)
+            self.showMultipleDetections.emit(detections_json)
+        else:
+            # 没有检测到目标，清除显示
+            self.clearAllDetections.emit()
 
     @Slot(str, result=str)
     def executeTemplateMatching(self, template_path):
@@ -1946,6 +2291,15 @@ class ImageMatcherApp:
         # 注册控制器到QML上下文
         self.engine.rootContext().setContextProperty("controller", self.controller)
 
+        # 注册实时画面提供器（image://live/...）
+        self.engine.addImageProvider(
+            LiveImageProvider.PROVIDER_ID, self.controller.live_image_provider
+        )
+
+        # 退出时停止后台捕获线程和匹配任务
+        self.app.aboutToQuit.connect(capture_service.stop)
+        self.app.aboutToQuit.connect(self.controller.shutdown)
+
         # 设置QML文件路径
         current_dir = os.path.dirname(os.path.abspath(__file__))
         main_qml_path = os.path.join(current_dir, "main.qml")
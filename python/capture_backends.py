@@ -0,0 +1,658 @@
+#!/usr/bin/env python3
+"""
+截图后端模块
+定义统一的截图后端接口和注册表，包含屏幕截图后端（MSS、GDI、PIL）
+以及用于无桌面环境基准测试的回放源（图片目录、视频文件、合成画面）
+"""
+
+import cv2
+import numpy as np
+import os
+import glob
+import time
+import platform
+import threading
+import ctypes
+from ctypes import wintypes
+from typing import Optional, Tuple, List, Dict, Any, Type
+import logging
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+# 支持的输出格式
+OUTPUT_FORMATS = ("bgr", "bgra", "gray")
+
+# 各输出格式的通道数
+_FORMAT_CHANNELS = {"bgr": 3, "bgra": 4, "gray": 1}
+
+# (源像素格式, 输出格式) -> 颜色转换代码，None表示格式相同无需转换
+_CONVERSIONS = {
+    ("bgra", "bgr"): cv2.COLOR_BGRA2BGR,
+    ("bgra", "gray"): cv2.COLOR_BGRA2GRAY,
+    ("bgra", "bgra"): None,
+    ("bgr", "bgr"): None,
+    ("bgr", "bgra"): cv2.COLOR_BGR2BGRA,
+    ("bgr", "gray"): cv2.COLOR_BGR2GRAY,
+    ("rgb", "bgr"): cv2.COLOR_RGB2BGR,
+    ("rgb", "bgra"): cv2.COLOR_RGB2BGRA,
+    ("rgb", "gray"): cv2.COLOR_RGB2GRAY,
+    ("gray", "gray"): None,
+    ("gray", "bgr"): cv2.COLOR_GRAY2BGR,
+    ("gray", "bgra"): cv2.COLOR_GRAY2BGRA,
+}
+
+
+class BITMAPINFOHEADER(ctypes.Structure):
+    """Windows BITMAPINFOHEADER（ctypes.wintypes 没有提供位图结构体）"""
+
+    _fields_ = [
+        ("biSize", wintypes.DWORD),
+        ("biWidth", wintypes.LONG),
+        ("biHeight", wintypes.LONG),
+        ("biPlanes", wintypes.WORD),
+        ("biBitCount", wintypes.WORD),
+        ("biCompression", wintypes.DWORD),
+        ("biSizeImage", wintypes.DWORD),
+        ("biXPelsPerMeter", wintypes.LONG),
+        ("biYPelsPerMeter", wintypes.LONG),
+        ("biClrUsed", wintypes.DWORD),
+        ("biClrImportant", wintypes.DWORD),
+    ]
+
+
+class BITMAPINFO(ctypes.Structure):
+    """Windows BITMAPINFO（32位BI_RGB位图不使用调色板，只保留一个占位项）"""
+
+    _fields_ = [
+        ("bmiHeader", BITMAPINFOHEADER),
+        ("bmiColors", wintypes.DWORD * 1),
+    ]
+
+
+def make_bitmap_info(width: int, height: int) -> BITMAPINFO:
+    """GetDIBits使用的32位、从上到下行序的BITMAPINFO"""
+    bmp_info = BITMAPINFO()
+    bmp_info.bmiHeader.biSize = ctypes.sizeof(BITMAPINFOHEADER)
+    bmp_info.bmiHeader.biWidth = width
+    bmp_info.bmiHeader.biHeight = -height  # 负值表示从上到下
+    bmp_info.bmiHeader.biPlanes = 1
+    bmp_info.bmiHeader.biBitCount = 32
+    bmp_info.bmiHeader.biCompression = 0  # BI_RGB
+    return bmp_info
+
+
+def frame_shape(height: int, width: int, output_format: str = "bgr") -> Tuple[int, ...]:
+    """给定尺寸和输出格式对应的数组形状"""
+    channels = _FORMAT_CHANNELS[output_format]
+    return (height, width) if channels == 1 else (height, width, channels)
+
+
+def bgra_view(buffer, height: int, width: int, stride: int = 0) -> np.ndarray:
+    """
+    不复制地把BGRA原始缓冲区（bytes/bytearray/ctypes数组）视为 (h, w, 4) 数组
+
+    Args:
+        buffer: 支持缓冲区协议的原始像素数据
+        height: 图像高度
+        width: 图像宽度
+        stride: 每行字节数（含行尾填充），0表示紧密排列
+
+    Returns:
+        uint8 数组视图
+    """
+    stride = stride or width * 4
+    data = np.frombuffer(buffer, dtype=np.uint8, count=stride * height)
+    if stride == width * 4:
+        return data.reshape(height, width, 4)
+    return np.lib.stride_tricks.as_strided(
+        data, shape=(height, width, 4), strides=(stride, 4, 1), writeable=False
+    )
+
+
+def convert_pixels(
+    image: np.ndarray,
+    pixel_format: str,
+    output_format: str = "bgr",
+    out: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    把图像从源像素格式转换为输出格式
+
+    Args:
+        image: 源图像
+        pixel_format: 源像素格式 'bgra' / 'bgr' / 'rgb' / 'gray'
+        output_format: 输出格式 'bgr' / 'bgra' / 'gray'
+        out: 预分配的输出数组（形状需与输出一致），None时新分配
+
+    Returns:
+        转换后的图像；格式相同且未提供out时直接返回输入（不复制）
+    """
+    key = (pixel_format, output_format)
+    if key not in _CONVERSIONS:
+        raise ValueError(f"不支持的格式转换: {pixel_format} -> {output_format}")
+
+    code = _CONVERSIONS[key]
+    if code is None:
+        if out is None:
+            return image
+        np.copyto(out, image)
+        return out
+    if out is None:
+        return cv2.cvtColor(image, code)
+    return cv2.cvtColor(image, code, dst=out)
+
+
+def convert_bgra(
+    bgra: np.ndarray, output_format: str = "bgr", out: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """把BGRA图像转换为指定输出格式（见 convert_pixels）"""
+    return convert_pixels(bgra, "bgra", output_format, out)
+
+
+def dib_to_array(
+    buffer,
+    width: int,
+    height: int,
+    output_format: str = "bgr",
+    bottom_up: bool = False,
+    out: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    把32位DIB位图数据（GetDIBits得到的BGRA像素）转换为图像数组
+    整幅图像一次向量化转换，不逐像素处理
+
+    Args:
+        buffer: GetDIBits填充的像素缓冲区（bytes/bytearray/ctypes数组）
+        width: 位图宽度
+        height: 位图高度（正数）
+        output_format: 输出格式 'bgr' / 'bgra' / 'gray'
+        bottom_up: 位图是否按从下到上的行序存储（biHeight为正）
+        out: 预分配的输出数组，None时新分配
+
+    Returns:
+        与源缓冲区不共享内存的图像数组
+    """
+    bgra = bgra_view(buffer, height, width)
+    if bottom_up:
+        bgra = bgra[::-1]
+
+    result = convert_pixels(bgra, "bgra", output_format, out)
+    if result is bgra:
+        # 格式相同时convert_pixels直接返回视图，源缓冲区通常随GDI资源一起释放
+        result = bgra.copy()
+    return result
+
+
+def crop_region(
+    image: np.ndarray, region: Optional[Tuple[int, int, int, int]]
+) -> Optional[np.ndarray]:
+    """
+    按区域裁剪图像（返回视图，区域超出部分被裁掉）
+
+    Args:
+        image: 完整画面
+        region: 区域 (x, y, width, height)，None表示整幅画面
+
+    Returns:
+        裁剪后的视图，区域与画面没有交集时返回None
+    """
+    if region is None:
+        return image
+
+    x, y, width, height = (int(v) for v in region)
+    x0, y0 = max(x, 0), max(y, 0)
+    x1 = min(x + width, image.shape[1])
+    y1 = min(y + height, image.shape[0])
+    if x1 <= x0 or y1 <= y0:
+        return None
+    return image[y0:y1, x0:x1]
+
+
+class RawFrame:
+    """后端返回的原始帧，由截图引擎转换到调用方需要的格式和缓冲区"""
+
+    __slots__ = ("image", "pixel_format", "owned")
+
+    def __init__(self, image: np.ndarray, pixel_format: str, owned: bool):
+        self.image = image  # 像素数据
+        self.pixel_format = pixel_format  # 'bgra' / 'bgr' / 'rgb' / 'gray'
+        self.owned = owned  # 数据是否为本帧独占（独占时格式相同可直接返回，不复制）
+
+
+class CaptureBackend:
+    """
+    截图后端基类
+    子类实现 grab()；is_available() 用于判断当前环境能否使用该后端
+    """
+
+    name = "base"
+
+    def is_available(self) -> bool:
+        """当前环境是否可以使用该后端"""
+        return True
+
+    def grab(self, region: Tuple[int, int, int, int] = None) -> Optional[RawFrame]:
+        """
+        截取一帧
+
+        Args:
+            region: 截图区域 (x, y, width, height)，None表示全屏
+
+        Returns:
+            原始帧，失败返回None
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """释放后端资源"""
+
+    def describe(self) -> Dict[str, Any]:
+        """后端描述信息"""
+        return {"name": self.name}
+
+
+# 后端注册表：名称 -> 后端类
+_BACKENDS: Dict[str, Type[CaptureBackend]] = {}
+
+
+def register_backend(name: str):
+    """类装饰器：注册截图后端"""
+
+    def decorator(cls: Type[CaptureBackend]) -> Type[CaptureBackend]:
+        cls.name = name
+        _BACKENDS[name] = cls
+        return cls
+
+    return decorator
+
+
+def create_backend(name: str, **options) -> CaptureBackend:
+    """
+    按名称创建截图后端
+
+    Args:
+        name: 已注册的后端名称
+        **options: 传给后端构造函数的参数
+
+    Returns:
+        后端实例
+    """
+    if name not in _BACKENDS:
+        raise ValueError(f"未知的截图后端: {name}，可用: {list(_BACKENDS)}")
+    return _BACKENDS[name](**options)
+
+
+def get_backend_names() -> List[str]:
+    """获取所有已注册的后端名称"""
+    return list(_BACKENDS)
+
+
+@register_backend("mss")
+class MSSBackend(CaptureBackend):
+    """MSS截图后端（每个线程使用独立的MSS实例，首次截图时才初始化）"""
+
+    def __init__(self):
+        self._local = threading.local()
+        self._available: Optional[bool] = None
+
+    def is_available(self) -> bool:
+        if self._available is None:
+            try:
+                import mss  # noqa: F401
+
+                self._available = True
+            except ImportError:
+                logger.warning("MSS库未安装，请运行: pip install mss")
+                self._available = False
+        return self._available
+
+    def _get_mss(self):
+        instance = getattr(self._local, "mss", None)
+        if instance is None:
+            import mss
+
+            instance = self._local.mss = mss.mss()
+            logger.info("MSS截图引擎初始化成功")
+        return instance
+
+    def grab(self, region: Tuple[int, int, int, int] = None) -> Optional[RawFrame]:
+        sct = self._get_mss()
+        if region:
+            x, y, width, height = region
+            monitor = {
+                "left": int(x),
+                "top": int(y),
+                "width": int(width),
+                "height": int(height),
+            }
+        else:
+            monitor = sct.monitors[1]
+        screenshot = sct.grab(monitor)
+
+        # 不复制地把MSS的BGRA原始数据视为数组
+        width, height = screenshot.size
+        return RawFrame(bgra_view(screenshot.raw, height, width), "bgra", True)
+
+    def close(self):
+        instance = getattr(self._local, "mss", None)
+        if instance is not None:
+            instance.close()
+            self._local.mss = None
+
+
+@register_backend("gdi")
+class GDIBackend(CaptureBackend):
+    """Windows GDI截图后端（像素缓冲区按线程和尺寸复用）"""
+
+    def __init__(self):
+        self._local = threading.local()
+        if platform.system() == "Windows":
+            self.user32 = ctypes.windll.user32
+            self.gdi32 = ctypes.windll.gdi32
+
+    def is_available(self) -> bool:
+        return platform.system() == "Windows"
+
+    def _get_buffer(self, width: int, height: int):
+        cached = getattr(self._local, "buffer", None)
+        if cached is not None and cached[0] == (width, height):
+            return cached[1]
+
+        buffer = (ctypes.c_char * (width * height * 4))()
+        self._local.buffer = ((width, height), buffer)
+        return buffer
+
+    def grab(self, region: Tuple[int, int, int, int] = None) -> Optional[RawFrame]:
+        if region:
+            x, y, width, height = (int(v) for v in region)
+        else:
+            # 全屏
+            x, y = 0, 0
+            width = self.user32.GetSystemMetrics(0)  # SM_CXSCREEN
+            height = self.user32.GetSystemMetrics(1)  # SM_CYSCREEN
+
+        # 获取屏幕DC
+        screen_dc = self.user32.GetDC(0)
+        if not screen_dc:
+            return None
+
+        mem_dc = bitmap = old_bitmap = None
+        try:
+            mem_dc = self.gdi32.CreateCompatibleDC(screen_dc)
+            if not mem_dc:
+                return None
+
+            # 创建位图
+            bitmap = self.gdi32.CreateCompatibleBitmap(screen_dc, width, height)
+            if not bitmap:
+                return None
+            old_bitmap = self.gdi32.SelectObject(mem_dc, bitmap)
+
+            # 复制屏幕内容
+            self.gdi32.BitBlt(mem_dc, 0, 0, width, height, screen_dc, x, y, 0x00CC0020)  # SRCCOPY
+
+            # 像素缓冲区按尺寸复用，避免每帧重新分配
+            buffer = self._get_buffer(width, height)
+            bmp_info = make_bitmap_info(width, height)
+
+            lines = self.gdi32.GetDIBits(
+                mem_dc, bitmap, 0, height, buffer, ctypes.byref(bmp_info), 0
+            )
+            if lines != height:
+                return None
+
+        finally:
+            # 清理资源
+            if old_bitmap is not None:
+                self.gdi32.SelectObject(mem_dc, old_bitmap)
+            if bitmap:
+                self.gdi32.DeleteObject(bitmap)
+            if mem_dc:
+                self.gdi32.DeleteDC(mem_dc)
+            self.user32.ReleaseDC(0, screen_dc)
+
+        # 像素缓冲区会被下一帧复用，因此不是独占数据
+        return RawFrame(bgra_view(buffer, height, width), "bgra", False)
+
+
+@register_backend("pil")
+class PILBackend(CaptureBackend):
+    """PIL ImageGrab截图后端"""
+
+    def is_available(self) -> bool:
+        try:
+            from PIL import ImageGrab  # noqa: F401
+
+            return True
+        except ImportError:
+            logger.error("PIL未安装")
+            return False
+
+    def grab(self, region: Tuple[int, int, int, int] = None) -> Optional[RawFrame]:
+        from PIL import ImageGrab
+
+        if region:
+            x, y, width, height = region
+            screenshot = ImageGrab.grab(bbox=(x, y, x + width, y + height))
+        else:
+            screenshot = ImageGrab.grab()
+
+        return RawFrame(np.asarray(screenshot.convert("RGB")), "rgb", True)
+
+
+class ReplayBackend(CaptureBackend):
+    """
+    回放源基类：按帧率节奏产出录制好的画面
+    realtime=True 时按真实时间推进（调用得快会重复返回当前帧，调用得慢会跳帧），
+    realtime=False 时每次调用都返回下一帧（尽可能快）
+    """
+
+    def __init__(self, fps: float = 30.0, realtime: bool = True, loop: bool = True):
+        self.fps = fps
+        self.realtime = realtime
+        self.loop = loop
+        self._start_time: Optional[float] = None
+        self._position = -1  # 最近返回的帧序号
+        self._current: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+
+    def frame_count(self) -> int:
+        """总帧数（未知时返回0）"""
+        return 0
+
+    def _read_frame(self, index: int) -> Optional[np.ndarray]:
+        """读取指定序号的帧（BGR）"""
+        raise NotImplementedError
+
+    def _target_index(self) -> int:
+        """本次调用应返回的帧序号"""
+        if not self.realtime:
+            return self._position + 1
+
+        now = time.perf_counter()
+        if self._start_time is None:
+            self._start_time = now
+        return int((now - self._start_time) * self.fps)
+
+    def rewind(self):
+        """回到第一帧"""
+        with self._lock:
+            self._start_time = None
+            self._position = -1
+            self._current = None
+
+    def grab(self, region: Tuple[int, int, int, int] = None) -> Optional[RawFrame]:
+        with self._lock:
+            index = self._target_index()
+            total = self.frame_count()
+            if total and index >= total:
+                if not self.loop:
+                    return None
+                index %= total
+
+            if index != self._position or self._current is None:
+                frame = self._read_frame(index)
+                if frame is None:
+                    return None
+                self._current = frame
+                self._position = index
+
+            image = crop_region(self._current, region)
+
+        if image is None:
+            return None
+        # 当前帧会被后续调用重复返回，因此不是独占数据
+        return RawFrame(image, "bgr", False)
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "fps": self.fps,
+            "realtime": self.realtime,
+            "loop": self.loop,
+            "frames": self.frame_count(),
+            "position": self._position,
+        }
+
+
+@register_backend("image_dir")
+class ImageDirectoryBackend(ReplayBackend):
+    """图片目录回放源：按文件名顺序回放目录中的截图"""
+
+    EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+
+    def __init__(
+        self,
+        directory: str,
+        fps: float = 30.0,
+        realtime: bool = True,
+        loop: bool = True,
+        preload: bool = False,
+    ):
+        super().__init__(fps, realtime, loop)
+        self.directory = directory
+        self.paths = sorted(
+            path
+            for path in glob.glob(os.path.join(directory, "*"))
+            if path.lower().endswith(self.EXTENSIONS)
+        )
+        self._images: Dict[int, np.ndarray] = {}
+        if preload:
+            for index in range(len(self.paths)):
+                self._read_frame(index)
+
+    def is_available(self) -> bool:
+        return bool(self.paths)
+
+    def frame_count(self) -> int:
+        return len(self.paths)
+
+    def _read_frame(self, index: int) -> Optional[np.ndarray]:
+        image = self._images.get(index)
+        if image is None:
+            image = cv2.imread(self.paths[index], cv2.IMREAD_COLOR)
+            if image is None:
+                logger.error(f"无法读取回放图片: {self.paths[index]}")
+                return None
+            if len(self._images) < 256:
+                self._images[index] = image
+        return image
+
+
+@register_backend("video")
+class VideoFileBackend(ReplayBackend):
+    """视频文件回放源（cv2.VideoCapture），按顺序解码，实时模式下跳过的帧只grab不解码"""
+
+    def __init__(
+        self,
+        path: str,
+        realtime: bool = True,
+        loop: bool = True,
+        fps: float = None,
+    ):
+        self.path = path
+        self._capture = cv2.VideoCapture(path)
+        source_fps = self._capture.get(cv2.CAP_PROP_FPS) if self._capture.isOpened() else 0
+        super().__init__(fps or source_fps or 30.0, realtime, loop)
+        self._total = int(self._capture.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+        self._decoded = -1  # 解码器当前位置（最近读取的帧序号）
+
+    def is_available(self) -> bool:
+        return self._capture.isOpened()
+
+    def frame_count(self) -> int:
+        return self._total
+
+    def _read_frame(self, index: int) -> Optional[np.ndarray]:
+        if index <= self._decoded:
+            # 循环回放或回退：重新定位
+            self._capture.set(cv2.CAP_PROP_POS_FRAMES, index)
+            self._decoded = index - 1
+
+        # 跳过中间帧时只grab不解码
+        while self._decoded < index - 1:
+            if not self._capture.grab():
+                return None
+            self._decoded += 1
+
+        ok, frame = self._capture.read()
+        if not ok:
+            return None
+        self._decoded = index
+        return frame
+
+    def close(self):
+        self._capture.release()
+
+
+@register_backend("synthetic")
+class SyntheticBackend(ReplayBackend):
+    """合成画面源：渐变背景上若干匀速移动的色块，内容由帧序号确定"""
+
+    def __init__(
+        self,
+        width: int = 1920,
+        height: int = 1080,
+        num_objects: int = 8,
+        fps: float = 30.0,
+        realtime: bool = False,
+        seed: int = 0,
+    ):
+        super().__init__(fps, realtime, loop=True)
+        self.width = width
+        self.height = height
+
+        rng = np.random.default_rng(seed)
+        gradient = np.linspace(40, 200, width, dtype=np.float32).astype(np.uint8)
+        self._background = np.repeat(
+            np.repeat(gradient[None, :, None], height, axis=0), 3, axis=2
+        )
+        self._positions = rng.uniform(0, 1, (num_objects, 2)) * (width, height)
+        self._velocities = rng.uniform(-8, 8, (num_objects, 2))
+        self._sizes = rng.integers(30, 160, (num_objects, 2))
+        self._colors = rng.integers(0, 255, (num_objects, 3))
+        self._frame = np.empty_like(self._background)
+
+    def _read_frame(self, index: int) -> Optional[np.ndarray]:
+        np.copyto(self._frame, self._background)
+        bounds = np.array([self.width, self.height], dtype=np.float64)
+        positions = np.abs((self._positions + self._velocities * index) % (2 * bounds))
+        positions = np.where(positions > bounds, 2 * bounds - positions, positions)
+
+        for (x, y), (w, h), color in zip(
+            positions.astype(int), self._sizes, self._colors
+        ):
+            cv2.rectangle(
+                self._frame,
+                (int(x), int(y)),
+                (int(x + w), int(y + h)),
+                tuple(int(c) for c in color),
+                -1,
+            )
+        return self._frame
+
+    def describe(self) -> Dict[str, Any]:
+        info = super().describe()
+        info.update({"width": self.width, "height": self.height})
+        return info
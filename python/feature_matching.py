@@ -1,6 +1,11 @@
 import cv2
 import numpy as np
 import time
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
 from typing import Optional, Tuple, List, Dict, Any, Union
 import logging
 
@@ -9,6 +14,117 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+def keypoints_to_array(keypoints: List[cv2.KeyPoint]) -> np.ndarray:
+    """将关键点列表转换为 (N, 2) float32 坐标数组"""
+    if not keypoints:
+        return np.empty((0, 2), dtype=np.float32)
+    return cv2.KeyPoint_convert(keypoints).reshape(-1, 2).astype(np.float32)
+
+
+def dmatches_to_arrays(
+    matches: List[cv2.DMatch],
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """将DMatch列表转换为 (查询索引, 训练索引, 距离) 数组"""
+    if not matches:
+        empty = np.empty(0, dtype=np.int32)
+        return empty, empty, np.empty(0, dtype=np.float32)
+    query_idx = np.fromiter((m.queryIdx for m in matches), np.int32, len(matches))
+    train_idx = np.fromiter((m.trainIdx for m in matches), np.int32, len(matches))
+    distances = np.fromiter((m.distance for m in matches), np.float32, len(matches))
+    return query_idx, train_idx, distances
+
+
+class ORBMatchResult(dict):
+    """
+    基于NumPy数组的ORB匹配结果
+    统计信息直接存放在字典中；keypoints1、keypoints2、matches等旧格式字段
+    只在被访问时才由数组转换生成，避免每帧构造成千上万个Python对象
+    """
+
+    LAZY_KEYS = ("keypoints1", "keypoints2", "matches")
+
+    def __init__(
+        self,
+        summary: Dict[str, Any],
+        template_points: np.ndarray,
+        target_points: np.ndarray,
+        query_idx: np.ndarray,
+        train_idx: np.ndarray,
+        distances: np.ndarray,
+        inlier_mask: np.ndarray,
+    ):
+        super().__init__(summary)
+        self.template_points = template_points  # 模板关键点坐标 (N1, 2)
+        self.target_points = target_points  # 目标关键点坐标 (N2, 2)
+        self.query_idx = query_idx  # 匹配的模板关键点索引 (M,)
+        self.train_idx = train_idx  # 匹配的目标关键点索引 (M,)
+        self.distances = distances  # 匹配距离 (M,)
+        self.inlier_mask = inlier_mask  # RANSAC内点掩码 (M,)
+
+    def __missing__(self, key):
+        if key == "keypoints1":
+            value = [tuple(pt) for pt in self.template_points.astype(np.int32).tolist()]
+        elif key == "keypoints2":
+            value = [tuple(pt) for pt in self.target_points.astype(np.int32).tolist()]
+        elif key == "matches":
+            value = list(
+                zip(
+                    self.query_idx.tolist(),
+                    self.train_idx.tolist(),
+                    self.distances.astype(float).tolist(),
+                )
+            )
+        else:
+            raise KeyError(key)
+
+        self[key] = value
+        return value
+
+    def __contains__(self, key) -> bool:
+        return dict.__contains__(self, key) or key in self.LAZY_KEYS
+
+    def get(self, key, default=None):
+        if key in self:
+            return self[key]
+        return default
+
+    def matched_points(self) -> Tuple[np.ndarray, np.ndarray]:
+        """获取所有匹配点对的坐标 (模板点 (M, 2), 目标点 (M, 2))"""
+        return self.template_points[self.query_idx], self.target_points[self.train_idx]
+
+    def inlier_points(self) -> Tuple[np.ndarray, np.ndarray]:
+        """获取RANSAC内点对的坐标 (模板点 (K, 2), 目标点 (K, 2))"""
+        src, dst = self.matched_points()
+        return src[self.inlier_mask], dst[self.inlier_mask]
+
+    def drawable_matches(
+        self, max_matches: int = 50
+    ) -> Tuple[List[cv2.KeyPoint], List[cv2.KeyPoint], List[cv2.DMatch]]:
+        """
+        生成cv2.drawMatches所需的对象，只包含前max_matches个匹配
+
+        Returns:
+            (模板关键点, 目标关键点, 匹配) 列表
+        """
+        count = min(max_matches, len(self.distances))
+        src = self.template_points[self.query_idx[:count]]
+        dst = self.target_points[self.train_idx[:count]]
+
+        kp1 = [cv2.KeyPoint(x, y, 1) for x, y in src.tolist()]
+        kp2 = [cv2.KeyPoint(x, y, 1) for x, y in dst.tolist()]
+        matches = [
+            cv2.DMatch(i, i, distance)
+            for i, distance in enumerate(self.distances[:count].astype(float).tolist())
+        ]
+        return kp1, kp2, matches
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为完整的旧格式结果字典"""
+        for key in self.LAZY_KEYS:
+            self[key]
+        return dict(self)
+
+
 class ORBFeatureMatchingEngine:
     """
     基于OpenCV ORB的特征匹配引擎
@@ -38,6 +154,18 @@ class ORBFeatureMatchingEngine:
             "use_ratio_test": False,  # 对于相同图片，不使用比值测试
             "use_cross_check": False,  # 对于相同图片，不使用交叉检查
             "homography_threshold": 5.0,  # 单应性矩阵RANSAC阈值
+            "tracking": False,  # 跟踪模式：首帧完整匹配，后续帧用光流跟踪内点
+            "track_min_inliers": 12,  # 跟踪内点少于该值时重新检测
+            "track_max_reprojection_error": 3.0,  # 平均重投影误差超过该值时重新检测
+            "track_max_frames": 30,  # 连续跟踪的最大帧数，到达后重新完整匹配（0表示不限制）
+            "track_motion_model": "similarity",  # 跟踪时估计的变换: similarity（平移+旋转+等比缩放）, homography
+            "track_max_anisotropy": 0.15,  # 变换的各向异性（非等比缩放/错切）超过该值时视为几何失真
+            "track_max_scale_change": 0.2,  # 跟踪结果相对上一次完整匹配的缩放变化超过该比例时重新检测
+            "track_win_size": 21,  # 光流窗口大小
+            "track_pyramid_levels": 3,  # 光流金字塔层数
+            "track_fb_threshold": 1.0,  # 前后向光流一致性误差阈值（像素）
+            "track_search_margin": 96,  # 光流只在跟踪点外扩该边距的区域内计算
+            "track_stream": "",  # 跟踪流标识：同一模板在不同画面流中分别跟踪
         }
 
         # 匹配器类型
@@ -46,6 +174,23 @@ class ORBFeatureMatchingEngine:
             "FLANN": "FLANN",  # FLANN匹配
         }
 
+        # ORB检测器和匹配器按配置复用（按线程分别缓存，OpenCV算法对象不保证线程安全）
+        self._thread_local = threading.local()
+
+        # 模板特征缓存：(图像内容哈希, ORB参数) -> (关键点, 描述子)
+        self.template_cache_size = 32
+        self._template_features: "OrderedDict[Tuple, Tuple[List, Optional[np.ndarray]]]" = (
+            OrderedDict()
+        )
+        self._template_cache_lock = threading.Lock()
+        self.template_cache_stats = {"hits": 0, "misses": 0}
+
+        # 跟踪状态：(跟踪流标识, 模板内容哈希) -> 上一帧灰度图和跟踪中的点
+        self.max_track_states = 16
+        self._track_states: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+        self._track_lock = threading.Lock()
+        self.track_stats = {"tracked": 0, "redetected": 0}
+
     def create_orb_detector(self, config: Dict[str, Any] = None) -> cv2.ORB:
         """
         创建ORB检测器
@@ -80,6 +225,147 @@ class ORBFeatureMatchingEngine:
 
         return orb
 
+    def _merge_orb_config(self, config: Dict[str, Any] = None) -> Dict[str, Any]:
+        """合并默认ORB配置"""
+        orb_config = self.default_orb_config.copy()
+        if config:
+            orb_config.update(config)
+        return orb_config
+
+    @staticmethod
+    def _orb_config_key(orb_config: Dict[str, Any]) -> Tuple:
+        """ORB参数缓存键（只包含ORB检测器相关参数）"""
+        return tuple(
+            (name, orb_config[name])
+            for name in (
+                "nfeatures",
+                "scaleFactor",
+                "nlevels",
+                "edgeThreshold",
+                "firstLevel",
+                "WTA_K",
+                "scoreType",
+                "patchSize",
+                "fastThreshold",
+            )
+        )
+
+    def get_orb_detector(self, config: Dict[str, Any] = None) -> cv2.ORB:
+        """
+        获取按配置复用的ORB检测器
+
+        Args:
+            config: ORB配置参数
+
+        Returns:
+            当前线程中与配置对应的ORB检测器
+        """
+        orb_config = self._merge_orb_config(config)
+        key = self._orb_config_key(orb_config)
+
+        detectors = getattr(self._thread_local, "detectors", None)
+        if detectors is None:
+            detectors = self._thread_local.detectors = {}
+
+        orb = detectors.get(key)
+        if orb is None:
+            orb = self.create_orb_detector(orb_config)
+            detectors[key] = orb
+        return orb
+
+    def get_matcher(
+        self, matcher_type: str = "BF", cross_check: bool = True
+    ) -> Union[cv2.BFMatcher, cv2.FlannBasedMatcher]:
+        """
+        获取按配置复用的特征匹配器
+
+        Args:
+            matcher_type: 匹配器类型 ('BF' 或 'FLANN')
+            cross_check: 是否启用交叉检查
+
+        Returns:
+            当前线程中与配置对应的匹配器
+        """
+        matchers = getattr(self._thread_local, "matchers", None)
+        if matchers is None:
+            matchers = self._thread_local.matchers = {}
+
+        key = (matcher_type, bool(cross_check))
+        matcher = matchers.get(key)
+        if matcher is None:
+            matcher = self.create_matcher(matcher_type, cross_check)
+            matchers[key] = matcher
+        return matcher
+
+    @staticmethod
+    def image_content_hash(image: np.ndarray) -> str:
+        """计算图像内容哈希（包含尺寸和数据类型）"""
+        data = np.ascontiguousarray(image)
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f"{data.shape}{data.dtype}".encode())
+        digest.update(data.data)
+        return digest.hexdigest()
+
+    def get_template_features(
+        self, template_image: np.ndarray, orb_config: Dict[str, Any] = None
+    ) -> Tuple[List, Optional[np.ndarray]]:
+        """
+        获取模板的关键点和描述子（带缓存）
+        模板在实时检测的各帧之间不会变化，只需首帧计算一次
+
+        Args:
+            template_image: 模板图像
+            orb_config: ORB配置参数
+
+        Returns:
+            关键点列表和描述子数组
+        """
+        key = (
+            self.image_content_hash(template_image),
+            self._orb_config_key(self._merge_orb_config(orb_config)),
+        )
+
+        with self._template_cache_lock:
+            cached = self._template_features.get(key)
+            if cached is not None:
+                self._template_features.move_to_end(key)
+                self.template_cache_stats["hits"] += 1
+                return cached
+
+        features = self.detect_and_compute(template_image, orb_config)
+
+        with self._template_cache_lock:
+            self.template_cache_stats["misses"] += 1
+            self._template_features[key] = features
+            while len(self._template_features) > self.template_cache_size:
+                self._template_features.popitem(last=False)
+
+        return features
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """
+        获取模板特征缓存统计
+
+        Returns:
+            包含命中次数、未命中次数、命中率和缓存条目数的字典
+        """
+        with self._template_cache_lock:
+            hits = self.template_cache_stats["hits"]
+            misses = self.template_cache_stats["misses"]
+            return {
+                "hits": hits,
+                "misses": misses,
+                "hit_ratio": hits / (hits + misses) if hits + misses > 0 else 0.0,
+                "size": len(self._template_features),
+                "max_size": self.template_cache_size,
+            }
+
+    def clear_template_cache(self):
+        """清空模板特征缓存"""
+        with self._template_cache_lock:
+            self._template_features.clear()
+            self.template_cache_stats = {"hits": 0, "misses": 0}
+
     def create_matcher(
         self, matcher_type: str = "BF", cross_check: bool = True
     ) -> Union[cv2.BFMatcher, cv2.FlannBasedMatcher]:
@@ -115,7 +401,10 @@ class ORBFeatureMatchingEngine:
         return matcher
 
     def detect_and_compute(
-        self, image: np.ndarray, orb_config: Dict[str, Any] = None
+        self,
+        image: np.ndarray,
+        orb_config: Dict[str, Any] = None,
+        mask: Optional[np.ndarray] = None,
     ) -> Tuple[List, np.ndarray]:
         """
         检测关键点并计算描述子
@@ -123,11 +412,12 @@ class ORBFeatureMatchingEngine:
         Args:
             image: 输入图像
             orb_config: ORB配置参数
+            mask: 检测区域掩码（非零像素处才检测关键点），None表示整幅图像
 
         Returns:
             关键点列表和描述子数组
         """
-        orb = self.create_orb_detector(orb_config)
+        orb = self.get_orb_detector(orb_config)
 
         # 转换为灰度图像
         if len(image.shape) == 3:
@@ -156,7 +446,7 @@ class ORBFeatureMatchingEngine:
             )
 
         # 检测关键点并计算描述子
-        keypoints, descriptors = orb.detectAndCompute(gray, None)
+        keypoints, descriptors = orb.detectAndCompute(gray, mask)
 
         logger.info(f"检测到 {len(keypoints)} 个关键点")
 
@@ -176,8 +466,8 @@ class ORBFeatureMatchingEngine:
                 }
             )
 
-            loose_orb = self.create_orb_detector(loose_config)
-            keypoints, descriptors = loose_orb.detectAndCompute(gray, None)
+            loose_orb = self.get_orb_detector(loose_config)
+            keypoints, descriptors = loose_orb.detectAndCompute(gray, mask)
             logger.info(f"宽松参数检测到 {len(keypoints)} 个关键点")
 
         return keypoints, descriptors
@@ -187,6 +477,7 @@ class ORBFeatureMatchingEngine:
         template_image: np.ndarray,
         target_image: np.ndarray,
         config: Dict[str, Any] = None,
+        cancel_event: Optional[threading.Event] = None,
     ) -> Optional[Dict[str, Any]]:
         """
         执行ORB特征匹配
@@ -195,6 +486,7 @@ class ORBFeatureMatchingEngine:
             template_image: 模板图像
             target_image: 目标图像
             config: 匹配配置参数
+            cancel_event: 取消事件，置位后不再重试并返回None（重试等待也会被立即打断）
 
         Returns:
             匹配结果字典，未找到匹配则返回None
@@ -206,10 +498,17 @@ class ORBFeatureMatchingEngine:
         match_config = self.default_match_config.copy()
         match_config.update(config)
 
+        if match_config.get("tracking", False):
+            return self.track_features(template_image, target_image, match_config)
+
         max_retries = match_config.get("max_retries", 3)
         retry_delay = match_config.get("retry_delay", 1.0)
 
         for attempt in range(max_retries):
+            if cancel_event is not None and cancel_event.is_set():
+                logger.info("ORB匹配已取消")
+                return None
+
             try:
                 logger.info(f"ORB特征匹配尝试 {attempt + 1}/{max_retries}")
 
@@ -228,17 +527,368 @@ class ORBFeatureMatchingEngine:
                     logger.info(
                         f"第 {attempt + 1} 次尝试失败，{retry_delay}秒后重试..."
                     )
-                    time.sleep(retry_delay)
+                    if self._wait_retry(retry_delay, cancel_event):
+                        logger.info("ORB匹配已取消")
+                        return None
 
             except Exception as e:
                 logger.error(f"ORB匹配过程中发生错误: {e}")
-                if attempt < max_retries - 1:
-                    time.sleep(retry_delay)
+                if attempt < max_retries - 1 and self._wait_retry(
+                    retry_delay, cancel_event
+                ):
+                    logger.info("ORB匹配已取消")
+                    return None
                 continue
 
         logger.warning("所有ORB匹配重试都失败")
         return None
 
+    @staticmethod
+    def _wait_retry(delay: float, cancel_event: Optional[threading.Event]) -> bool:
+        """等待重试间隔，返回等待期间是否被取消"""
+        if cancel_event is None:
+            time.sleep(delay)
+            return False
+        return cancel_event.wait(delay)
+
+    def track_features(
+        self,
+        template_image: np.ndarray,
+        target_image: np.ndarray,
+        config: Dict[str, Any] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        跟踪模式的ORB匹配
+        首帧执行完整ORB匹配，之后用金字塔LK光流跟踪上一帧的内点并重新估计单应性矩阵；
+        内点数量不足或重投影误差过大时自动回退到完整匹配。
+        跟踪状态按 (track_stream, 模板) 区分，不同画面流跟踪同一模板时互不覆盖
+
+        Args:
+            template_image: 模板图像
+            target_image: 当前帧图像
+            config: 匹配配置参数
+
+        Returns:
+            匹配结果字典（带 tracked 字段标记本帧是否来自跟踪），未找到匹配则返回None
+        """
+        match_config = self.default_match_config.copy()
+        if config:
+            match_config.update(config)
+
+        try:
+            key = (
+                str(match_config.get("track_stream", "")),
+                self.image_content_hash(template_image),
+            )
+            gray = self._to_gray(target_image)
+
+            with self._track_lock:
+                state = self._track_states.get(key)
+
+            max_frames = match_config.get("track_max_frames", 0)
+            if (
+                state is not None
+                and state["prev_gray"].shape == gray.shape
+                and not (max_frames and state["frames"] >= max_frames)
+            ):
+                tracked = self._track_step(state, gray, template_image, match_config)
+                if tracked is not None:
+                    result, next_state = tracked
+                    with self._track_lock:
+                        self.track_stats["tracked"] += 1
+                        self._store_track_state(key, next_state)
+                    return result
+
+            # 没有跟踪状态或跟踪质量下降：完整匹配并重新初始化跟踪点
+            result = self._attempt_orb_matching(
+                template_image, target_image, match_config
+            )
+
+            # 几何失真的完整匹配结果不作为跟踪起点，否则跟踪会一直锁定在错误的位置上
+            geometry = None
+            if result is not None and result["num_inliers"] >= 4:
+                geometry = self._check_track_geometry(
+                    result.get("homography"), template_image.shape[:2], None, match_config
+                )
+
+            with self._track_lock:
+                self.track_stats["redetected"] += 1
+                if geometry is None:
+                    self._track_states.pop(key, None)
+                else:
+                    src_pts, dst_pts = result.inlier_points()
+                    self._store_track_state(
+                        key,
+                        {
+                            "prev_gray": gray,
+                            "template_points": src_pts,
+                            "target_points": dst_pts,
+                            "distances": result.distances[result.inlier_mask],
+                            "reference_scale": geometry,
+                            "frames": 0,
+                        },
+                    )
+
+            if result is not None:
+                result["tracked"] = False
+            return result
+
+        except Exception as e:
+            logger.error(f"ORB跟踪匹配失败: {e}")
+            return None
+
+    def _store_track_state(self, key: Tuple[str, str], state: Dict[str, Any]):
+        """保存跟踪状态，超过 max_track_states 时淘汰最久未使用的（调用方持有 _track_lock）"""
+        self._track_states[key] = state
+        self._track_states.move_to_end(key)
+        while len(self._track_states) > self.max_track_states:
+            self._track_states.popitem(last=False)
+
+    def _track_step(
+        self,
+        state: Dict[str, Any],
+        gray: np.ndarray,
+        template_image: np.ndarray,
+        config: Dict[str, Any],
+    ) -> Optional[Tuple["ORBMatchResult", Dict[str, Any]]]:
+        """
+        用光流把上一帧的跟踪点推进到当前帧
+
+        Args:
+            state: 跟踪状态（只读，更新后的状态由调用方在锁内保存）
+            gray: 当前帧灰度图
+            template_image: 模板图像
+            config: 匹配配置
+
+        Returns:
+            (跟踪得到的匹配结果, 下一帧的跟踪状态)，跟踪质量不满足要求时返回None
+        """
+        min_inliers = max(4, config.get("track_min_inliers", 12))
+        win_size = config.get("track_win_size", 21)
+        lk_params = dict(
+            winSize=(win_size, win_size),
+            maxLevel=config.get("track_pyramid_levels", 3),
+            criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 30, 0.01),
+        )
+
+        # 光流只在跟踪点附近的区域内计算，避免为整帧构建金字塔
+        margin = config.get("track_search_margin", 96)
+        height, width = gray.shape[:2]
+        min_x, min_y = np.floor(state["target_points"].min(axis=0)).astype(int) - margin
+        max_x, max_y = np.ceil(state["target_points"].max(axis=0)).astype(int) + margin
+        x0, y0 = max(int(min_x), 0), max(int(min_y), 0)
+        x1, y1 = min(int(max_x), width), min(int(max_y), height)
+        if x1 - x0 < win_size or y1 - y0 < win_size:
+            return None
+
+        prev_roi = state["prev_gray"][y0:y1, x0:x1]
+        curr_roi = gray[y0:y1, x0:x1]
+        offset = np.float32([x0, y0])
+
+        prev_pts = (state["target_points"] - offset).reshape(-1, 1, 2)
+        next_pts, status, _ = cv2.calcOpticalFlowPyrLK(
+            prev_roi, curr_roi, prev_pts, None, **lk_params
+        )
+        if next_pts is None:
+            return None
+
+        # 前后向一致性检查，剔除跟踪漂移的点
+        back_pts, back_status, _ = cv2.calcOpticalFlowPyrLK(
+            curr_roi, prev_roi, next_pts, None, **lk_params
+        )
+        fb_error = np.linalg.norm((prev_pts - back_pts).reshape(-1, 2), axis=1)
+        valid = (
+            (status.ravel() == 1)
+            & (back_status.ravel() == 1)
+            & (fb_error < config.get("track_fb_threshold", 1.0))
+        )
+
+        num_tracked = int(np.count_nonzero(valid))
+        if num_tracked < min_inliers:
+            logger.info(f"跟踪点不足 ({num_tracked})，重新检测")
+            return None
+
+        src_pts = state["template_points"][valid]
+        dst_pts = next_pts.reshape(-1, 2)[valid] + offset
+        distances = state["distances"][valid]
+
+        # 屏幕上的目标基本只有平移和缩放，默认估计相似变换：
+        # 跟踪点集中在模板局部时，单应性矩阵外推到模板角点会明显失真
+        if config.get("track_motion_model", "similarity") == "homography":
+            homography, mask = cv2.findHomography(
+                src_pts.reshape(-1, 1, 2),
+                dst_pts.reshape(-1, 1, 2),
+                cv2.RANSAC,
+                config.get("homography_threshold", 5.0),
+            )
+        else:
+            affine, mask = cv2.estimateAffinePartial2D(
+                src_pts.reshape(-1, 1, 2),
+                dst_pts.reshape(-1, 1, 2),
+                method=cv2.RANSAC,
+                ransacReprojThreshold=config.get("homography_threshold", 5.0),
+            )
+            homography = None if affine is None else np.vstack([affine, [0.0, 0.0, 1.0]])
+        if homography is None or mask is None:
+            return None
+
+        inlier_mask = mask.ravel().astype(bool)
+        num_inliers = int(np.count_nonzero(inlier_mask))
+        if num_inliers < min_inliers:
+            logger.info(f"跟踪内点不足 ({num_inliers})，重新检测")
+            return None
+
+        # 内点的平均重投影误差
+        projected = cv2.perspectiveTransform(
+            src_pts[inlier_mask].reshape(-1, 1, 2), homography
+        ).reshape(-1, 2)
+        reprojection_error = float(
+            np.linalg.norm(projected - dst_pts[inlier_mask], axis=1).mean()
+        )
+        if reprojection_error > config.get("track_max_reprojection_error", 3.0):
+            logger.info(f"跟踪重投影误差过大 ({reprojection_error:.2f})，重新检测")
+            return None
+
+        # 内点和重投影误差只说明跟踪点彼此一致，还需检查变换本身是否合理
+        if (
+            self._check_track_geometry(
+                homography, template_image.shape[:2], state["reference_scale"], config
+            )
+            is None
+        ):
+            return None
+
+        bounding_box, center_point = self._homography_bounding_box(
+            homography, template_image.shape[:2]
+        )
+        if bounding_box is None:
+            return None
+
+        # 下一帧只跟踪本帧的内点
+        next_state = {
+            "prev_gray": gray,
+            "template_points": src_pts[inlier_mask],
+            "target_points": dst_pts[inlier_mask],
+            "distances": distances[inlier_mask],
+            "reference_scale": state["reference_scale"],
+            "frames": state["frames"] + 1,
+        }
+
+        inlier_ratio = num_inliers / num_tracked
+        confidence = inlier_ratio * 0.7 + min(num_tracked / 100, 1.0) * 0.3
+        indices = np.arange(num_tracked, dtype=np.int32)
+
+        result = ORBMatchResult(
+            {
+                "method": "ORB_features",
+                "num_matches": num_tracked,
+                "num_inliers": num_inliers,
+                "inlier_ratio": float(inlier_ratio),
+                "avg_distance": float(distances.mean()),
+                "confidence": float(confidence),
+                "homography": homography.tolist(),
+                "bounding_box": bounding_box,
+                "center_point": center_point,
+                "template_size": template_image.shape[:2],
+                "target_size": gray.shape[:2],
+                "tracked": True,
+                "reprojection_error": reprojection_error,
+            },
+            template_points=src_pts,
+            target_points=dst_pts,
+            query_idx=indices,
+            train_idx=indices,
+            distances=distances,
+            inlier_mask=inlier_mask,
+        )
+        return result, next_state
+
+    @staticmethod
+    def _check_track_geometry(
+        homography: Any,
+        template_size: Tuple[int, int],
+        reference_scale: Optional[float],
+        config: Dict[str, Any],
+    ) -> Optional[float]:
+        """
+        检查模板到目标图像的变换是否是合理的目标运动
+
+        Args:
+            homography: 单应性矩阵（3x3数组或嵌套列表）
+            template_size: 模板图像尺寸 (h, w)
+            reference_scale: 上一次完整匹配的缩放比例，None时不检查缩放变化
+            config: 匹配配置
+
+        Returns:
+            变换的缩放比例，几何失真（翻转、透视过强、非等比缩放/错切、缩放突变）时返回None
+        """
+        if homography is None:
+            return None
+
+        matrix = np.asarray(homography, dtype=np.float64)
+        if abs(matrix[2, 2]) < 1e-9:
+            return None
+        matrix = matrix / matrix[2, 2]
+
+        # 透视项在模板范围内引起的尺度变化
+        h, w = template_size[:2]
+        if abs(matrix[2, 0]) * w + abs(matrix[2, 1]) * h > config.get("track_max_anisotropy", 0.15):
+            logger.info("变换透视失真，重新检测")
+            return None
+
+        linear = matrix[:2, :2]
+        if np.linalg.det(linear) <= 0:
+            logger.info("变换发生翻转，重新检测")
+            return None
+
+        # 奇异值之比反映非等比缩放和错切
+        largest, smallest = np.linalg.svd(linear, compute_uv=False)
+        anisotropy = largest / smallest - 1.0
+        if anisotropy > config.get("track_max_anisotropy", 0.15):
+            logger.info(f"变换各向异性过大 ({anisotropy:.2f})，重新检测")
+            return None
+
+        scale = float(np.sqrt(largest * smallest))
+        if reference_scale is not None and abs(scale / reference_scale - 1.0) > config.get(
+            "track_max_scale_change", 0.2
+        ):
+            logger.info(f"跟踪缩放变化过大 ({scale / reference_scale:.2f})，重新检测")
+            return None
+
+        return scale
+
+    @staticmethod
+    def _to_gray(image: np.ndarray) -> np.ndarray:
+        """转换为灰度图像"""
+        if image.ndim == 3:
+            return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        return image
+
+    def reset_tracking(
+        self, template_image: Optional[np.ndarray] = None, stream: Optional[str] = None
+    ):
+        """
+        重置跟踪状态，下一帧将执行完整匹配
+
+        Args:
+            template_image: 只重置该模板的跟踪状态；为None时不按模板筛选
+            stream: 只重置该跟踪流（track_stream）的状态；为None时不按跟踪流筛选
+        """
+        with self._track_lock:
+            if template_image is None and stream is None:
+                self._track_states.clear()
+                self.track_stats = {"tracked": 0, "redetected": 0}
+                return
+
+            template_hash = (
+                self.image_content_hash(template_image) if template_image is not None else None
+            )
+            for key in list(self._track_states):
+                if (stream is None or key[0] == str(stream)) and (
+                    template_hash is None or key[1] == template_hash
+                ):
+                    del self._track_states[key]
+
     def _attempt_orb_matching(
         self,
         template_image: np.ndarray,
@@ -258,20 +908,10 @@ class ORBFeatureMatchingEngine:
         """
         try:
             # 获取ORB配置参数
-            orb_config = {
-                "nfeatures": config.get("nfeatures", 1000),
-                "scaleFactor": config.get("scaleFactor", 1.2),
-                "nlevels": config.get("nlevels", 8),
-                "edgeThreshold": config.get("edgeThreshold", 31),
-                "firstLevel": config.get("firstLevel", 0),
-                "WTA_K": config.get("WTA_K", 2),
-                "scoreType": config.get("scoreType", cv2.ORB_HARRIS_SCORE),
-                "patchSize": config.get("patchSize", 31),
-                "fastThreshold": config.get("fastThreshold", 20),
-            }
+            orb_config = self._extract_orb_config(config)
 
-            # 检测关键点和描述子
-            kp1, des1 = self.detect_and_compute(template_image, orb_config)
+            # 检测关键点和描述子（模板特征走缓存，只有目标图像每帧计算）
+            kp1, des1 = self.get_template_features(template_image, orb_config)
             kp2, des2 = self.detect_and_compute(target_image, orb_config)
 
             logger.info(
@@ -289,32 +929,27 @@ class ORBFeatureMatchingEngine:
                 logger.warning(f"描述子数量不足: 模板{len(des1)}, 目标{len(des2)}")
                 return None
 
-            # 创建匹配器
-            matcher_type = config.get("matcher_type", "BF")
-            use_cross_check = config.get("use_cross_check", True)
-            matcher = self.create_matcher(matcher_type, use_cross_check)
-
-            # 执行匹配
-            if (
-                config.get("use_ratio_test", True)
-                and matcher_type == "BF"
-                and not use_cross_check
-            ):
-                # 使用比值测试（与交叉检查互斥）
-                matches = self._ratio_test_matching(matcher, des1, des2, config)
-            else:
-                # 直接匹配
-                matches = matcher.match(des1, des2)
+            # 执行匹配，结果为查询索引、训练索引和距离数组
+            query_idx, train_idx, distances = self._match_descriptor_arrays(
+                des1, des2, config
+            )
 
-            logger.info(f"初始匹配数量: {len(matches)}")
+            logger.info(f"初始匹配数量: {len(distances)}")
 
-            if len(matches) < config.get("min_matches", 10):
-                logger.warning(f"匹配点数量不足: {len(matches)}")
+            if len(distances) < config.get("min_matches", 10):
+                logger.warning(f"匹配点数量不足: {len(distances)}")
                 return None
 
             # 计算匹配质量和位置
-            result = self._analyze_matches(
-                kp1, kp2, matches, template_image, target_image, config
+            result = self._analyze_match_arrays(
+                keypoints_to_array(kp1),
+                keypoints_to_array(kp2),
+                query_idx,
+                train_idx,
+                distances,
+                template_image.shape[:2],
+                target_image.shape[:2],
+                config,
             )
 
             return result
@@ -323,13 +958,75 @@ class ORBFeatureMatchingEngine:
             logger.error(f"ORB匹配尝试失败: {e}")
             return None
 
+    @staticmethod
+    def _extract_orb_config(config: Dict[str, Any]) -> Dict[str, Any]:
+        """从匹配配置中提取ORB检测器参数"""
+        return {
+            "nfeatures": config.get("nfeatures", 1000),
+            "scaleFactor": config.get("scaleFactor", 1.2),
+            "nlevels": config.get("nlevels", 8),
+            "edgeThreshold": config.get("edgeThreshold", 31),
+            "firstLevel": config.get("firstLevel", 0),
+            "WTA_K": config.get("WTA_K", 2),
+            "scoreType": config.get("scoreType", cv2.ORB_HARRIS_SCORE),
+            "patchSize": config.get("patchSize", 31),
+            "fastThreshold": config.get("fastThreshold", 20),
+        }
+
+    def _match_descriptor_arrays(
+        self, des1: np.ndarray, des2: np.ndarray, config: Dict[str, Any]
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        匹配两组描述子，结果以数组形式返回
+
+        Args:
+            des1: 模板描述子
+            des2: 目标描述子
+            config: 匹配配置
+
+        Returns:
+            (查询索引, 训练索引, 距离) 三个数组
+        """
+        matcher_type = config.get("matcher_type", "BF")
+        use_cross_check = config.get("use_cross_check", True)
+        matcher = self.get_matcher(matcher_type, use_cross_check)
+
+        if (
+            config.get("use_ratio_test", True)
+            and matcher_type == "BF"
+            and not use_cross_check
+        ):
+            # 使用比值测试（与交叉检查互斥）
+            return self._ratio_test_matching(matcher, des1, des2, config)
+
+        if matcher_type == "BF":
+            # 暴力匹配直接计算最近邻距离矩阵，避免生成DMatch对象
+            distances, indices = cv2.batchDistance(
+                des1,
+                des2,
+                cv2.CV_32S,
+                normType=cv2.NORM_HAMMING,
+                K=1,
+                crosscheck=bool(use_cross_check),
+            )
+            train_idx = indices[:, 0]
+            query_idx = np.flatnonzero(train_idx >= 0).astype(np.int32)
+            return (
+                query_idx,
+                train_idx[query_idx].astype(np.int32),
+                distances[query_idx, 0].astype(np.float32),
+            )
+
+        # FLANN匹配器只能返回DMatch列表，在此一次性转换为数组
+        return dmatches_to_arrays(matcher.match(des1, des2))
+
     def _ratio_test_matching(
         self,
-        matcher: cv2.BFMatcher,
+        matcher: Union[cv2.BFMatcher, cv2.FlannBasedMatcher],
         des1: np.ndarray,
         des2: np.ndarray,
         config: Dict[str, Any],
-    ) -> List[cv2.DMatch]:
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
         """
         使用比值测试进行匹配
 
@@ -340,24 +1037,47 @@ class ORBFeatureMatchingEngine:
             config: 配置参数
 
         Returns:
-            过滤后的匹配点列表
+            通过比值测试的 (查询索引, 训练索引, 距离) 数组
         """
-        # 获取每个描述子的两个最佳匹配
-        raw_matches = matcher.knnMatch(des1, des2, k=2)
-
-        # 应用比值测试
         ratio_threshold = config.get("distance_threshold", 0.75)
-        good_matches = []
 
-        for match_pair in raw_matches:
-            if len(match_pair) == 2:
-                m, n = match_pair
-                if m.distance < ratio_threshold * n.distance:
-                    good_matches.append(m)
+        if isinstance(matcher, cv2.BFMatcher):
+            # 获取每个描述子的两个最近邻（距离矩阵形式）
+            distances, indices = cv2.batchDistance(
+                des1, des2, cv2.CV_32S, normType=cv2.NORM_HAMMING, K=2
+            )
+            if indices.shape[1] < 2:
+                empty = np.empty(0, dtype=np.int32)
+                return empty, empty, np.empty(0, dtype=np.float32)
 
-        logger.info(f"比值测试过滤: {len(raw_matches)} -> {len(good_matches)}")
+            distances = distances.astype(np.float32)
+            valid = (indices[:, 1] >= 0) & (
+                distances[:, 0] < ratio_threshold * distances[:, 1]
+            )
+            query_idx = np.flatnonzero(valid).astype(np.int32)
+            result = (
+                query_idx,
+                indices[query_idx, 0].astype(np.int32),
+                distances[query_idx, 0],
+            )
+            total = len(indices)
+        else:
+            raw_matches = matcher.knnMatch(des1, des2, k=2)
+            pairs = [pair for pair in raw_matches if len(pair) == 2]
+            if pairs:
+                best, second = zip(*pairs)
+                query_idx, train_idx, best_distances = dmatches_to_arrays(best)
+                second_distances = np.float32([m.distance for m in second])
+                keep = best_distances < ratio_threshold * second_distances
+                result = (query_idx[keep], train_idx[keep], best_distances[keep])
+            else:
+                empty = np.empty(0, dtype=np.int32)
+                result = (empty, empty, np.empty(0, dtype=np.float32))
+            total = len(raw_matches)
 
-        return good_matches
+        logger.info(f"比值测试过滤: {total} -> {len(result[0])}")
+
+        return result
 
     def _analyze_matches(
         self,
@@ -369,7 +1089,7 @@ class ORBFeatureMatchingEngine:
         config: Dict[str, Any],
     ) -> Dict[str, Any]:
         """
-        分析匹配结果
+        分析匹配结果（兼容关键点/DMatch列表输入）
 
         Args:
             kp1: 模板关键点
@@ -382,94 +1102,106 @@ class ORBFeatureMatchingEngine:
         Returns:
             分析结果字典
         """
+        query_idx, train_idx, distances = dmatches_to_arrays(matches)
+        return self._analyze_match_arrays(
+            keypoints_to_array(kp1),
+            keypoints_to_array(kp2),
+            query_idx,
+            train_idx,
+            distances,
+            template_image.shape[:2],
+            target_image.shape[:2],
+            config,
+        )
+
+    def _analyze_match_arrays(
+        self,
+        template_points: np.ndarray,
+        target_points: np.ndarray,
+        query_idx: np.ndarray,
+        train_idx: np.ndarray,
+        distances: np.ndarray,
+        template_size: Tuple[int, int],
+        target_size: Tuple[int, int],
+        config: Dict[str, Any],
+    ) -> "ORBMatchResult":
+        """
+        分析匹配结果（向量化）
+
+        Args:
+            template_points: 模板关键点坐标 (N1, 2)
+            target_points: 目标关键点坐标 (N2, 2)
+            query_idx: 匹配的模板关键点索引
+            train_idx: 匹配的目标关键点索引
+            distances: 匹配距离
+            template_size: 模板图像尺寸 (h, w)
+            target_size: 目标图像尺寸 (h, w)
+            config: 配置参数
+
+        Returns:
+            基于数组的匹配结果
+        """
+        total_matches = len(distances)
+
         # 提取匹配点坐标
-        src_pts = np.float32([kp1[m.queryIdx].pt for m in matches]).reshape(-1, 1, 2)
-        dst_pts = np.float32([kp2[m.trainIdx].pt for m in matches]).reshape(-1, 1, 2)
+        src_pts = template_points[query_idx].reshape(-1, 1, 2)
+        dst_pts = target_points[train_idx].reshape(-1, 1, 2)
 
         # 计算单应性矩阵
         homography = None
-        inliers_mask = None
-        num_inliers = 0
+        inlier_mask = np.zeros(total_matches, dtype=bool)
 
-        if len(matches) >= 4:
+        if total_matches >= 4:
             try:
-                homography, inliers_mask = cv2.findHomography(
+                homography, mask = cv2.findHomography(
                     src_pts,
                     dst_pts,
                     cv2.RANSAC,
                     config.get("homography_threshold", 5.0),
                 )
 
-                if inliers_mask is not None:
-                    num_inliers = np.sum(inliers_mask)
+                if mask is not None:
+                    inlier_mask = mask.ravel().astype(bool)
 
             except cv2.error as e:
                 logger.warning(f"单应性矩阵计算失败: {e}")
 
         # 计算匹配质量
-        total_matches = len(matches)
+        num_inliers = int(np.count_nonzero(inlier_mask))
         inlier_ratio = num_inliers / total_matches if total_matches > 0 else 0
 
         # 计算平均匹配距离
-        avg_distance = (
-            np.mean([m.distance for m in matches]) if matches else float("inf")
-        )
+        avg_distance = float(distances.mean()) if total_matches else float("inf")
 
         # 计算置信度（基于内点比例和匹配数量）
         confidence = inlier_ratio * 0.7 + min(total_matches / 100, 1.0) * 0.3
 
         # 计算匹配区域的边界框
-        bounding_box = None
-        center_point = None
-
-        if homography is not None and num_inliers >= 4:
-            h, w = template_image.shape[:2]
-            corners = np.float32([[0, 0], [w, 0], [w, h], [0, h]]).reshape(-1, 1, 2)
-
-            try:
-                transformed_corners = cv2.perspectiveTransform(corners, homography)
-
-                # 计算边界框
-                x_coords = transformed_corners[:, 0, 0]
-                y_coords = transformed_corners[:, 0, 1]
-
-                min_x, max_x = int(np.min(x_coords)), int(np.max(x_coords))
-                min_y, max_y = int(np.min(y_coords)), int(np.max(y_coords))
-
-                bounding_box = {
-                    "left": min_x,
-                    "top": min_y,
-                    "right": max_x,
-                    "bottom": max_y,
-                    "width": max_x - min_x,
-                    "height": max_y - min_y,
-                }
-
-                # 计算中心点
-                center_point = {
-                    "x": int((min_x + max_x) / 2),
-                    "y": int((min_y + max_y) / 2),
-                }
+        bounding_box, center_point = self._homography_bounding_box(
+            homography if num_inliers >= 4 else None, template_size
+        )
 
-            except cv2.error as e:
-                logger.warning(f"透视变换计算失败: {e}")
-
-        result = {
-            "method": "ORB_features",
-            "num_matches": total_matches,
-            "num_inliers": int(num_inliers),
-            "inlier_ratio": float(inlier_ratio),
-            "avg_distance": float(avg_distance),
-            "confidence": float(confidence),
-            "homography": homography.tolist() if homography is not None else None,
-            "bounding_box": bounding_box,
-            "center_point": center_point,
-            "keypoints1": [(int(kp.pt[0]), int(kp.pt[1])) for kp in kp1],
-            "keypoints2": [(int(kp.pt[0]), int(kp.pt[1])) for kp in kp2],
-            "matches": [(m.queryIdx, m.trainIdx, float(m.distance)) for m in matches],
-            "template_size": template_image.shape[:2],
-            "target_size": target_image.shape[:2],
-        }
+        result = ORBMatchResult(
+            {
+                "method": "ORB_features",
+                "num_matches": total_matches,
+                "num_inliers": num_inliers,
+                "inlier_ratio": float(inlier_ratio),
+                "avg_distance": avg_distance,
+                "confidence": float(confidence),
+                "homography": homography.tolist() if homography is not None else None,
+                "bounding_box": bounding_box,
+                "center_point": center_point,
+                "template_size": tuple(template_size),
+                "target_size": tuple(target_size),
+            },
+            template_points=template_points,
+            target_points=target_points,
+            query_idx=query_idx,
+            train_idx=train_idx,
+            distances=distances,
+            inlier_mask=inlier_mask,
+        )
 
         logger.info(
             f"匹配分析完成: 总匹配{total_matches}, 内点{num_inliers}, "
@@ -478,6 +1210,54 @@ class ORBFeatureMatchingEngine:
 
         return result
 
+    @staticmethod
+    def _homography_bounding_box(
+        homography: Optional[np.ndarray], template_size: Tuple[int, int]
+    ) -> Tuple[Optional[Dict[str, int]], Optional[Dict[str, int]]]:
+        """
+        通过单应性矩阵计算模板在目标图像中的边界框和中心点
+
+        Args:
+            homography: 单应性矩阵，None时不计算
+            template_size: 模板图像尺寸 (h, w)
+
+        Returns:
+            (边界框, 中心点)，无法计算时为 (None, None)
+        """
+        if homography is None:
+            return None, None
+
+        h, w = template_size[:2]
+        corners = np.float32([[0, 0], [w, 0], [w, h], [0, h]]).reshape(-1, 1, 2)
+
+        try:
+            transformed_corners = cv2.perspectiveTransform(corners, homography)
+        except cv2.error as e:
+            logger.warning(f"透视变换计算失败: {e}")
+            return None, None
+
+        # 计算边界框
+        min_x, min_y = transformed_corners.reshape(-1, 2).min(axis=0).astype(int)
+        max_x, max_y = transformed_corners.reshape(-1, 2).max(axis=0).astype(int)
+        min_x, min_y, max_x, max_y = int(min_x), int(min_y), int(max_x), int(max_y)
+
+        bounding_box = {
+            "left": min_x,
+            "top": min_y,
+            "right": max_x,
+            "bottom": max_y,
+            "width": max_x - min_x,
+            "height": max_y - min_y,
+        }
+
+        # 计算中心点
+        center_point = {
+            "x": int((min_x + max_x) / 2),
+            "y": int((min_y + max_y) / 2),
+        }
+
+        return bounding_box, center_point
+
     def draw_matches(
         self,
         template_image: np.ndarray,
@@ -500,15 +1280,19 @@ class ORBFeatureMatchingEngine:
             绘制了匹配结果的图像
         """
         try:
-            # 重新创建关键点对象
-            kp1 = [cv2.KeyPoint(x, y, 1) for x, y in match_result["keypoints1"]]
-            kp2 = [cv2.KeyPoint(x, y, 1) for x, y in match_result["keypoints2"]]
-
-            # 重新创建匹配对象
-            matches = [
-                cv2.DMatch(qi, ti, d)
-                for qi, ti, d in match_result["matches"][:max_matches]
-            ]
+            if isinstance(match_result, ORBMatchResult):
+                # 只为需要绘制的匹配创建关键点对象
+                kp1, kp2, matches = match_result.drawable_matches(max_matches)
+            else:
+                # 重新创建关键点对象
+                kp1 = [cv2.KeyPoint(x, y, 1) for x, y in match_result["keypoints1"]]
+                kp2 = [cv2.KeyPoint(x, y, 1) for x, y in match_result["keypoints2"]]
+
+                # 重新创建匹配对象
+                matches = [
+                    cv2.DMatch(qi, ti, d)
+                    for qi, ti, d in match_result["matches"][:max_matches]
+                ]
 
             # 绘制匹配
             img_matches = cv2.drawMatches(
@@ -605,6 +1389,315 @@ class ORBFeatureMatchingEngine:
             return None
 
 
+class ORBTemplateLibrary:
+    """
+    大规模模板库：所有模板的ORB描述子存放在同一个FLANN LSH索引中
+    一次查询当前帧的描述子即可按投票数得到候选模板，只对得票最多的候选做单应性验证
+    """
+
+    FLANN_INDEX_LSH = 6
+
+    def __init__(
+        self,
+        engine: Optional[ORBFeatureMatchingEngine] = None,
+        orb_config: Dict[str, Any] = None,
+        index_params: Dict[str, Any] = None,
+    ):
+        self.engine = engine
+        self.orb_config = (self.engine or orb_matcher)._merge_orb_config(orb_config)
+        self.index_params = {
+            "algorithm": self.FLANN_INDEX_LSH,
+            "table_number": 6,
+            "key_size": 12,
+            "multi_probe_level": 1,
+        }
+        if index_params:
+            self.index_params.update(index_params)
+
+        # 默认查询配置
+        self.default_query_config = {
+            "top_k": 3,  # 做单应性验证的候选模板数量
+            "min_votes": 8,  # 候选模板的最少得票数
+            "distance_threshold": 0.8,  # 比值测试阈值
+            "max_hamming_distance": 64,  # 最近邻的最大汉明距离
+            "min_inliers": 8,  # 验证通过所需的最少内点数
+            "homography_threshold": 5.0,  # 单应性矩阵RANSAC阈值
+            "search_checks": 50,  # FLANN搜索参数
+        }
+
+        self.names: List[str] = []
+        self.template_sizes: List[Tuple[int, int]] = []
+        self._points: List[np.ndarray] = []
+        self._descriptors: List[np.ndarray] = []
+
+        # 合并后的索引数据
+        self._all_points: Optional[np.ndarray] = None
+        self._labels: Optional[np.ndarray] = None
+        self._offsets: Optional[np.ndarray] = None
+        self._index = None
+        self._lock = threading.RLock()
+
+    def _get_engine(self) -> ORBFeatureMatchingEngine:
+        return self.engine or orb_matcher
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def add_template(self, name: str, image: np.ndarray) -> int:
+        """
+        添加模板（索引在下次查询或调用build_index时重建）
+
+        Args:
+            name: 模板名称
+            image: 模板图像
+
+        Returns:
+            模板编号，没有可用描述子时返回-1
+        """
+        keypoints, descriptors = self._get_engine().detect_and_compute(
+            image, self.orb_config
+        )
+        if descriptors is None or len(descriptors) == 0:
+            logger.warning(f"模板 {name} 没有可用的ORB描述子，已跳过")
+            return -1
+
+        with self._lock:
+            self.names.append(name)
+            self.template_sizes.append(tuple(image.shape[:2]))
+            self._points.append(keypoints_to_array(keypoints))
+            self._descriptors.append(descriptors)
+            self._index = None
+            return len(self.names) - 1
+
+    def add_template_file(self, template_path: str, name: str = None) -> int:
+        """
+        从文件添加模板
+
+        Args:
+            template_path: 模板图像路径
+            name: 模板名称，默认使用文件名
+
+        Returns:
+            模板编号，读取失败时返回-1
+        """
+        image = cv2.imread(template_path, cv2.IMREAD_COLOR)
+        if image is None:
+            logger.error(f"无法读取模板图像: {template_path}")
+            return -1
+        return self.add_template(name or os.path.basename(template_path), image)
+
+    def build_index(self):
+        """把所有模板的描述子合并并构建LSH索引"""
+        with self._lock:
+            if not self._descriptors:
+                self._index = None
+                return
+
+            descriptors = np.ascontiguousarray(np.vstack(self._descriptors))
+            self._all_points = np.vstack(self._points)
+            self._labels = np.repeat(
+                np.arange(len(self._descriptors), dtype=np.int32),
+                [len(d) for d in self._descriptors],
+            )
+            self._offsets = np.concatenate(
+                [[0], np.cumsum([len(d) for d in self._descriptors])]
+            ).astype(np.int32)
+
+            start_time = time.time()
+            self._index = cv2.flann_Index(descriptors, self.index_params)
+            logger.info(
+                f"模板库索引构建完成: {len(self.names)} 个模板, "
+                f"{len(descriptors)} 个描述子, 耗时 {time.time() - start_time:.3f}s"
+            )
+
+    def query(
+        self, frame: np.ndarray, config: Dict[str, Any] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        在当前帧中查找模板库中的模板
+
+        Args:
+            frame: 当前帧图像
+            config: 查询配置
+
+        Returns:
+            验证通过的匹配结果列表（按置信度降序），每项带 template_name、template_id、votes 字段
+        """
+        query_config = self.default_query_config.copy()
+        if config:
+            query_config.update(config)
+
+        try:
+            # 当前帧的特征提取是查询中最耗时的一步，在锁外进行，并发查询互不阻塞
+            engine = self._get_engine()
+            keypoints, descriptors = engine.detect_and_compute(frame, self.orb_config)
+            if descriptors is None or len(descriptors) < 4:
+                return []
+
+            # 锁内只做索引查找和投票，并取出本次查询使用的索引数据（重建索引会替换这些数组）
+            with self._lock:
+                if self._index is None:
+                    self.build_index()
+                if self._index is None:
+                    logger.warning("模板库为空")
+                    return []
+
+                indices, distances = self._index.knnSearch(
+                    descriptors,
+                    2,
+                    params={"checks": query_config["search_checks"]},
+                )
+                all_points, labels, offsets = self._all_points, self._labels, self._offsets
+                names = list(self.names)
+                template_sizes = list(self.template_sizes)
+
+                # 比值测试 + 最大距离过滤，剩下的最近邻为模板投票
+                distances = distances.astype(np.float32)
+                nearest = indices[:, 0]
+                valid = (
+                    (nearest >= 0)
+                    & (nearest < len(labels))
+                    & (distances[:, 0] <= query_config["max_hamming_distance"])
+                    & (
+                        (indices[:, 1] < 0)
+                        | (
+                            distances[:, 0]
+                            < query_config["distance_threshold"] * distances[:, 1]
+                        )
+                    )
+                )
+                frame_idx = np.flatnonzero(valid).astype(np.int32)
+                library_idx = nearest[frame_idx]
+                owners = labels[library_idx]
+
+                votes = np.bincount(owners, minlength=len(offsets) - 1)
+                candidates = np.argsort(-votes, kind="stable")[: query_config["top_k"]]
+                candidates = candidates[votes[candidates] >= query_config["min_votes"]]
+
+            frame_points = keypoints_to_array(keypoints)
+            frame_size = frame.shape[:2]
+            results = []
+
+            for template_id in candidates:
+                selected = owners == template_id
+                start = offsets[template_id]
+                end = offsets[template_id + 1]
+
+                result = engine._analyze_match_arrays(
+                    all_points[start:end],
+                    frame_points,
+                    (library_idx[selected] - start).astype(np.int32),
+                    frame_idx[selected],
+                    distances[frame_idx[selected], 0],
+                    template_sizes[template_id],
+                    frame_size,
+                    query_config,
+                )
+                if (
+                    result["num_inliers"] < query_config["min_inliers"]
+                    or result["bounding_box"] is None
+                ):
+                    continue
+
+                result["template_id"] = int(template_id)
+                result["template_name"] = names[template_id]
+                result["votes"] = int(votes[template_id])
+                results.append(result)
+
+            results.sort(key=lambda r: r["confidence"], reverse=True)
+            logger.info(
+                f"模板库查询完成: 候选 {len(candidates)} 个, 验证通过 {len(results)} 个"
+            )
+            return results
+
+        except Exception as e:
+            logger.error(f"模板库查询失败: {e}")
+            return []
+
+    def save(self, path: str) -> bool:
+        """
+        保存模板库到磁盘（关键点坐标、描述子和元数据）
+        OpenCV的LSH索引文件加载后无法安全使用，因此不保存索引本身；
+        加载时从描述子重建LSH哈希表，开销远小于重新对所有模板做ORB检测
+
+        Args:
+            path: 保存路径（.npz）
+
+        Returns:
+            是否保存成功
+        """
+        try:
+            with self._lock:
+                if self._index is None:
+                    self.build_index()
+                if not self.names:
+                    logger.warning("模板库为空，未保存")
+                    return False
+
+                np.savez_compressed(
+                    path,
+                    names=np.array(self.names),
+                    template_sizes=np.array(self.template_sizes, dtype=np.int32),
+                    descriptors=np.vstack(self._descriptors),
+                    points=self._all_points,
+                    offsets=self._offsets,
+                    orb_config=json.dumps(self.orb_config),
+                    index_params=json.dumps(self.index_params),
+                )
+            logger.info(f"模板库已保存: {path}")
+            return True
+
+        except Exception as e:
+            logger.error(f"保存模板库失败: {e}")
+            return False
+
+    @classmethod
+    def load(
+        cls, path: str, engine: Optional[ORBFeatureMatchingEngine] = None
+    ) -> Optional["ORBTemplateLibrary"]:
+        """
+        从磁盘加载模板库并重建索引
+
+        Args:
+            path: save 保存的 .npz 文件路径
+            engine: 使用的ORB匹配引擎，默认为全局实例
+
+        Returns:
+            模板库，加载失败时返回None
+        """
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                library = cls(
+                    engine,
+                    orb_config=json.loads(str(data["orb_config"])),
+                    index_params=json.loads(str(data["index_params"])),
+                )
+                offsets = data["offsets"]
+                descriptors = data["descriptors"]
+                points = data["points"]
+
+                library.names = [str(name) for name in data["names"]]
+                library.template_sizes = [
+                    tuple(int(v) for v in size) for size in data["template_sizes"]
+                ]
+                library._descriptors = [
+                    descriptors[offsets[i] : offsets[i + 1]]
+                    for i in range(len(library.names))
+                ]
+                library._points = [
+                    points[offsets[i] : offsets[i + 1]]
+                    for i in range(len(library.names))
+                ]
+
+            library.build_index()
+            logger.info(f"模板库已加载: {path}, {len(library)} 个模板")
+            return library
+
+        except Exception as e:
+            logger.error(f"加载模板库失败: {e}")
+            return None
+
+
 # 创建全局实例
 orb_matcher = ORBFeatureMatchingEngine()
 
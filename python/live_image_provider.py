@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+实时图像提供器模块
+把内存中的最新画面通过 image://live/... 地址提供给QML，
+替代每帧保存临时PNG再由QML从磁盘重新加载的方式
+"""
+
+import threading
+from typing import Dict, Tuple
+
+import numpy as np
+from PySide6.QtCore import QSize, Qt
+from PySide6.QtGui import QImage
+from PySide6.QtQuick import QQuickImageProvider
+import logging
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+# ndarray通道数 -> QImage像素格式（OpenCV的BGRA在小端机器上与ARGB32内存布局一致）
+_QIMAGE_FORMATS = {
+    1: QImage.Format_Grayscale8,
+    3: QImage.Format_BGR888,
+    4: QImage.Format_ARGB32,
+}
+
+
+def array_to_qimage(image: np.ndarray) -> QImage:
+    """
+    把OpenCV图像（BGR/BGRA/灰度）转换为QImage
+
+    Args:
+        image: uint8图像数组
+
+    Returns:
+        持有独立像素数据的QImage（源数组之后可以被复用或释放）
+    """
+    channels = 1 if image.ndim == 2 else image.shape[2]
+    if channels not in _QIMAGE_FORMATS:
+        raise ValueError(f"不支持的图像通道数: {channels}")
+
+    if not image.flags["C_CONTIGUOUS"]:
+        image = np.ascontiguousarray(image)
+
+    height, width = image.shape[:2]
+    qimage = QImage(
+        image.data, width, height, image.strides[0], _QIMAGE_FORMATS[channels]
+    )
+    # QImage默认只引用外部缓冲区，复制一份使其独立于源数组
+    return qimage.copy()
+
+
+class LiveImageProvider(QQuickImageProvider):
+    """
+    实时图像提供器
+    每个名称只保留最新一帧，QML通过 image://live/<名称>/<版本号> 请求；
+    版本号只用来让QML在新帧到来时重新请求，提供器总是返回该名称的最新画面
+    """
+
+    PROVIDER_ID = "live"
+
+    def __init__(self):
+        super().__init__(QQuickImageProvider.ImageType.Image)
+        self._lock = threading.Lock()
+        self._images: Dict[str, Tuple[int, QImage]] = {}
+
+    def set_image(self, name: str, image: np.ndarray) -> str:
+        """
+        更新指定名称的最新画面
+
+        Args:
+            name: 画面名称（不含 '/'）
+            image: BGR/BGRA/灰度图像，调用返回后即可复用
+
+        Returns:
+            供QML Image.source使用的版本化地址
+        """
+        qimage = array_to_qimage(image)
+        with self._lock:
+            version = self._images.get(name, (0, None))[0] + 1
+            self._images[name] = (version, qimage)
+        return self.image_url(name, version)
+
+    def clear(self, name: str = None):
+        """清除指定名称（None表示全部）的画面"""
+        with self._lock:
+            if name is None:
+                self._images.clear()
+            else:
+                self._images.pop(name, None)
+
+    def image_url(self, name: str, version: int) -> str:
+        """指定名称和版本号对应的 image:// 地址"""
+        return f"image://{self.PROVIDER_ID}/{name}/{version}"
+
+    def requestImage(self, id: str, size: QSize, requestedSize: QSize) -> QImage:
+        name = id.split("/", 1)[0]
+        with self._lock:
+            entry = self._images.get(name)
+
+        if entry is None:
+            logger.debug(f"请求的实时画面不存在: {id}")
+            return QImage()
+
+        qimage = entry[1]
+        if size is not None:
+            size.setWidth(qimage.width())
+            size.setHeight(qimage.height())
+
+        # QML设置了sourceSize时按请求尺寸缩放，否则直接返回原图（QImage为隐式共享，不复制）
+        if requestedSize.isValid() and requestedSize != qimage.size():
+            return qimage.scaled(
+                requestedSize, Qt.KeepAspectRatio, Qt.SmoothTransformation
+            )
+        return qimage
@@ -0,0 +1,452 @@
+#!/usr/bin/env python3
+"""
+实时检测流水线模块
+为模板匹配、ORB、YOLO+ORB和纯YOLO提供统一的逐帧检测接口：
+帧之间保留引擎的热状态（模板缓存、模板描述子缓存、上一次的位置），
+上一次的位置作为搜索先验，所有算法输出相同格式的检测结果列表
+"""
+
+import cv2
+import numpy as np
+import os
+from typing import Optional, Tuple, List, Dict, Any, Callable, Type, Union
+import logging
+
+from .template_matching import template_matcher
+from .feature_matching import orb_matcher
+from .yolo_orb_matching import yolo_orb_matcher
+from .yolo_matching_pure import (
+    DetectionCache,
+    pure_yolo_matcher,
+    detections_to_array,
+)
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+
+class RealtimePipeline:
+    """
+    实时检测流水线基类
+    process() 返回 (检测结果, 类别表)：检测结果列表的每个结果包含
+    x, y, width, height（帧内物理像素）, confidence, class_id, class_name；
+    纯YOLO直接返回 DETECTION_DTYPE 结构化数组，类别名称随结果一起返回
+    """
+
+    # 算法名称（日志显示用）
+    name = ""
+
+    # 是否需要模板图片
+    requires_template = True
+
+    # 实时检测配置
+    default_realtime_config = {
+        "use_prior": True,  # 先在上一次位置附近搜索，失败再全帧搜索
+        "prior_margin": 64,  # 搜索窗口在上一次位置四周扩展的最小像素
+        "prior_scale": 1.0,  # 搜索窗口按目标尺寸的倍数扩展
+        "min_box_size": 8,  # 检测框宽高小于该像素数时视为退化结果
+        "min_box_visible": 0.5,  # 检测框在帧内的面积比例低于该值时视为越界结果
+    }
+
+    def __init__(self, template_path: str = "", config: Dict[str, Any] = None):
+        self.template_path = template_path
+        self.template_name = (
+            os.path.splitext(os.path.basename(template_path))[0] if template_path else ""
+        )
+        self.template: Optional[np.ndarray] = None
+        self.config: Dict[str, Any] = {}
+        self.last_box: Optional[Tuple[int, int, int, int]] = None
+        self.stats = {
+            "frames": 0,  # 处理的帧数
+            "prior_hits": 0,  # 在先验窗口内找到目标的帧数
+            "full_searches": 0,  # 全帧搜索次数
+            "misses": 0,  # 未找到目标的帧数
+        }
+        self.configure(config)
+
+        if self.requires_template:
+            # 模板只读取一次，后续帧复用（引擎内部再按模板缓存多尺度变体/描述子）
+            self.template = cv2.imread(template_path, cv2.IMREAD_COLOR)
+            if self.template is None:
+                raise ValueError(f"无法读取模板图片: {template_path}")
+
+    def configure(self, config: Dict[str, Any] = None):
+        """更新算法配置（每帧调用开销很小，界面修改参数后立即生效）"""
+        merged = self.default_realtime_config.copy()
+        if config:
+            merged.update(config)
+        self.config = merged
+
+    def reset(self):
+        """清除位置先验和引擎中与本流水线相关的状态"""
+        self.last_box = None
+
+    @property
+    def class_names(self) -> Dict[int, str]:
+        """类别编号 -> 名称（需在调用 process 的线程中读取，见 process 的返回值）"""
+        return {0: self.template_name or self.name}
+
+    def process(
+        self, frame: np.ndarray
+    ) -> Tuple[Union[List[Dict[str, Any]], np.ndarray], Dict[int, str]]:
+        """
+        处理一帧
+
+        Args:
+            frame: BGR图像
+
+        Returns:
+            (检测结果列表或结构化数组, 本帧所用模型的类别编号 -> 名称)
+        """
+        self.stats["frames"] += 1
+        detections = self._process(frame)
+        if len(detections) == 0:
+            self.stats["misses"] += 1
+        # 类别表与检测结果一起取出，后处理可能在另一个线程中进行
+        return detections, self.class_names
+
+    def _process(self, frame: np.ndarray) -> List[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def _prior_window(
+        self, frame_shape: Tuple[int, ...]
+    ) -> Optional[Tuple[int, int, int, int]]:
+        """上一次位置扩展后的搜索窗口 (x0, y0, x1, y1)，没有先验时返回None"""
+        if self.last_box is None or not self.config.get("use_prior", True):
+            return None
+
+        height, width = frame_shape[:2]
+        x, y, w, h = self.last_box
+        margin_x = max(self.config.get("prior_margin", 64), int(w * self.config.get("prior_scale", 1.0)))
+        margin_y = max(self.config.get("prior_margin", 64), int(h * self.config.get("prior_scale", 1.0)))
+        x0, y0 = max(0, x - margin_x), max(0, y - margin_y)
+        x1, y1 = min(width, x + w + margin_x), min(height, y + h + margin_y)
+
+        # 窗口已覆盖整帧时先验没有意义
+        if x0 == 0 and y0 == 0 and x1 == width and y1 == height:
+            return None
+        return x0, y0, x1, y1
+
+    def _valid_box(
+        self, box: Tuple[int, int, int, int], frame_shape: Tuple[int, ...]
+    ) -> bool:
+        """检测框是否可信：不是退化的小框，且大部分位于帧内"""
+        x, y, w, h = box
+        min_size = self.config.get("min_box_size", 8)
+        if w < min_size or h < min_size:
+            return False
+
+        height, width = frame_shape[:2]
+        visible_w = min(x + w, width) - max(x, 0)
+        visible_h = min(y + h, height) - max(y, 0)
+        if visible_w <= 0 or visible_h <= 0:
+            return False
+        return visible_w * visible_h >= self.config.get("min_box_visible", 0.5) * w * h
+
+    def _search_with_prior(
+        self,
+        frame: np.ndarray,
+        match: Callable[[np.ndarray], Optional[Dict[str, Any]]],
+    ) -> Optional[Dict[str, Any]]:
+        """
+        先在先验窗口内匹配，失败再全帧匹配
+
+        Args:
+            frame: 完整帧
+            match: 匹配函数，输入图像返回检测结果（坐标相对输入图像）
+
+        Returns:
+            帧坐标下的检测结果，未找到返回None
+        """
+        def checked_match(image):
+            detection = match(image)
+            if detection is not None and not self._valid_box(
+                (detection["x"], detection["y"], detection["width"], detection["height"]),
+                image.shape,
+            ):
+                return None
+            return detection
+
+        window = self._prior_window(frame.shape)
+        if window is not None:
+            x0, y0, x1, y1 = window
+            detection = checked_match(frame[y0:y1, x0:x1])
+            if detection is not None:
+                detection["x"] += x0
+                detection["y"] += y0
+                self.stats["prior_hits"] += 1
+                self._remember(detection)
+                return detection
+
+        self.stats["full_searches"] += 1
+        detection = checked_match(frame)
+        self._remember(detection)
+        return detection
+
+    def _remember(self, detection: Optional[Dict[str, Any]]):
+        if detection is None:
+            self.last_box = None
+        else:
+            self.last_box = (
+                detection["x"], detection["y"], detection["width"], detection["height"]
+            )
+
+    def _make_detection(
+        self, box: Tuple[int, int, int, int], confidence: float
+    ) -> Dict[str, Any]:
+        """模板类算法的检测结果（与YOLO检测结果字段一致）"""
+        x, y, w, h = box
+        return {
+            "x": int(x),
+            "y": int(y),
+            "width": int(w),
+            "height": int(h),
+            "confidence": float(confidence),
+            "class_id": 0,
+            "class_name": self.template_name or self.name,
+        }
+
+
+class TemplateRealtimePipeline(RealtimePipeline):
+    """模板匹配实时流水线（模板多尺度变体由模板库缓存）"""
+
+    name = "模板匹配"
+
+    def _process(self, frame: np.ndarray) -> List[Dict[str, Any]]:
+        def match(image):
+            result = template_matcher.find_templates(
+                [self.template_path], image, self.config
+            )[0]
+            if result is None:
+                return None
+            return self._make_detection(
+                (result["left"], result["top"], result["width"], result["height"]),
+                result["confidence"],
+            )
+
+        detection = self._search_with_prior(frame, match)
+        return [detection] if detection else []
+
+
+class ORBRealtimePipeline(RealtimePipeline):
+    """
+    ORB特征匹配实时流水线
+    模板描述子由ORB引擎缓存；默认开启跟踪模式，
+    上一帧的内点用光流跟踪到当前帧，跟踪失败时才重新做完整匹配
+    """
+
+    name = "ORB特征匹配"
+
+    default_realtime_config = {
+        **RealtimePipeline.default_realtime_config,
+        "tracking": True,
+        "max_retries": 1,  # 实时检测不重试，下一帧就是重试
+    }
+
+    def __init__(self, template_path: str = "", config: Dict[str, Any] = None):
+        # 跟踪状态按流水线区分，其他流水线或单次匹配跟踪同一模板时互不覆盖
+        self.track_stream = f"realtime-{id(self)}"
+        super().__init__(template_path, config)
+
+    def configure(self, config: Dict[str, Any] = None):
+        super().configure(config)
+        self.config["track_stream"] = self.track_stream
+
+    def reset(self):
+        super().reset()
+        orb_matcher.reset_tracking(self.template, self.track_stream)
+
+    def _process(self, frame: np.ndarray) -> List[Dict[str, Any]]:
+        # 跟踪模式自身就以上一帧的位置为先验，不再额外裁剪搜索窗口
+        result = orb_matcher.match_features(self.template, frame, self.config)
+        if not result or not result.get("bounding_box"):
+            self.last_box = None
+            return []
+
+        if result.get("tracked"):
+            self.stats["prior_hits"] += 1
+        else:
+            self.stats["full_searches"] += 1
+
+        # 与单次ORB匹配相同的验收条件，不合格的结果既不输出也不作为跟踪起点
+        bbox = result["bounding_box"]
+        box = (bbox["left"], bbox["top"], bbox["width"], bbox["height"])
+        if result.get("num_matches", 0) < self.config.get(
+            "min_matches", 10
+        ) or not self._valid_box(box, frame.shape):
+            self.last_box = None
+            orb_matcher.reset_tracking(self.template, self.track_stream)
+            return []
+
+        detection = self._make_detection(box, result["confidence"])
+        self._remember(detection)
+        return [detection]
+
+
+class YOLOORBRealtimePipeline(RealtimePipeline):
+    """YOLO+ORB混合匹配实时流水线（先在上一次位置附近匹配）"""
+
+    name = "YOLO+ORB混合匹配"
+
+    default_realtime_config = {
+        **RealtimePipeline.default_realtime_config,
+        "max_retries": 1,
+        "min_confidence": 0.5,  # 与单次YOLO+ORB匹配相同，置信度不高于该值视为未找到
+    }
+
+    def _process(self, frame: np.ndarray) -> List[Dict[str, Any]]:
+        def match(image):
+            result = yolo_orb_matcher.match_with_yolo_orb(self.template, image, self.config)
+            if not result or result.get("confidence", 0) <= self.config.get("min_confidence", 0.5):
+                return None
+
+            if result.get("bounding_box"):
+                bbox = result["bounding_box"]
+                box = (bbox["left"], bbox["top"], bbox["width"], bbox["height"])
+            elif result.get("x") is not None:
+                box = (result["x"], result["y"], result["width"], result["height"])
+            else:
+                return None
+            return self._make_detection(box, result.get("confidence", 0.0))
+
+        detection = self._search_with_prior(frame, match)
+        return [detection] if detection else []
+
+
+class PureYOLORealtimePipeline(RealtimePipeline):
+    """纯YOLO实时流水线（模型由模型注册表常驻，画面未变化时复用上一次的结果）"""
+
+    name = "纯YOLO"
+    requires_template = False
+
+    def __init__(self, template_path: str = "", config: Dict[str, Any] = None):
+        # 参考帧和缓存结果由流水线持有，不与其他流水线或单次匹配共享
+        self.detection_cache = DetectionCache()
+        super().__init__(template_path, config)
+
+    @property
+    def class_names(self) -> Dict[int, str]:
+        return pure_yolo_matcher.class_names
+
+    def _process(self, frame: np.ndarray) -> np.ndarray:
+        # 结果保持为结构化数组，坐标转换后在界面边界才生成字典
+        return pure_yolo_matcher.detect_objects_gated_array(
+            frame, self.config, self.detection_cache
+        )
+
+    def reset(self):
+        super().reset()
+        self.detection_cache.reset()
+
+
+def to_display_detections(
+    detections: Union[np.ndarray, List[Dict[str, Any]]],
+    area_rect: Dict[str, float],
+    dpi_scale: float = 1.0,
+    color_for: Callable[[int], str] = None,
+    class_names: Dict[int, str] = None,
+) -> List[Dict[str, Any]]:
+    """
+    把帧内物理像素坐标的检测结果转换为界面显示用的坐标
+    坐标转换在结构化数组上整体完成，只在最后为每个目标生成一次字典（界面边界）
+
+    Args:
+        detections: DETECTION_DTYPE 结构化数组或检测结果列表（x, y, width, height 为区域内物理像素）
+        area_rect: 检测区域的逻辑坐标 {"x", "y", "width", "height"}
+        dpi_scale: DPI缩放因子（物理像素 / 逻辑像素）
+        color_for: 类别编号 -> 边框颜色，None时不添加颜色
+        class_names: 类别编号 -> 名称，为None时从检测结果列表中读取
+
+    Returns:
+        检测结果列表：x/y 为区域内物理像素，width/height 为逻辑像素，
+        增加了 screen_x/screen_y（屏幕逻辑坐标）和 relative_*（0-1相对坐标）
+    """
+    if len(detections) == 0:
+        return []
+
+    if class_names is None and not isinstance(detections, np.ndarray):
+        class_names = {d.get("class_id", 0): d.get("class_name", "") for d in detections}
+    class_names = class_names or {}
+    array = detections_to_array(detections)
+
+    # 物理坐标 -> 逻辑坐标
+    logical = np.stack(
+        [array["x"], array["y"], array["width"], array["height"]], axis=1
+    ).astype(np.float64) / dpi_scale
+
+    # 逻辑坐标 + 逻辑偏移 = 屏幕逻辑坐标；除以区域尺寸得到相对坐标（0-1范围）
+    screen = logical[:, :2] + (area_rect["x"], area_rect["y"])
+    relative = logical / (
+        area_rect["width"], area_rect["height"], area_rect["width"], area_rect["height"]
+    )
+    physical = np.stack([array["x"], array["y"]], axis=1).astype(np.int64)
+
+    class_ids = array["class_id"].tolist()
+    labels = {
+        class_id: class_names.get(class_id, f"class_{class_id}") for class_id in set(class_ids)
+    }
+    colors = {}
+    if color_for is not None:
+        colors = {class_id: color_for(class_id) for class_id in labels}
+
+    display_detections = []
+    for (x, y), confidence, class_id, screen_point, logical_box, relative_box in zip(
+        physical.tolist(),
+        array["confidence"].tolist(),
+        class_ids,
+        screen.tolist(),
+        logical.tolist(),
+        relative.tolist(),
+    ):
+        display_detection = {
+            "x": x,
+            "y": y,
+            "width": logical_box[2],
+            "height": logical_box[3],
+            "confidence": confidence,
+            "class_id": class_id,
+            "class_name": labels[class_id],
+            "screen_x": screen_point[0],
+            "screen_y": screen_point[1],
+            "relative_x": relative_box[0],
+            "relative_y": relative_box[1],
+            "relative_width": relative_box[2],
+            "relative_height": relative_box[3],
+        }
+        if colors:
+            display_detection["border_color"] = colors[class_id]
+        display_detections.append(display_detection)
+
+    return display_detections
+
+
+# 算法模式 -> 实时流水线（与界面的算法编号一致）
+REALTIME_PIPELINES: Dict[int, Type[RealtimePipeline]] = {
+    0: TemplateRealtimePipeline,
+    1: ORBRealtimePipeline,
+    2: YOLOORBRealtimePipeline,
+    3: PureYOLORealtimePipeline,
+}
+
+
+def create_realtime_pipeline(
+    algorithm_mode: int, template_path: str = "", config: Dict[str, Any] = None
+) -> RealtimePipeline:
+    """
+    创建指定算法的实时检测流水线
+
+    Args:
+        algorithm_mode: 算法编号 0: 模板匹配, 1: ORB, 2: YOLO+ORB, 3: 纯YOLO
+        template_path: 模板图片路径（纯YOLO不需要）
+        config: 算法配置
+
+    Returns:
+        实时检测流水线
+    """
+    if algorithm_mode not in REALTIME_PIPELINES:
+        raise ValueError(f"不支持的算法模式: {algorithm_mode}")
+
+    pipeline = REALTIME_PIPELINES[algorithm_mode](template_path, config)
+    pipeline.reset()
+    logger.info(f"创建实时检测流水线: {pipeline.name}")
+    return pipeline
@@ -12,29 +12,39 @@ import logging
 import tempfile
 import os
 import platform
+import threading
 import ctypes
-from ctypes import wintypes
+from .capture_backends import (
+    OUTPUT_FORMATS,
+    CaptureBackend,
+    RawFrame,
+    convert_pixels,
+    create_backend,
+    frame_shape,
+    get_backend_names,
+)
 
 # 配置日志
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-
 class ScreenCaptureEngine:
     """
     屏幕捕获引擎
     使用mss + ctypes实现高效截图，正确处理DPI缩放
     """
 
+    # 默认的屏幕截图后端尝试顺序
+    DEFAULT_BACKEND_CHAIN = ("mss", "gdi", "pil")
+
     def __init__(self):
-        # 初始化mss
-        try:
-            import mss
-            self.mss = mss.mss()
-            logger.info("MSS截图引擎初始化成功")
-        except ImportError:
-            logger.error("MSS库未安装，请运行: pip install mss")
-            self.mss = None
+        # 截图后端：按顺序探测，找到可用后端后记住它，失败时才重新探测
+        self.backend_chain: List[str] = list(self.DEFAULT_BACKEND_CHAIN)
+        self._backends: Dict[str, CaptureBackend] = {}
+        self._active_backend: Optional[str] = None
+        self._unavailable_backends = set()
+        self._backend_lock = threading.Lock()
+        self._configure_backend_from_env()
         
         # 获取DPI缩放信息
         self.dpi_scale = self._get_dpi_scale()
@@ -48,13 +58,24 @@ class ScreenCaptureEngine:
             self.user32 = ctypes.windll.user32
             self.gdi32 = ctypes.windll.gdi32
 
+        # 按 (尺寸, 格式) 复用的输出缓冲区（按线程分别保存）
+        self._buffers = threading.local()
+
+        # 内存分配与复制统计
+        self._stats_lock = threading.Lock()
+        self.capture_stats = {
+            "frames": 0,  # 成功截图帧数
+            "allocations": 0,  # 新分配的输出/像素缓冲区次数
+            "bytes_allocated": 0,  # 新分配的字节数
+            "bytes_copied": 0,  # 本模块复制/转换写入的字节数（不含截图库内部复制）
+        }
+
     def _get_dpi_scale(self) -> float:
         """获取当前系统的DPI缩放因子"""
         try:
             if platform.system() == "Windows":
                 import ctypes
-                from ctypes import wintypes
-                
+
                 # 方法1: 使用GetDpiForSystem (Windows 10 1607+)
                 try:
                     dpi = ctypes.windll.user32.GetDpiForSystem()
@@ -164,46 +185,149 @@ class ScreenCaptureEngine:
             logger.warning(f"无法获取屏幕信息: {e}")
             return {"primary": {"width": 1920, "height": 1080}}
 
+    def _configure_backend_from_env(self):
+        """
+        通过环境变量 CAPTURE_BACKEND 选择截图后端，便于在无桌面环境运行
+        格式: 后端名称[:路径]，例如 synthetic、video:/data/session.mp4、image_dir:/data/frames
+        """
+        spec = os.environ.get("CAPTURE_BACKEND", "").strip()
+        if not spec:
+            return
+
+        name, _, argument = spec.partition(":")
+        options = {}
+        if argument:
+            options["path" if name == "video" else "directory"] = argument
+        try:
+            self.set_backend(name, **options)
+        except Exception as e:
+            logger.error(f"环境变量指定的截图后端无效 ({spec}): {e}")
+
+    def set_backend(self, backend, **options):
+        """
+        指定截图后端（不再探测其他后端）
+
+        Args:
+            backend: 后端名称或 CaptureBackend 实例
+            **options: 按名称创建后端时传给构造函数的参数
+        """
+        if isinstance(backend, CaptureBackend):
+            instance = backend
+        else:
+            instance = create_backend(backend, **options)
+
+        with self._backend_lock:
+            old = self._backends.get(instance.name)
+            if old is not None and old is not instance:
+                old.close()
+            self._backends[instance.name] = instance
+            self.backend_chain = [instance.name]
+            self._active_backend = None
+            self._unavailable_backends.discard(instance.name)
+        logger.info(f"截图后端已指定: {instance.describe()}")
+
+    def set_backend_chain(self, names: List[str] = None):
+        """
+        设置截图后端的探测顺序
+
+        Args:
+            names: 后端名称列表，None时恢复默认顺序
+        """
+        names = list(names or self.DEFAULT_BACKEND_CHAIN)
+        for name in names:
+            if name not in get_backend_names():
+                raise ValueError(f"未知的截图后端: {name}")
+        with self._backend_lock:
+            self.backend_chain = names
+            self._active_backend = None
+            self._unavailable_backends.clear()
+
+    def _get_backend(self, name: str) -> Optional[CaptureBackend]:
+        """获取（必要时创建）后端实例，不可用的后端返回None且不再重复探测"""
+        with self._backend_lock:
+            if name in self._unavailable_backends:
+                return None
+            backend = self._backends.get(name)
+            if backend is None:
+                try:
+                    backend = self._backends[name] = create_backend(name)
+                except Exception as e:
+                    logger.warning(f"截图后端 {name} 创建失败: {e}")
+                    self._unavailable_backends.add(name)
+                    return None
+            if not backend.is_available():
+                self._unavailable_backends.add(name)
+                return None
+            return backend
+
+    def get_backend_info(self) -> Dict[str, Any]:
+        """
+        获取截图后端状态
+
+        Returns:
+            当前使用的后端、探测顺序和不可用的后端
+        """
+        with self._backend_lock:
+            active = self._backends.get(self._active_backend)
+            return {
+                "active": active.describe() if active else None,
+                "chain": list(self.backend_chain),
+                "unavailable": sorted(self._unavailable_backends),
+            }
+
     def capture_screen(
-        self, region: Tuple[int, int, int, int] = None
+        self,
+        region: Tuple[int, int, int, int] = None,
+        out: Optional[np.ndarray] = None,
+        output_format: str = "bgr",
+        reuse_buffer: bool = False,
     ) -> Optional[np.ndarray]:
         """
-        捕获屏幕截图，使用多种方法确保成功
+        捕获屏幕截图
+        优先使用上次成功的后端；它失败时才按顺序重新探测其余后端
 
         Args:
             region: 截图区域 (x, y, width, height)，None表示全屏
+            out: 预分配的输出数组，形状匹配时直接写入（不分配新内存）
+            output_format: 输出格式 'bgr'（默认）/ 'bgra' / 'gray'
+            reuse_buffer: 未提供out时写入引擎内部按尺寸复用的缓冲区；
+                          返回的数组在当前线程下一次截图前有效
 
         Returns:
             截图的numpy数组，失败返回None
         """
+        if output_format not in OUTPUT_FORMATS:
+            logger.error(f"不支持的输出格式: {output_format}")
+            return None
+
         try:
-            # 方法1：尝试使用MSS
-            if self.mss:
+            active = self._active_backend
+            candidates = ([active] if active else []) + [
+                name for name in self.backend_chain if name != active
+            ]
+
+            for name in candidates:
+                backend = self._get_backend(name)
+                if backend is None:
+                    continue
+
                 try:
-                    result = self._capture_with_mss(region)
-                    if result is not None:
-                        return result
+                    raw = backend.grab(region)
                 except Exception as e:
-                    logger.warning(f"MSS截图失败: {e}")
-            
-            # 方法2：回退到Windows GDI API
-            try:
-                result = self._capture_with_gdi(region)
-                if result is not None:
-                    logger.info("GDI截图成功")
-                    return result
-            except Exception as e:
-                logger.warning(f"GDI截图失败: {e}")
-            
-            # 方法3：最后回退到PIL
-            try:
-                result = self._capture_with_pil(region)
-                if result is not None:
-                    logger.info("PIL截图成功")
-                    return result
-            except Exception as e:
-                logger.warning(f"PIL截图失败: {e}")
-            
+                    logger.warning(f"{name}截图失败: {e}")
+                    raw = None
+
+                if raw is None:
+                    if name == active:
+                        self._active_backend = None
+                    continue
+
+                if name != active:
+                    self._active_backend = name
+                    logger.info(f"使用截图后端: {name}")
+
+                return self._finish_frame(raw, out, output_format, reuse_buffer)
+
             logger.error("所有截图方法都失败了")
             return None
             
@@ -211,108 +335,102 @@ class ScreenCaptureEngine:
             logger.error(f"截图异常: {e}")
             return None
 
-    def _capture_with_mss(self, region: Tuple[int, int, int, int] = None) -> Optional[np.ndarray]:
-        """使用MSS截图"""
-        if region:
-            x, y, width, height = region
-            monitor = {
-                "left": int(x),
-                "top": int(y),
-                "width": int(width),
-                "height": int(height)
-            }
-            screenshot_mss = self.mss.grab(monitor)
-        else:
-            screenshot_mss = self.mss.grab(self.mss.monitors[1])
-        
-        # 转换为OpenCV格式
-        screenshot_np = np.array(screenshot_mss)
-        if screenshot_np.shape[2] == 4:  # BGRA
-            screenshot_cv = cv2.cvtColor(screenshot_np, cv2.COLOR_BGRA2BGR)
-        else:
-            screenshot_cv = screenshot_np
-        
-        return screenshot_cv
+    def _record_allocation(self, nbytes: int):
+        """记录一次缓冲区分配"""
+        with self._stats_lock:
+            self.capture_stats["allocations"] += 1
+            self.capture_stats["bytes_allocated"] += nbytes
 
-    def _capture_with_gdi(self, region: Tuple[int, int, int, int] = None) -> Optional[np.ndarray]:
-        """使用Windows GDI API截图"""
-        if platform.system() != "Windows":
-            return None
-            
-        try:
-            if region:
-                x, y, width, height = region
-            else:
-                # 全屏
-                x, y = 0, 0
-                width = self.screen_info["primary"]["width"]
-                height = self.screen_info["primary"]["height"]
-            
-            # 获取屏幕DC
-            screen_dc = self.user32.GetDC(0)
-            mem_dc = self.gdi32.CreateCompatibleDC(screen_dc)
-            
-            # 创建位图
-            bitmap = self.gdi32.CreateCompatibleBitmap(screen_dc, width, height)
-            old_bitmap = self.gdi32.SelectObject(mem_dc, bitmap)
-            
-            # 复制屏幕内容
-            self.gdi32.BitBlt(mem_dc, 0, 0, width, height, screen_dc, x, y, 0x00CC0020)  # SRCCOPY
-            
-            # 获取位图数据
-            bmp_info = wintypes.BITMAPINFO()
-            bmp_info.bmiHeader.biSize = ctypes.sizeof(bmp_info.bmiHeader)
-            bmp_info.bmiHeader.biWidth = width
-            bmp_info.bmiHeader.biHeight = -height  # 负值表示从上到下
-            bmp_info.bmiHeader.biPlanes = 1
-            bmp_info.bmiHeader.biBitCount = 32
-            bmp_info.bmiHeader.biCompression = 0  # BI_RGB
-            
-            buffer_size = width * height * 4
-            buffer = (ctypes.c_char * buffer_size)()
-            
-            lines = self.gdi32.GetDIBits(
-                mem_dc, bitmap, 0, height, buffer,
-                ctypes.byref(bmp_info), 0
-            )
-            
-            # 清理资源
-            self.gdi32.SelectObject(mem_dc, old_bitmap)
-            self.gdi32.DeleteObject(bitmap)
-            self.gdi32.DeleteDC(mem_dc)
-            self.user32.ReleaseDC(0, screen_dc)
-            
-            if lines == height:
-                # 转换为numpy数组
-                img_data = np.frombuffer(buffer, dtype=np.uint8)
-                img_data = img_data.reshape((height, width, 4))
-                # BGRA -> BGR
-                screenshot_cv = cv2.cvtColor(img_data, cv2.COLOR_BGRA2BGR)
-                return screenshot_cv
-            
-            return None
-            
-        except Exception as e:
-            logger.error(f"GDI截图失败: {e}")
-            return None
+    def _get_buffer(self, shape: Tuple[int, ...], output_format: str) -> np.ndarray:
+        """获取当前线程按 (形状, 格式) 复用的输出缓冲区"""
+        pool = getattr(self._buffers, "arrays", None)
+        if pool is None:
+            pool = self._buffers.arrays = {}
 
-    def _capture_with_pil(self, region: Tuple[int, int, int, int] = None) -> Optional[np.ndarray]:
-        """使用PIL截图"""
-        try:
-            from PIL import ImageGrab
-            
-            if region:
-                x, y, width, height = region
-                screenshot = ImageGrab.grab(bbox=(x, y, x + width, y + height))
-            else:
-                screenshot = ImageGrab.grab()
-            
-            screenshot_cv = cv2.cvtColor(np.array(screenshot), cv2.COLOR_RGB2BGR)
-            return screenshot_cv
-            
-        except ImportError:
-            logger.error("PIL未安装")
-            return None
+        key = (shape, output_format)
+        buffer = pool.get(key)
+        if buffer is None:
+            buffer = pool[key] = np.empty(shape, dtype=np.uint8)
+            self._record_allocation(buffer.nbytes)
+        return buffer
+
+    def _resolve_output(
+        self,
+        out: Optional[np.ndarray],
+        shape: Tuple[int, ...],
+        output_format: str,
+        reuse_buffer: bool,
+    ) -> Optional[np.ndarray]:
+        """确定本帧的输出缓冲区：形状匹配的out > 内部复用缓冲区 > None（由调用方新分配）"""
+        if out is not None and (out.shape != shape or out.dtype != np.uint8):
+            out = None
+        if out is None and reuse_buffer:
+            out = self._get_buffer(shape, output_format)
+        return out
+
+    def _record_frame(self, bytes_copied: int):
+        """记录一帧的复制字节数"""
+        with self._stats_lock:
+            self.capture_stats["frames"] += 1
+            self.capture_stats["bytes_copied"] += bytes_copied
+
+    def _finish_frame(
+        self,
+        raw: RawFrame,
+        out: Optional[np.ndarray],
+        output_format: str,
+        reuse_buffer: bool,
+    ) -> np.ndarray:
+        """
+        把后端返回的原始帧写入输出缓冲区并更新统计
+
+        Args:
+            raw: 后端返回的原始帧
+            out: 调用方提供的输出数组
+            output_format: 输出格式
+            reuse_buffer: 是否使用内部复用缓冲区
+
+        Returns:
+            输出图像
+        """
+        height, width = raw.image.shape[:2]
+        shape = frame_shape(height, width, output_format)
+        out = self._resolve_output(out, shape, output_format, reuse_buffer)
+
+        if out is None and raw.owned and raw.pixel_format == output_format:
+            # 直接返回后端数据，零复制
+            self._record_frame(0)
+            return raw.image
+
+        if out is None:
+            self._record_allocation(int(np.prod(shape)))
+            if not raw.owned:
+                # 后端会复用这块数据（例如回放源的当前帧），必须复制一份，
+                # 否则截图线程与处理线程会共享同一块内存
+                out = np.empty(shape, dtype=np.uint8)
+        result = convert_pixels(raw.image, raw.pixel_format, output_format, out)
+        self._record_frame(result.nbytes)
+        return result
+
+    def get_capture_stats(self) -> Dict[str, Any]:
+        """
+        获取截图内存统计
+
+        Returns:
+            累计帧数、分配次数/字节数、复制字节数，以及每帧平均值
+        """
+        with self._stats_lock:
+            stats = dict(self.capture_stats)
+        frames = max(stats["frames"], 1)
+        stats["allocations_per_frame"] = stats["allocations"] / frames
+        stats["bytes_copied_per_frame"] = stats["bytes_copied"] / frames
+        return stats
+
+    def reset_capture_stats(self):
+        """重置截图内存统计"""
+        with self._stats_lock:
+            for key in self.capture_stats:
+                self.capture_stats[key] = 0
 
     def capture_window(
         self, window_title: str, window_rect: Dict[str, int] = None
@@ -414,8 +532,348 @@ class ScreenCaptureEngine:
             return ""
 
 
+class FrameChangeDetector:
+    """
+    帧变化检测器
+    把画面缩小为每个网格单元 cell_size×cell_size 像素的灰度缩略图，与参考帧逐块比较，
+    得到变化的网格块和它们的外接区域；画面不变时下游引擎可以直接复用上一次的结果
+
+    compare() 只比较不改变参考帧，commit() 把比较过的帧设为新的参考帧：
+    参考帧应当是产生缓存结果的那一帧，跳过推理的帧不能推进参考帧，
+    否则缓慢的渐变每帧都低于阈值，缓存结果会一直沿用下去
+    """
+
+    def __init__(
+        self,
+        grid: Tuple[int, int] = (8, 8),
+        cell_size: int = 8,
+        threshold: float = 3.0,
+    ):
+        self.grid = grid  # 网格块数 (列数, 行数)
+        self.cell_size = cell_size  # 每个网格块在缩略图中的边长（像素）
+        self.threshold = threshold  # 缩略图像素灰度差超过该值视为变化
+        self._previous: Optional[np.ndarray] = None
+        self._previous_shape: Optional[Tuple[int, ...]] = None
+        self.stats = {"frames": 0, "unchanged": 0}
+
+    def reset(self):
+        """清除参考帧，下一帧视为全部变化"""
+        self._previous = None
+        self._previous_shape = None
+
+    def _thumbnail(self, frame: np.ndarray) -> np.ndarray:
+        """生成灰度缩略图（先缩小再转灰度，转换只作用于缩略图）"""
+        small = cv2.resize(
+            frame,
+            (self.grid[0] * self.cell_size, self.grid[1] * self.cell_size),
+            interpolation=cv2.INTER_AREA,
+        )
+        if small.ndim == 3:
+            code = cv2.COLOR_BGRA2GRAY if small.shape[2] == 4 else cv2.COLOR_BGR2GRAY
+            small = cv2.cvtColor(small, code)
+        return small
+
+    def update(self, frame: np.ndarray) -> Dict[str, Any]:
+        """与参考帧比较并把当前帧设为新的参考帧（见 compare）"""
+        change = self.compare(frame)
+        self.commit(change)
+        return change
+
+    def commit(self, change: Dict[str, Any]):
+        """把 compare() 比较过的帧设为新的参考帧"""
+        self._previous = change["thumbnail"]
+        self._previous_shape = change["shape"]
+
+    def compare(self, frame: np.ndarray) -> Dict[str, Any]:
+        """
+        与参考帧比较（不改变参考帧）
+
+        Args:
+            frame: 当前帧（BGR / BGRA / 灰度）
+
+        Returns:
+            变化信息字典:
+                changed: 是否有变化
+                changed_ratio: 变化网格块所占比例
+                dirty_mask: (行数, 列数) 变化网格块掩码
+                dirty_tiles: (K, 4) 变化网格块在原图中的 [x, y, width, height]
+                dirty_region: 变化网格块的外接区域 (x, y, width, height)，无变化时为None
+                thumbnail, shape: 当前帧的缩略图和尺寸（commit 使用）
+        """
+        thumbnail = self._thumbnail(frame)
+        columns, rows = self.grid
+        height, width = frame.shape[:2]
+
+        if self._previous is None or self._previous_shape != frame.shape:
+            dirty_mask = np.ones((rows, columns), dtype=bool)
+        else:
+            diff = cv2.absdiff(thumbnail, self._previous)
+            tile_max = diff.reshape(rows, self.cell_size, columns, self.cell_size).max(
+                axis=(1, 3)
+            )
+            dirty_mask = tile_max > self.threshold
+
+        # 网格块在原图中的边界
+        xs = np.linspace(0, width, columns + 1).astype(int)
+        ys = np.linspace(0, height, rows + 1).astype(int)
+        tile_rows, tile_columns = np.nonzero(dirty_mask)
+        dirty_tiles = np.stack(
+            [
+                xs[tile_columns],
+                ys[tile_rows],
+                xs[tile_columns + 1] - xs[tile_columns],
+                ys[tile_rows + 1] - ys[tile_rows],
+            ],
+            axis=1,
+        )
+
+        changed = bool(dirty_mask.any())
+        dirty_region = None
+        if changed:
+            x0, y0 = int(xs[tile_columns.min()]), int(ys[tile_rows.min()])
+            x1, y1 = int(xs[tile_columns.max() + 1]), int(ys[tile_rows.max() + 1])
+            dirty_region = (x0, y0, x1 - x0, y1 - y0)
+
+        self.stats["frames"] += 1
+        if not changed:
+            self.stats["unchanged"] += 1
+
+        return {
+            "changed": changed,
+            "changed_ratio": float(dirty_mask.mean()),
+            "dirty_mask": dirty_mask,
+            "dirty_tiles": dirty_tiles,
+            "dirty_region": dirty_region,
+            "thumbnail": thumbnail,
+            "shape": frame.shape,
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取变化检测统计
+
+        Returns:
+            比较帧数、未变化帧数和未变化比例
+        """
+        frames = self.stats["frames"]
+        return {
+            "frames": frames,
+            "unchanged": self.stats["unchanged"],
+            "unchanged_ratio": self.stats["unchanged"] / frames if frames else 0.0,
+        }
+
+
+class CapturedFrame:
+    """捕获服务产出的一帧画面"""
+
+    __slots__ = ("frame_id", "timestamp", "image", "region")
+
+    def __init__(
+        self,
+        frame_id: int,
+        timestamp: float,
+        image: np.ndarray,
+        region: Optional[Tuple[int, int, int, int]],
+    ):
+        self.frame_id = frame_id  # 递增的帧编号（从1开始）
+        self.timestamp = timestamp  # 捕获完成时间（time.time()）
+        self.image = image  # 图像数据
+        self.region = region  # 捕获区域 (x, y, width, height)，None表示全屏
+
+
+class CaptureService:
+    """
+    后台屏幕捕获服务
+    生产者线程按目标帧率截取选定区域，写入预分配的N帧环形缓冲区；
+    消费者获取最新帧或等待下一帧。生产者始终覆盖最旧的槽位，
+    消费者处理慢时只会跳过中间帧，不会让截图积压、产生延迟
+    """
+
+    def __init__(
+        self,
+        engine: Optional[ScreenCaptureEngine] = None,
+        ring_size: int = 3,
+        target_fps: float = 30.0,
+        output_format: str = "bgr",
+    ):
+        self.engine = engine
+        self.ring_size = max(2, ring_size)
+        self.target_fps = target_fps
+        self.output_format = output_format  # 环形缓冲区中帧的格式：bgr / bgra / gray
+
+        self._region: Optional[Tuple[int, int, int, int]] = None
+        self._ring: List[Optional[np.ndarray]] = [None] * self.ring_size
+        self._latest: Optional[CapturedFrame] = None
+        self._next_id = 1
+
+        self._condition = threading.Condition()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.stats = {
+            "captured": 0,  # 成功捕获的帧数
+            "failed": 0,  # 捕获失败次数
+            "skipped": 0,  # 消费者未取到就被覆盖的帧数
+            "capture_ms": 0.0,  # 最近一次截图耗时
+        }
+        self._last_delivered_id = 0
+
+    def _get_engine(self) -> ScreenCaptureEngine:
+        return self.engine or screen_capture
+
+    @property
+    def region(self) -> Optional[Tuple[int, int, int, int]]:
+        return self._region
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, region: Tuple[int, int, int, int] = None, target_fps: float = None):
+        """
+        启动捕获线程（已运行时只更新区域和帧率）
+
+        Args:
+            region: 截图区域 (x, y, width, height)，None表示全屏
+            target_fps: 目标帧率
+        """
+        self.set_region(region)
+        if target_fps:
+            self.target_fps = target_fps
+
+        if self.is_running():
+            return
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="capture_service", daemon=True
+        )
+        self._thread.start()
+        logger.info(f"捕获服务已启动: 区域={region}, 目标帧率={self.target_fps}")
+
+    def stop(self, timeout: float = 1.0):
+        """停止捕获线程"""
+        self._stop_event.set()
+        with self._condition:
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+            logger.info("捕获服务已停止")
+
+    def set_region(self, region: Tuple[int, int, int, int] = None):
+        """切换捕获区域，旧区域的帧立即失效"""
+        region = tuple(int(v) for v in region) if region else None
+        with self._condition:
+            if region != self._region:
+                self._region = region
+                self._latest = None
+
+    def _run(self):
+        """生产者线程主循环"""
+        slot = 0
+        while not self._stop_event.is_set():
+            start_time = time.perf_counter()
+            region = self._region
+
+            try:
+                # 直接写入环形缓冲区的下一个槽位；尺寸不符时截图引擎会新分配，
+                # 新数组随即成为该槽位的缓冲区
+                buffer = self._get_engine().capture_screen(
+                    region, out=self._ring[slot], output_format=self.output_format
+                )
+            except Exception as e:
+                logger.error(f"捕获服务截图失败: {e}")
+                buffer = None
+
+            if buffer is None:
+                self.stats["failed"] += 1
+            else:
+                self._ring[slot] = buffer
+
+                with self._condition:
+                    if region == self._region:
+                        frame = CapturedFrame(self._next_id, time.time(), buffer, region)
+                        self._next_id += 1
+                        self._latest = frame
+                        self.stats["captured"] += 1
+                        self._condition.notify_all()
+                slot = (slot + 1) % self.ring_size
+
+            elapsed = time.perf_counter() - start_time
+            self.stats["capture_ms"] = elapsed * 1000
+            if self.target_fps > 0:
+                self._stop_event.wait(max(0.0, 1.0 / self.target_fps - elapsed))
+
+    def _deliver(self, frame: Optional[CapturedFrame], copy: bool) -> Optional[CapturedFrame]:
+        """交付帧给消费者，统计被跳过的帧"""
+        if frame is None:
+            return None
+
+        if frame.frame_id > self._last_delivered_id:
+            if self._last_delivered_id:
+                self.stats["skipped"] += frame.frame_id - self._last_delivered_id - 1
+            self._last_delivered_id = frame.frame_id
+
+        if copy:
+            return CapturedFrame(
+                frame.frame_id, frame.timestamp, frame.image.copy(), frame.region
+            )
+        return frame
+
+    def get_latest(self, copy: bool = True) -> Optional[CapturedFrame]:
+        """
+        获取最新一帧
+
+        Args:
+            copy: 是否复制图像数据。不复制时图像是环形缓冲区中的视图，
+                  在生产者写满一圈（ring_size - 1 帧之后）前有效
+
+        Returns:
+            最新帧，还没有捕获到画面时返回None
+        """
+        with self._condition:
+            return self._deliver(self._latest, copy)
+
+    def wait_next(
+        self, after_id: int = 0, timeout: float = 1.0, copy: bool = True
+    ) -> Optional[CapturedFrame]:
+        """
+        等待编号大于after_id的下一帧
+
+        Args:
+            after_id: 已处理过的帧编号
+            timeout: 最长等待时间（秒）
+            copy: 是否复制图像数据
+
+        Returns:
+            新帧，超时或服务停止时返回None
+        """
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while self._latest is None or self._latest.frame_id <= after_id:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or self._stop_event.is_set():
+                    return None
+                self._condition.wait(remaining)
+            return self._deliver(self._latest, copy)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取捕获服务统计
+
+        Returns:
+            捕获帧数、失败次数、跳过帧数、最近截图耗时和最新帧编号
+        """
+        with self._condition:
+            stats = dict(self.stats)
+            stats["latest_id"] = self._latest.frame_id if self._latest else 0
+            stats["running"] = self.is_running()
+            return stats
+
+
 # 创建全局实例
 screen_capture = ScreenCaptureEngine()
+capture_service = CaptureService(screen_capture)
 
 
 def capture_screen_region(
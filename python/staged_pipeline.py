@@ -0,0 +1,493 @@
+#!/usr/bin/env python3
+"""
+分级流水线模块
+截图 → 推理 → 后处理（坐标转换、序列化）→ 发送 各阶段在独立的工作线程中运行，
+阶段之间用有界队列连接，队列满时丢弃最旧的数据，第N+1帧的截图与第N帧的推理重叠；
+每个阶段单独统计耗时，并统计端到端延迟
+
+无界面运行（在项目根目录）:
+    python -m python.staged_pipeline --backend synthetic --algorithm 0 --duration 10
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+from typing import Optional, Tuple, List, Dict, Any, Callable
+
+import cv2
+import numpy as np
+import logging
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+
+class DropOldestQueue:
+    """有界队列：队列满时丢弃最旧的数据，保证消费者总是拿到最新的数据"""
+
+    def __init__(self, maxsize: int = 2):
+        self.maxsize = max(1, maxsize)
+        self._items: deque = deque()
+        self._condition = threading.Condition()
+        self._closed = False
+        self.dropped = 0
+
+    def put(self, item) -> Optional[Any]:
+        """放入数据，返回因队列已满被丢弃的数据（没有丢弃时返回None）"""
+        dropped = None
+        with self._condition:
+            if len(self._items) >= self.maxsize:
+                dropped = self._items.popleft()
+                self.dropped += 1
+            self._items.append(item)
+            self._condition.notify_all()
+        return dropped
+
+    def get(self, timeout: float = None) -> Optional[Any]:
+        """取出最旧的数据，超时或队列已关闭且为空时返回None"""
+        with self._condition:
+            if not self._items and not self._closed:
+                self._condition.wait(timeout)
+            if not self._items:
+                return None
+            item = self._items.popleft()
+            self._condition.notify_all()
+            return item
+
+    def wait_not_full(self, timeout: float = None) -> bool:
+        """等待队列有空位（数据源按下游的消费速度截图时使用），返回是否有空位"""
+        with self._condition:
+            if len(self._items) >= self.maxsize and not self._closed:
+                self._condition.wait(timeout)
+            return len(self._items) < self.maxsize
+
+    def close(self):
+        """关闭队列，唤醒所有等待的消费者"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    def __len__(self) -> int:
+        with self._condition:
+            return len(self._items)
+
+
+class PipelineItem:
+    """在阶段之间传递的数据"""
+
+    __slots__ = ("frame_id", "capture_time", "data", "stage_ms")
+
+    def __init__(self, frame_id: int, capture_time: float, data: Any):
+        self.frame_id = frame_id
+        self.capture_time = capture_time  # time.perf_counter() 时间戳
+        self.data = data
+        self.stage_ms: Dict[str, float] = {}
+
+
+def percentiles(values, points=(50, 95, 99)) -> Dict[str, float]:
+    """耗时样本的均值和分位数（毫秒）"""
+    if len(values) == 0:
+        return {"mean_ms": 0.0, **{f"p{p}_ms": 0.0 for p in points}}
+    samples = np.fromiter(values, dtype=np.float64)
+    result = {"mean_ms": float(samples.mean())}
+    for point, value in zip(points, np.percentile(samples, points)):
+        result[f"p{point}_ms"] = float(value)
+    return result
+
+
+class PipelineStage:
+    """
+    流水线阶段
+    工作线程从输入队列取数据，调用 fn(data) 得到新数据后放入输出队列；
+    fn 返回None表示丢弃该数据（例如截图失败）。没有输入队列的阶段是数据源，
+    每次调用 fn() 产生一帧
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fn: Callable,
+        input_queue: Optional[DropOldestQueue] = None,
+        output_queue: Optional[DropOldestQueue] = None,
+        max_fps: float = 0.0,
+        history: int = 1000,
+        pace: bool = True,
+    ):
+        self.name = name
+        self.fn = fn
+        self.input_queue = input_queue
+        self.output_queue = output_queue
+        self.max_fps = max_fps  # 仅对数据源生效，0表示不限速
+        # 仅对数据源生效：下游队列满时等待而不是继续截图，
+        # 避免单核机器上空转截图抢占推理线程的CPU
+        self.pace = pace
+        self.timings: deque = deque(maxlen=history)
+        self.stats = {"processed": 0, "dropped": 0, "errors": 0}
+        self.on_output: Optional[Callable[[PipelineItem], None]] = None
+        self._stop_event: Optional[threading.Event] = None
+        self._thread: Optional[threading.Thread] = None
+        self._next_id = 1
+
+    def start(self, stop_event: threading.Event):
+        self._stop_event = stop_event
+        self._thread = threading.Thread(
+            target=self._run, name=f"pipeline_{self.name}", daemon=True
+        )
+        self._thread.start()
+
+    def join(self, timeout: float = None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            start_time = time.perf_counter()
+
+            if self.input_queue is None:
+                if self.pace and self.output_queue is not None:
+                    if not self.output_queue.wait_not_full(timeout=0.1):
+                        continue
+                    start_time = time.perf_counter()
+                item = PipelineItem(self._next_id, start_time, None)
+                self._next_id += 1
+            else:
+                item = self.input_queue.get(timeout=0.1)
+                if item is None:
+                    continue
+                start_time = time.perf_counter()
+
+            try:
+                data = self.fn() if self.input_queue is None else self.fn(item.data)
+            except Exception as e:
+                logger.error(f"流水线阶段 {self.name} 处理失败: {e}")
+                self.stats["errors"] += 1
+                data = None
+
+            elapsed_ms = (time.perf_counter() - start_time) * 1000
+            if data is not None:
+                item.data = data
+                item.stage_ms[self.name] = elapsed_ms
+                self.timings.append(elapsed_ms)
+                self.stats["processed"] += 1
+
+                if self.output_queue is not None:
+                    if self.output_queue.put(item) is not None:
+                        self.stats["dropped"] += 1
+                if self.on_output is not None:
+                    self.on_output(item)
+
+            if self.input_queue is None and self.max_fps > 0:
+                self._stop_event.wait(
+                    max(0.0, 1.0 / self.max_fps - (time.perf_counter() - start_time))
+                )
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = dict(self.stats)
+        stats.update(percentiles(list(self.timings)))
+        return stats
+
+
+class StagedPipeline:
+    """
+    分级流水线
+    source 产生数据，stages 依次处理，最后一个阶段的输出交给 sink（在最后一个阶段的线程中调用）
+    """
+
+    def __init__(
+        self,
+        source: Callable[[], Any],
+        stages: List[Tuple[str, Callable[[Any], Any]]],
+        sink: Callable[[PipelineItem], None] = None,
+        queue_size: int = 1,
+        source_fps: float = 0.0,
+        source_name: str = "capture",
+        history: int = 1000,
+        pace_source: bool = True,
+    ):
+        self.sink = sink
+        self.queues = [DropOldestQueue(queue_size) for _ in stages]
+
+        self.stages = [
+            PipelineStage(source_name, source, None, self.queues[0] if stages else None,
+                          source_fps, history, pace_source)
+        ]
+        for index, (name, fn) in enumerate(stages):
+            output_queue = self.queues[index + 1] if index + 1 < len(stages) else None
+            self.stages.append(
+                PipelineStage(name, fn, self.queues[index], output_queue, history=history)
+            )
+        self.stages[-1].on_output = self._finish
+
+        self._stop_event = threading.Event()
+        self._latencies: deque = deque(maxlen=history)
+        self._lock = threading.Lock()
+        self._completed = 0
+        self._start_time: Optional[float] = None
+        self._stop_time: Optional[float] = None
+
+    def _finish(self, item: PipelineItem):
+        if self.sink is not None:
+            try:
+                self.sink(item)
+            except Exception as e:
+                logger.error(f"流水线输出处理失败: {e}")
+
+        latency_ms = (time.perf_counter() - item.capture_time) * 1000
+        with self._lock:
+            self._latencies.append(latency_ms)
+            self._completed += 1
+
+    def start(self):
+        """启动所有阶段的工作线程"""
+        self._stop_event.clear()
+        self._start_time = time.perf_counter()
+        self._stop_time = None
+        for stage in self.stages:
+            stage.start(self._stop_event)
+
+    def stop(self, timeout: float = 2.0):
+        """停止所有阶段并等待线程退出"""
+        self._stop_event.set()
+        for queue in self.queues:
+            queue.close()
+        for stage in self.stages:
+            stage.join(timeout)
+        self._stop_time = time.perf_counter()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        流水线统计
+
+        Returns:
+            {fps, completed, dropped, latency: {mean_ms, p50_ms, p95_ms, p99_ms},
+             stages: {阶段名: {processed, dropped, errors, mean_ms, p50_ms, p95_ms, p99_ms}}}
+        """
+        end_time = self._stop_time or time.perf_counter()
+        elapsed = end_time - self._start_time if self._start_time else 0.0
+        with self._lock:
+            latencies = list(self._latencies)
+            completed = self._completed
+
+        return {
+            "fps": completed / elapsed if elapsed > 0 else 0.0,
+            "completed": completed,
+            "dropped": sum(queue.dropped for queue in self.queues),
+            "latency": percentiles(latencies),
+            "stages": {stage.name: stage.get_stats() for stage in self.stages},
+        }
+
+
+def pick_template(frame: np.ndarray, size: Tuple[int, int] = (160, 120)) -> np.ndarray:
+    """在画面中选取纹理最丰富的网格块作为模板（无界面运行且未指定模板时使用）"""
+    width, height = size
+    best, best_std = None, -1.0
+    for y in range(0, frame.shape[0] - height + 1, height):
+        for x in range(0, frame.shape[1] - width + 1, width):
+            block = frame[y : y + height, x : x + width]
+            std = float(block.std())
+            if std > best_std:
+                best, best_std = block, std
+    return (best if best is not None else frame).copy()
+
+
+def build_realtime_stages(
+    capture: Callable[[], Optional[np.ndarray]],
+    pipeline,
+    area_rect: Dict[str, float],
+    dpi_scale: float = 1.0,
+) -> Tuple[Callable[[], Any], List[Tuple[str, Callable[[Any], Any]]]]:
+    """
+    实时检测的标准阶段划分：截图 → 推理 → 后处理
+
+    Args:
+        capture: 截图函数，返回BGR图像（失败返回None）
+        pipeline: 实时检测流水线（RealtimePipeline）
+        area_rect: 检测区域的逻辑坐标，用于坐标转换
+        dpi_scale: DPI缩放因子
+
+    Returns:
+        (数据源, 阶段列表)
+    """
+    from .realtime_detection import to_display_detections
+
+    def inference(frame):
+        return pipeline.process(frame)
+
+    def postprocess(result):
+        detections, class_names = result
+        return json.dumps(
+            to_display_detections(detections, area_rect, dpi_scale, None, class_names)
+        )
+
+    return capture, [("inference", inference), ("postprocess", postprocess)]
+
+
+def run_sequential(
+    capture: Callable[[], Any],
+    stages: List[Tuple[str, Callable[[Any], Any]]],
+    sink: Callable[[PipelineItem], None] = None,
+    duration: float = 10.0,
+) -> Dict[str, Any]:
+    """
+    在单线程中逐帧依次执行各阶段（对照组），统计口径与 StagedPipeline.get_stats 相同
+    """
+    stage_timings = {name: [] for name in ["capture"] + [name for name, _ in stages]}
+    latencies = []
+    completed = 0
+    start_time = time.perf_counter()
+
+    while time.perf_counter() - start_time < duration:
+        item_start = time.perf_counter()
+        data = capture()
+        stage_timings["capture"].append((time.perf_counter() - item_start) * 1000)
+        if data is None:
+            continue
+
+        for name, fn in stages:
+            stage_start = time.perf_counter()
+            data = fn(data)
+            stage_timings[name].append((time.perf_counter() - stage_start) * 1000)
+            if data is None:
+                break
+        else:
+            item = PipelineItem(completed + 1, item_start, data)
+            if sink is not None:
+                sink(item)
+            latencies.append((time.perf_counter() - item_start) * 1000)
+            completed += 1
+
+    elapsed = time.perf_counter() - start_time
+    return {
+        "fps": completed / elapsed if elapsed > 0 else 0.0,
+        "completed": completed,
+        "dropped": 0,
+        "latency": percentiles(latencies),
+        "stages": {
+            name: {"processed": len(values), "dropped": 0, "errors": 0, **percentiles(values)}
+            for name, values in stage_timings.items()
+        },
+    }
+
+
+def run_headless(
+    backend: str = "synthetic",
+    backend_options: Dict[str, Any] = None,
+    algorithm_mode: int = 0,
+    template_path: str = "",
+    config: Dict[str, Any] = None,
+    duration: float = 10.0,
+    queue_size: int = 1,
+    source_fps: float = 0.0,
+    sequential: bool = False,
+    pace_source: bool = True,
+) -> Dict[str, Any]:
+    """
+    无界面运行实时检测流水线（回放源 → 检测 → 后处理），返回统计信息
+
+    Args:
+        backend: 截图后端名称（synthetic / video / image_dir 等）
+        backend_options: 截图后端参数
+        algorithm_mode: 算法编号 0: 模板匹配, 1: ORB, 2: YOLO+ORB, 3: 纯YOLO
+        template_path: 模板图片路径；需要模板但未指定时从第一帧选取
+        config: 算法配置
+        duration: 运行时长（秒）
+        queue_size: 阶段之间的队列长度
+        source_fps: 截图帧率上限，0表示不限速
+        sequential: 为True时在单线程中逐帧依次执行（对照组）
+        pace_source: 为True时截图按下游的消费速度进行（队列满时等待），
+            为False时持续截图，队列满时丢弃最旧的帧
+
+    Returns:
+        统计信息（见 StagedPipeline.get_stats）
+    """
+    from .screen_capture import ScreenCaptureEngine
+    from .realtime_detection import REALTIME_PIPELINES, create_realtime_pipeline
+
+    engine = ScreenCaptureEngine()
+    engine.set_backend(backend, **(backend_options or {}))
+
+    first_frame = engine.capture_screen()
+    if first_frame is None:
+        raise RuntimeError(f"截图后端 {backend} 无法产生画面")
+
+    if REALTIME_PIPELINES[algorithm_mode].requires_template and not template_path:
+        template_path = os.path.join(tempfile.gettempdir(), "staged_pipeline_template.png")
+        cv2.imwrite(template_path, pick_template(first_frame))
+
+    pipeline = create_realtime_pipeline(algorithm_mode, template_path, config)
+    height, width = first_frame.shape[:2]
+    area_rect = {"x": 0, "y": 0, "width": width, "height": height}
+    source, stages = build_realtime_stages(engine.capture_screen, pipeline, area_rect)
+
+    if sequential:
+        return run_sequential(source, stages, duration=duration)
+
+    staged = StagedPipeline(
+        source, stages, queue_size=queue_size, source_fps=source_fps, pace_source=pace_source
+    )
+    staged.start()
+    try:
+        time.sleep(duration)
+    finally:
+        staged.stop()
+    return staged.get_stats()
+
+
+def format_stats(title: str, stats: Dict[str, Any]) -> str:
+    """把统计信息格式化为文本表格"""
+    latency = stats["latency"]
+    lines = [
+        f"{title}: {stats['fps']:.1f} FPS, 完成 {stats['completed']} 帧, 丢弃 {stats['dropped']} 帧",
+        f"  端到端延迟 p50={latency['p50_ms']:.1f}ms p95={latency['p95_ms']:.1f}ms "
+        f"p99={latency['p99_ms']:.1f}ms",
+    ]
+    for name, stage in stats["stages"].items():
+        lines.append(
+            f"  {name:>12}: 处理 {stage['processed']:5d} 平均 {stage['mean_ms']:7.1f}ms "
+            f"p95 {stage['p95_ms']:7.1f}ms 丢弃 {stage['dropped']}"
+        )
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="无界面运行分级实时检测流水线")
+    parser.add_argument("--backend", default="synthetic", help="截图后端（synthetic / video / image_dir）")
+    parser.add_argument("--source", default="", help="video的文件路径或image_dir的目录")
+    parser.add_argument("--algorithm", type=int, default=0, help="0: 模板, 1: ORB, 2: YOLO+ORB, 3: 纯YOLO")
+    parser.add_argument("--template", default="", help="模板图片路径（默认从第一帧选取）")
+    parser.add_argument("--model", default="", help="YOLO模型路径（算法2、3）")
+    parser.add_argument("--duration", type=float, default=10.0, help="运行时长（秒）")
+    parser.add_argument("--queue-size", type=int, default=1, help="阶段之间的队列长度")
+    parser.add_argument("--source-fps", type=float, default=0.0, help="截图帧率上限，0表示不限速")
+    parser.add_argument("--sequential", action="store_true", help="单线程逐帧依次执行（对照组）")
+    parser.add_argument("--no-pace", action="store_true", help="持续截图，队列满时丢弃最旧的帧")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    backend_options = {}
+    if args.source:
+        backend_options["path" if args.backend == "video" else "directory"] = args.source
+    config = {"model_path": args.model} if args.model else {}
+
+    stats = run_headless(
+        args.backend,
+        backend_options,
+        args.algorithm,
+        args.template,
+        config,
+        args.duration,
+        args.queue_size,
+        args.source_fps,
+        args.sequential,
+        not args.no_pace,
+    )
+    print(format_stats("逐帧串行" if args.sequential else "分级流水线", stats))
+
+
+if __name__ == "__main__":
+    main()
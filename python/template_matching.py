@@ -6,9 +6,12 @@
 import cv2
 import numpy as np
 import time
-from typing import Optional, Tuple, List, Dict, Any
+from typing import Optional, Tuple, List, Dict, Any, Sequence, Union
 import logging
 import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from PIL import Image, ImageGrab
 
 # 配置日志
@@ -16,6 +19,127 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+class TemplateBank:
+    """
+    多尺度模板库
+    按 (模板路径, 文件修改时间, 缩放比例, 是否灰度) 缓存读取并缩放后的模板变体，
+    避免每次匹配和每次重试都重新读取、缩放模板
+    """
+
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple, List[Tuple[float, np.ndarray]]]" = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0}
+
+    @staticmethod
+    def scales_for(config: Dict[str, Any]) -> List[float]:
+        """
+        根据配置生成缩放比例列表
+
+        Args:
+            config: 匹配配置
+
+        Returns:
+            缩放比例列表，未启用多尺度时为[1.0]
+        """
+        scale_range = config.get("scale_range")
+        scale_steps = config.get("scale_steps", 0)
+        if scale_range and scale_steps > 1:
+            return [
+                float(scale)
+                for scale in np.linspace(scale_range[0], scale_range[1], scale_steps)
+            ]
+        return [1.0]
+
+    @staticmethod
+    def build_variants(
+        template: np.ndarray, scales: List[float], grayscale: bool = False
+    ) -> List[Tuple[float, np.ndarray]]:
+        """
+        生成模板的多尺度变体
+
+        Args:
+            template: 原始模板图像
+            scales: 缩放比例列表
+            grayscale: 是否转换为灰度
+
+        Returns:
+            (缩放比例, 缩放后模板) 列表
+        """
+        if grayscale and template.ndim == 3:
+            template = cv2.cvtColor(template, cv2.COLOR_BGR2GRAY)
+
+        variants = []
+        for scale in scales:
+            if abs(scale - 1.0) < 1e-6:
+                scaled_template = template
+            else:
+                scaled_template = cv2.resize(
+                    template,
+                    None,
+                    fx=scale,
+                    fy=scale,
+                    interpolation=cv2.INTER_AREA if scale < 1 else cv2.INTER_CUBIC,
+                )
+            if scaled_template.shape[0] > 0 and scaled_template.shape[1] > 0:
+                variants.append((float(scale), scaled_template))
+        return variants
+
+    def get_variants(
+        self, template_path: str, config: Dict[str, Any]
+    ) -> Optional[List[Tuple[float, np.ndarray]]]:
+        """
+        获取模板的多尺度变体（带缓存）
+
+        Args:
+            template_path: 模板图片路径
+            config: 匹配配置
+
+        Returns:
+            (缩放比例, 缩放后模板) 列表，读取失败返回None
+        """
+        try:
+            abs_path = os.path.abspath(template_path)
+            mtime = os.path.getmtime(abs_path)
+        except OSError:
+            logger.error(f"无法读取模板图片: {template_path}")
+            return None
+
+        scales = self.scales_for(config)
+        grayscale = bool(config.get("grayscale", False))
+        key = (abs_path, mtime, tuple(round(scale, 6) for scale in scales), grayscale)
+
+        with self._lock:
+            variants = self._entries.get(key)
+            if variants is not None:
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                return variants
+
+        template = cv2.imread(template_path)
+        if template is None:
+            logger.error(f"无法读取模板图片: {template_path}")
+            return None
+
+        variants = self.build_variants(template, scales, grayscale)
+
+        with self._lock:
+            self.stats["misses"] += 1
+            self._entries[key] = variants
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        return variants
+
+    def clear(self):
+        """清空模板缓存"""
+        with self._lock:
+            self._entries.clear()
+
+
 class TemplateMatchingEngine:
     """
     基于OpenCV的模板匹配引擎
@@ -42,6 +166,27 @@ class TemplateMatchingEngine:
             "confidence_threshold": 0.9,  # 高置信度阈值
             "scale_range": [0.8, 1.2],  # 缩放范围
             "scale_steps": 5,  # 缩放步数
+            "use_pyramid": False,  # 是否使用金字塔由粗到精搜索
+            "pyramid_levels": 0,  # 金字塔层数，0表示根据模板尺寸自动选择
+            "pyramid_min_template_size": 16,  # 最顶层模板的最小边长（像素）
+            "pyramid_top_k": 5,  # 粗匹配保留的候选峰值数量
+            "pyramid_refine_margin": 4,  # 精匹配窗口外扩（粗层像素）
+            "grayscale": False,  # 是否在灰度图上匹配（约快3倍）
+            "parallel_scales": True,  # 是否并行评估多个尺度
+        }
+
+        # 多尺度模板缓存
+        self.template_bank = TemplateBank()
+
+        # 尺度评估线程池（OpenCV计算时会释放GIL），首次使用时创建
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+        # 支持金字塔搜索的归一化匹配方法（非归一化方法的响应值无法跨窗口比较）
+        self.pyramid_methods = {
+            cv2.TM_CCOEFF_NORMED,
+            cv2.TM_CCORR_NORMED,
+            cv2.TM_SQDIFF_NORMED,
         }
 
     def find_template_on_screen(
@@ -49,6 +194,7 @@ class TemplateMatchingEngine:
         template_path: str,
         config: Dict[str, Any] = None,
         region: Tuple[int, int, int, int] = None,
+        cancel_event: Optional[threading.Event] = None,
     ) -> Optional[Dict[str, Any]]:
         """
         在屏幕上查找模板图片
@@ -57,6 +203,7 @@ class TemplateMatchingEngine:
             template_path: 模板图片路径
             config: 匹配配置参数
             region: 搜索区域 (left, top, width, height)
+            cancel_event: 取消事件，置位后不再重试并返回None（重试等待也会被立即打断）
 
         Returns:
             匹配结果字典，包含位置、置信度等信息，未找到则返回None
@@ -68,6 +215,10 @@ class TemplateMatchingEngine:
         retry_delay = config.get("retry_delay", 1.0)
 
         for attempt in range(max_retries):
+            if cancel_event is not None and cancel_event.is_set():
+                logger.info("模板匹配已取消")
+                return None
+
             try:
                 logger.info(f"模板匹配尝试 {attempt + 1}/{max_retries}")
 
@@ -85,17 +236,40 @@ class TemplateMatchingEngine:
                     logger.info(
                         f"第 {attempt + 1} 次尝试失败，{retry_delay}秒后重试..."
                     )
-                    time.sleep(retry_delay)
+                    if self._wait_retry(retry_delay, cancel_event):
+                        logger.info("模板匹配已取消")
+                        return None
 
             except Exception as e:
                 logger.error(f"匹配过程中发生错误: {e}")
-                if attempt < max_retries - 1:
-                    time.sleep(retry_delay)
+                if attempt < max_retries - 1 and self._wait_retry(
+                    retry_delay, cancel_event
+                ):
+                    logger.info("模板匹配已取消")
+                    return None
                 continue
 
         logger.warning("所有重试都失败，未找到匹配的模板")
         return None
 
+    @staticmethod
+    def _wait_retry(delay: float, cancel_event: Optional[threading.Event]) -> bool:
+        """等待重试间隔，返回等待期间是否被取消"""
+        if cancel_event is None:
+            time.sleep(delay)
+            return False
+        return cancel_event.wait(delay)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """获取共享的匹配线程池"""
+        with self._executor_lock:
+            if self._executor is None:
+                max_workers = min(8, os.cpu_count() or 4)
+                self._executor = ThreadPoolExecutor(
+                    max_workers=max_workers, thread_name_prefix="template_match"
+                )
+            return self._executor
+
     def _capture_screen(
         self, region: Tuple[int, int, int, int] = None
     ) -> Optional[np.ndarray]:
@@ -131,10 +305,9 @@ class TemplateMatchingEngine:
     ) -> Optional[Dict[str, Any]]:
         """使用OpenCV进行模板匹配"""
         try:
-            # 读取模板图片
-            template = cv2.imread(template_path)
-            if template is None:
-                logger.error(f"无法读取模板图片: {template_path}")
+            # 从模板库获取（已缓存的）多尺度模板
+            variants = self.template_bank.get_variants(template_path, config)
+            if not variants:
                 return None
 
             # 截取屏幕
@@ -143,10 +316,12 @@ class TemplateMatchingEngine:
                 logger.error("屏幕截图失败")
                 return None
 
-            logger.info(f"模板尺寸: {template.shape}, 截图尺寸: {screenshot.shape}")
+            logger.info(
+                f"模板尺度数: {len(variants)}, 截图尺寸: {screenshot.shape}"
+            )
 
             # 执行模板匹配
-            result = self._match_template(template, screenshot, config)
+            result = self._match_variants(variants, screenshot, config)
 
             if result and region:
                 # 如果使用了区域截图，需要调整坐标
@@ -173,6 +348,34 @@ class TemplateMatchingEngine:
             screenshot: 屏幕截图
             config: 配置参数
 
+        Returns:
+            匹配结果或None
+        """
+        variants = TemplateBank.build_variants(
+            template,
+            TemplateBank.scales_for(config),
+            bool(config.get("grayscale", False)),
+        )
+        return self._match_variants(variants, screenshot, config)
+
+    def _match_variants(
+        self,
+        variants: List[Tuple[float, np.ndarray]],
+        screenshot: np.ndarray,
+        config: Dict[str, Any],
+        screenshot_pyramid: List[np.ndarray] = None,
+        parallel: bool = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        在截图上匹配一组模板变体
+
+        Args:
+            variants: (缩放比例, 模板) 列表
+            screenshot: 屏幕截图
+            config: 配置参数
+            screenshot_pyramid: 预先构建的截图金字塔（可选）
+            parallel: 是否并行评估尺度，None表示按配置决定
+
         Returns:
             匹配结果或None
         """
@@ -180,13 +383,44 @@ class TemplateMatchingEngine:
         method = self.matching_methods.get(method_name, cv2.TM_CCOEFF_NORMED)
         threshold = config.get("threshold", 0.8)
 
-        # 尝试多尺度匹配
-        if config.get("scale_range") and config.get("scale_steps", 0) > 1:
-            return self._multi_scale_match(
-                template, screenshot, method, threshold, config
+        if not variants:
+            return None
+
+        # 灰度模板需要灰度截图
+        if variants[0][1].ndim == 2 and screenshot.ndim == 3:
+            screenshot = cv2.cvtColor(screenshot, cv2.COLOR_BGR2GRAY)
+            screenshot_pyramid = None
+
+        if len(variants) == 1 and abs(variants[0][0] - 1.0) < 1e-6:
+            return self._match_at_scale(
+                variants[0][1], screenshot, method, threshold, config, screenshot_pyramid
             )
-        else:
-            return self._single_scale_match(template, screenshot, method, threshold)
+
+        return self._multi_scale_match(
+            variants,
+            screenshot,
+            method,
+            threshold,
+            config,
+            screenshot_pyramid,
+            parallel,
+        )
+
+    def _match_at_scale(
+        self,
+        template: np.ndarray,
+        screenshot: np.ndarray,
+        method: int,
+        threshold: float,
+        config: Dict[str, Any],
+        screenshot_pyramid: List[np.ndarray] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """根据配置选择金字塔搜索或全图穷举搜索"""
+        if config.get("use_pyramid", False):
+            return self._pyramid_match(
+                template, screenshot, method, threshold, config, screenshot_pyramid
+            )
+        return self._single_scale_match(template, screenshot, method, threshold)
 
     def _single_scale_match(
         self,
@@ -228,22 +462,9 @@ class TemplateMatchingEngine:
             )
 
             if confidence >= threshold:
-                template_h, template_w = template.shape[:2]
-                center_x = match_loc[0] + template_w // 2
-                center_y = match_loc[1] + template_h // 2
-
-                return {
-                    "method": "opencv",
-                    "left": int(match_loc[0]),
-                    "top": int(match_loc[1]),
-                    "width": int(template_w),
-                    "height": int(template_h),
-                    "center_x": int(center_x),
-                    "center_y": int(center_y),
-                    "confidence": float(confidence),
-                    "match_value": float(match_val),
-                    "scale": 1.0,
-                }
+                return self._build_match_result(
+                    template, match_loc, match_val, confidence
+                )
 
             return None
 
@@ -251,55 +472,297 @@ class TemplateMatchingEngine:
             logger.error(f"单尺度匹配失败: {e}")
             return None
 
-    def _multi_scale_match(
+    def _build_match_result(
+        self,
+        template: np.ndarray,
+        match_loc: Tuple[int, int],
+        match_val: float,
+        confidence: float,
+    ) -> Dict[str, Any]:
+        """构造单个匹配结果字典"""
+        template_h, template_w = template.shape[:2]
+        center_x = match_loc[0] + template_w // 2
+        center_y = match_loc[1] + template_h // 2
+
+        return {
+            "method": "opencv",
+            "left": int(match_loc[0]),
+            "top": int(match_loc[1]),
+            "width": int(template_w),
+            "height": int(template_h),
+            "center_x": int(center_x),
+            "center_y": int(center_y),
+            "confidence": float(confidence),
+            "match_value": float(match_val),
+            "scale": 1.0,
+        }
+
+    def _select_pyramid_levels(
+        self, template: np.ndarray, config: Dict[str, Any]
+    ) -> int:
+        """
+        选择金字塔层数
+
+        Args:
+            template: 模板图像
+            config: 配置参数
+
+        Returns:
+            金字塔层数，0表示不使用金字塔
+        """
+        min_side = min(template.shape[:2])
+        min_template_size = max(4, int(config.get("pyramid_min_template_size", 16)))
+
+        # 每一层长宽减半，顶层模板边长不能小于下限
+        max_levels = 0
+        while min_side >> (max_levels + 1) >= min_template_size:
+            max_levels += 1
+
+        levels = int(config.get("pyramid_levels", 0))
+        if levels <= 0:
+            return min(max_levels, 4)
+        return min(levels, max_levels)
+
+    @staticmethod
+    def build_pyramid(image: np.ndarray, levels: int) -> List[np.ndarray]:
+        """
+        构建图像金字塔
+
+        Args:
+            image: 原始图像（第0层）
+            levels: 下采样层数
+
+        Returns:
+            由第0层到第levels层组成的图像列表
+        """
+        pyramid = [image]
+        for _ in range(levels):
+            pyramid.append(cv2.pyrDown(pyramid[-1]))
+        return pyramid
+
+    def _pyramid_match(
         self,
         template: np.ndarray,
         screenshot: np.ndarray,
         method: int,
         threshold: float,
         config: Dict[str, Any],
+        screenshot_pyramid: List[np.ndarray] = None,
     ) -> Optional[Dict[str, Any]]:
-        """多尺度模板匹配"""
+        """
+        金字塔由粗到精模板匹配
+        先在下采样后的截图上定位候选峰值，再只在候选附近的小窗口内做全分辨率匹配
+
+        Args:
+            template: 模板图像
+            screenshot: 屏幕截图
+            method: OpenCV匹配方法
+            threshold: 匹配阈值
+            config: 配置参数
+            screenshot_pyramid: 预先构建好的截图金字塔（可选，用于多个模板共享）
+
+        Returns:
+            与单尺度匹配相同格式的匹配结果或None
+        """
         try:
-            scale_range = config.get("scale_range", [0.8, 1.2])
-            scale_steps = config.get("scale_steps", 5)
+            if method not in self.pyramid_methods:
+                logger.debug("非归一化匹配方法不支持金字塔搜索，使用全图匹配")
+                return self._single_scale_match(template, screenshot, method, threshold)
 
-            best_result = None
-            best_confidence = 0
+            if (
+                template.shape[0] > screenshot.shape[0]
+                or template.shape[1] > screenshot.shape[1]
+            ):
+                logger.warning("模板图片比截图大，无法匹配")
+                return None
 
-            # 生成缩放比例
-            scales = np.linspace(scale_range[0], scale_range[1], scale_steps)
+            levels = self._select_pyramid_levels(template, config)
+            if levels == 0:
+                return self._single_scale_match(template, screenshot, method, threshold)
 
-            for scale in scales:
-                # 缩放模板
-                scaled_template = cv2.resize(
-                    template,
-                    None,
-                    fx=scale,
-                    fy=scale,
-                    interpolation=cv2.INTER_AREA if scale < 1 else cv2.INTER_CUBIC,
-                )
+            if screenshot_pyramid is None or len(screenshot_pyramid) <= levels:
+                screenshot_pyramid = self.build_pyramid(screenshot, levels)
+            template_pyramid = self.build_pyramid(template, levels)
 
-                # 检查缩放后的模板是否合适
-                if (
-                    scaled_template.shape[0] > screenshot.shape[0]
-                    or scaled_template.shape[1] > screenshot.shape[1]
-                ):
+            coarse_screenshot = screenshot_pyramid[levels]
+            coarse_template = template_pyramid[levels]
+            if (
+                coarse_template.shape[0] > coarse_screenshot.shape[0]
+                or coarse_template.shape[1] > coarse_screenshot.shape[1]
+            ):
+                return self._single_scale_match(template, screenshot, method, threshold)
+
+            # 粗匹配，统一转换为“越大越好”的得分
+            is_sqdiff = method == cv2.TM_SQDIFF_NORMED
+            coarse_result = cv2.matchTemplate(coarse_screenshot, coarse_template, method)
+            if is_sqdiff:
+                coarse_result = -coarse_result
+
+            # 提取前K个峰值，每次取最大值后抑制其邻域
+            top_k = max(1, int(config.get("pyramid_top_k", 5)))
+            coarse_h, coarse_w = coarse_template.shape[:2]
+            suppress_w = max(1, coarse_w // 2)
+            suppress_h = max(1, coarse_h // 2)
+            peaks = []
+            for _ in range(top_k):
+                _, peak_val, _, peak_loc = cv2.minMaxLoc(coarse_result)
+                if not np.isfinite(peak_val):
+                    break
+                peaks.append(peak_loc)
+                px, py = peak_loc
+                coarse_result[
+                    max(0, py - suppress_h) : py + suppress_h + 1,
+                    max(0, px - suppress_w) : px + suppress_w + 1,
+                ] = -np.inf
+
+            # 在全分辨率下精匹配每个候选窗口
+            factor = 1 << levels
+            margin = (max(1, int(config.get("pyramid_refine_margin", 4))) + 1) * factor
+            template_h, template_w = template.shape[:2]
+            screen_h, screen_w = screenshot.shape[:2]
+
+            best_val = None
+            best_loc = None
+            for px, py in peaks:
+                x0 = max(0, px * factor - margin)
+                y0 = max(0, py * factor - margin)
+                x1 = min(screen_w, px * factor + margin + template_w)
+                y1 = min(screen_h, py * factor + margin + template_h)
+                if x1 - x0 < template_w or y1 - y0 < template_h:
                     continue
 
-                # 执行匹配
-                result = self._single_scale_match(
-                    scaled_template, screenshot, method, threshold
+                window_result = cv2.matchTemplate(
+                    screenshot[y0:y1, x0:x1], template, method
                 )
+                min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(window_result)
 
-                if result and result["confidence"] > best_confidence:
-                    best_confidence = result["confidence"]
-                    result["scale"] = float(scale)
-                    best_result = result
+                if is_sqdiff:
+                    if best_val is None or min_val < best_val:
+                        best_val = min_val
+                        best_loc = (x0 + min_loc[0], y0 + min_loc[1])
+                elif best_val is None or max_val > best_val:
+                    best_val = max_val
+                    best_loc = (x0 + max_loc[0], y0 + max_loc[1])
+
+            if best_loc is None:
+                return None
+
+            confidence = 1 - best_val if is_sqdiff else best_val
+
+            logger.debug(
+                f"金字塔匹配: 层数 {levels}, 候选 {len(peaks)}, "
+                f"置信度: {confidence}, 阈值: {threshold}"
+            )
+
+            if confidence >= threshold:
+                return self._build_match_result(
+                    template, best_loc, best_val, confidence
+                )
 
+            return None
+
+        except Exception as e:
+            logger.error(f"金字塔匹配失败: {e}")
+            return None
+
+    def _multi_scale_match(
+        self,
+        variants: List[Tuple[float, np.ndarray]],
+        screenshot: np.ndarray,
+        method: int,
+        threshold: float,
+        config: Dict[str, Any],
+        screenshot_pyramid: List[np.ndarray] = None,
+        parallel: bool = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        多尺度模板匹配
+        按离1.0由近到远的顺序评估各尺度，置信度达到confidence_threshold时提前结束
+        """
+        try:
+            early_stop = config.get("confidence_threshold")
+            if parallel is None:
+                parallel = config.get("parallel_scales", True)
+
+            # 过滤掉比截图大的模板，并优先评估最可能的尺度
+            candidates = [
+                (scale, scaled_template)
+                for scale, scaled_template in variants
+                if scaled_template.shape[0] <= screenshot.shape[0]
+                and scaled_template.shape[1] <= screenshot.shape[1]
+            ]
+            candidates.sort(key=lambda item: abs(item[0] - 1.0))
+
+            if not candidates:
+                return None
+
+            # 各尺度共享同一个截图金字塔
+            if config.get("use_pyramid", False) and screenshot_pyramid is None:
+                screenshot_pyramid = self.build_pyramid(screenshot, 4)
+
+            def evaluate(scale, scaled_template):
+                result = self._match_at_scale(
+                    scaled_template,
+                    screenshot,
+                    method,
+                    threshold,
+                    config,
+                    screenshot_pyramid,
+                )
+                if result:
+                    result["scale"] = float(scale)
                     logger.debug(
                         f"尺度 {scale:.2f} 匹配置信度: {result['confidence']:.3f}"
                     )
+                return result
+
+            best_result = None
+
+            if parallel and len(candidates) > 1:
+                futures = [
+                    self._get_executor().submit(evaluate, scale, scaled_template)
+                    for scale, scaled_template in candidates
+                ]
+                try:
+                    for future in as_completed(futures):
+                        result = future.result()
+                        if result and (
+                            best_result is None
+                            or result["confidence"] > best_result["confidence"]
+                        ):
+                            best_result = result
+
+                        if (
+                            early_stop is not None
+                            and best_result
+                            and best_result["confidence"] >= early_stop
+                        ):
+                            logger.debug(
+                                f"尺度 {best_result['scale']:.2f} 达到高置信度阈值，提前结束"
+                            )
+                            break
+                finally:
+                    # 取消尚未开始的尺度评估
+                    for future in futures:
+                        future.cancel()
+            else:
+                for scale, scaled_template in candidates:
+                    result = evaluate(scale, scaled_template)
+                    if result and (
+                        best_result is None
+                        or result["confidence"] > best_result["confidence"]
+                    ):
+                        best_result = result
+
+                    if (
+                        early_stop is not None
+                        and best_result
+                        and best_result["confidence"] >= early_stop
+                    ):
+                        logger.debug(
+                            f"尺度 {scale:.2f} 达到高置信度阈值，提前结束"
+                        )
+                        break
 
             if best_result:
                 logger.info(
@@ -333,12 +796,11 @@ class TemplateMatchingEngine:
             if config is None:
                 config = self.default_config.copy()
 
-            # 读取模板和目标图片
-            template = cv2.imread(template_path)
+            # 读取模板（多尺度变体由模板库缓存）和目标图片
+            variants = self.template_bank.get_variants(template_path, config)
             target = cv2.imread(target_image_path)
 
-            if template is None:
-                logger.error(f"无法读取模板图片: {template_path}")
+            if not variants:
                 return None
 
             if target is None:
@@ -346,10 +808,10 @@ class TemplateMatchingEngine:
                 return None
 
             logger.info(f"在图片中查找模板: {template_path} -> {target_image_path}")
-            logger.info(f"模板尺寸: {template.shape}, 目标尺寸: {target.shape}")
+            logger.info(f"模板尺度数: {len(variants)}, 目标尺寸: {target.shape}")
 
             # 执行模板匹配
-            result = self._match_template(template, target, config)
+            result = self._match_variants(variants, target, config)
 
             if result:
                 logger.info(
@@ -365,6 +827,93 @@ class TemplateMatchingEngine:
             logger.error(f"图片匹配过程中发生错误: {e}")
             return None
 
+    def find_templates(
+        self,
+        templates: Sequence[Union[str, np.ndarray]],
+        frame: np.ndarray = None,
+        config: Dict[str, Any] = None,
+        region: Tuple[int, int, int, int] = None,
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        在同一帧中批量查找多个模板
+        只截图一次，灰度转换和截图金字塔在所有模板间共享，各模板并行匹配
+
+        Args:
+            templates: 模板图片路径或模板图像列表
+            frame: 目标帧，为None时截取一次屏幕（或region区域）
+            config: 匹配配置参数
+            region: 截图区域 (left, top, width, height)，用于截图和坐标偏移
+
+        Returns:
+            与templates一一对应的匹配结果列表，未找到的模板对应None
+        """
+        try:
+            match_config = self.default_config.copy()
+            if config:
+                match_config.update(config)
+
+            if not templates:
+                return []
+
+            if frame is None:
+                frame = self._capture_screen(region)
+                if frame is None:
+                    logger.error("屏幕截图失败")
+                    return [None] * len(templates)
+
+            # 共享的帧预处理
+            grayscale = bool(match_config.get("grayscale", False))
+            search_frame = frame
+            if grayscale and frame.ndim == 3:
+                search_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+
+            frame_pyramid = None
+            if match_config.get("use_pyramid", False):
+                frame_pyramid = self.build_pyramid(search_frame, 4)
+
+            scales = TemplateBank.scales_for(match_config)
+
+            def match_one(template):
+                if isinstance(template, str):
+                    variants = self.template_bank.get_variants(template, match_config)
+                else:
+                    variants = TemplateBank.build_variants(template, scales, grayscale)
+                if not variants:
+                    return None
+
+                # 模板之间已经并行，单个模板内部串行评估尺度，避免线程池嵌套等待
+                result = self._match_variants(
+                    variants, search_frame, match_config, frame_pyramid, parallel=False
+                )
+
+                if result and region:
+                    result["left"] += region[0]
+                    result["top"] += region[1]
+                    result["center_x"] += region[0]
+                    result["center_y"] += region[1]
+                    result["region"] = region
+                return result
+
+            futures = [
+                self._get_executor().submit(match_one, template) for template in templates
+            ]
+
+            results = []
+            for future in futures:
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    logger.error(f"批量模板匹配中的单个模板失败: {e}")
+                    results.append(None)
+
+            found = sum(1 for result in results if result)
+            logger.info(f"批量模板匹配完成: {found}/{len(templates)} 个模板找到匹配")
+            return results
+
+        except Exception as e:
+            logger.error(f"批量模板匹配失败: {e}")
+            return [None] * len(templates)
+
     def find_all_matches(
         self,
         template_path: str,
@@ -400,82 +949,96 @@ class TemplateMatchingEngine:
                 logger.error("屏幕截图失败")
                 return []
 
-            method_name = config.get("method", "TM_CCOEFF_NORMED")
-            method = self.matching_methods.get(method_name, cv2.TM_CCOEFF_NORMED)
-            threshold = config.get("threshold", 0.8)
+            matches = self.find_all_matches_in_image(
+                template, screenshot, config, max_matches
+            )
 
-            # 执行模板匹配
-            result = cv2.matchTemplate(screenshot, template, method)
+            # 调整区域偏移
+            if region:
+                for match_result in matches:
+                    match_result["left"] += region[0]
+                    match_result["top"] += region[1]
+                    match_result["center_x"] += region[0]
+                    match_result["center_y"] += region[1]
+                    match_result["region"] = region
 
-            # 查找所有匹配点
-            if method in [cv2.TM_SQDIFF, cv2.TM_SQDIFF_NORMED]:
-                locations = np.where(result <= (1 - threshold))
-            else:
-                locations = np.where(result >= threshold)
+            logger.info(f"找到 {len(matches)} 个匹配项")
+            return matches
 
-            matches = []
-            template_h, template_w = template.shape[:2]
+        except Exception as e:
+            logger.error(f"查找所有匹配项失败: {e}")
+            return []
 
-            # 获取匹配点的置信度并排序
-            match_points = []
-            for pt in zip(*locations[::-1]):  # 交换x,y坐标
-                if method in [cv2.TM_SQDIFF, cv2.TM_SQDIFF_NORMED]:
-                    confidence = 1 - result[pt[1], pt[0]]
-                else:
-                    confidence = result[pt[1], pt[0]]
-                match_points.append((pt, confidence))
+    def find_all_matches_in_image(
+        self,
+        template: np.ndarray,
+        screenshot: np.ndarray,
+        config: Dict[str, Any] = None,
+        max_matches: int = 10,
+    ) -> List[Dict[str, Any]]:
+        """
+        在图像中查找所有匹配项（向量化峰值提取 + 非极大值抑制）
 
-            # 按置信度排序
-            match_points.sort(key=lambda x: x[1], reverse=True)
+        Args:
+            template: 模板图像
+            screenshot: 目标图像
+            config: 匹配配置参数
+            max_matches: 最大匹配数量
 
-            # 非最大值抑制，避免重叠的匹配
-            for pt, confidence in match_points[: max_matches * 3]:  # 取更多候选
-                x, y = pt
+        Returns:
+            匹配结果列表，按置信度从高到低排序
+        """
+        if config is None:
+            config = self.default_config.copy()
 
-                # 检查是否与已有匹配重叠
-                overlap = False
-                for existing_match in matches:
-                    if (
-                        abs(x - existing_match["left"]) < template_w * 0.5
-                        and abs(y - existing_match["top"]) < template_h * 0.5
-                    ):
-                        overlap = True
-                        break
+        if (
+            template.shape[0] > screenshot.shape[0]
+            or template.shape[1] > screenshot.shape[1]
+        ):
+            logger.warning("模板图片比截图大，无法匹配")
+            return []
 
-                if not overlap:
-                    center_x = x + template_w // 2
-                    center_y = y + template_h // 2
-
-                    match_result = {
-                        "method": "opencv_all",
-                        "left": int(x),
-                        "top": int(y),
-                        "width": int(template_w),
-                        "height": int(template_h),
-                        "center_x": int(center_x),
-                        "center_y": int(center_y),
-                        "confidence": float(confidence),
-                    }
-
-                    # 调整区域偏移
-                    if region:
-                        match_result["left"] += region[0]
-                        match_result["top"] += region[1]
-                        match_result["center_x"] += region[0]
-                        match_result["center_y"] += region[1]
-                        match_result["region"] = region
-
-                    matches.append(match_result)
-
-                    if len(matches) >= max_matches:
-                        break
+        method_name = config.get("method", "TM_CCOEFF_NORMED")
+        method = self.matching_methods.get(method_name, cv2.TM_CCOEFF_NORMED)
+        threshold = config.get("threshold", 0.8)
 
-            logger.info(f"找到 {len(matches)} 个匹配项")
-            return matches
+        # 执行模板匹配，统一转换为置信度（越大越好）
+        result = cv2.matchTemplate(screenshot, template, method)
+        if method in [cv2.TM_SQDIFF, cv2.TM_SQDIFF_NORMED]:
+            scores = 1 - result
+        else:
+            scores = result
+
+        template_h, template_w = template.shape[:2]
+
+        # 只保留邻域内的局部极大值，候选数从“所有超过阈值的像素”降到“峰值个数”
+        xs, ys, confidences = find_local_maxima(
+            scores, threshold, (max(1, template_w // 2), max(1, template_h // 2))
+        )
+
+        # 非极大值抑制，避免重叠的匹配
+        keep = suppress_overlapping_points(
+            xs, ys, confidences, template_w * 0.5, template_h * 0.5, max_matches
+        )
+
+        matches = []
+        for x, y, confidence in zip(
+            xs[keep].tolist(), ys[keep].tolist(), confidences[keep].tolist()
+        ):
+            matches.append(
+                {
+                    "method": "opencv_all",
+                    "left": int(x),
+                    "top": int(y),
+                    "width": int(template_w),
+                    "height": int(template_h),
+                    "center_x": int(x + template_w // 2),
+                    "center_y": int(y + template_h // 2),
+                    "confidence": float(confidence),
+                }
+            )
 
-        except Exception as e:
-            logger.error(f"查找所有匹配项失败: {e}")
-            return []
+        return matches
 
     def get_screen_size(self) -> Tuple[int, int]:
         """获取屏幕尺寸"""
@@ -544,6 +1107,82 @@ class TemplateMatchingEngine:
             return None
 
 
+def find_local_maxima(
+    scores: np.ndarray, threshold: float, neighborhood: Tuple[int, int]
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    基于膨胀运算提取得分图中的局部极大值
+
+    Args:
+        scores: 得分图（越大越好）
+        threshold: 最低得分
+        neighborhood: 极大值邻域半径 (x, y)
+
+    Returns:
+        (x坐标, y坐标, 得分) 三个数组，按得分从高到低排序
+    """
+    scores = np.ascontiguousarray(scores, dtype=np.float32)
+    kernel = np.ones((2 * neighborhood[1] + 1, 2 * neighborhood[0] + 1), np.uint8)
+    dilated = cv2.dilate(scores, kernel)
+
+    ys, xs = np.nonzero((scores >= dilated) & (scores >= threshold))
+    values = scores[ys, xs]
+
+    order = np.argsort(-values, kind="stable")
+    return xs[order], ys[order], values[order]
+
+
+def suppress_overlapping_points(
+    xs: np.ndarray,
+    ys: np.ndarray,
+    scores: np.ndarray,
+    max_dx: float,
+    max_dy: float,
+    max_count: int,
+) -> np.ndarray:
+    """
+    基于数组的贪心非极大值抑制
+    与已保留点在x、y方向距离都小于阈值的点视为重叠
+
+    Args:
+        xs: x坐标数组（已按得分降序排序）
+        ys: y坐标数组
+        scores: 得分数组
+        max_dx: x方向重叠距离
+        max_dy: y方向重叠距离
+        max_count: 最多保留数量
+
+    Returns:
+        保留点的索引数组
+    """
+    count = len(scores)
+    if count == 0 or max_count <= 0:
+        return np.empty(0, dtype=np.intp)
+
+    xs = xs.astype(np.float32)
+    ys = ys.astype(np.float32)
+    available = np.ones(count, dtype=bool)
+    keep = []
+
+    index = 0
+    while True:
+        keep.append(index)
+        if len(keep) >= max_count:
+            break
+
+        # 一次性抑制当前点邻域内的所有候选
+        available &= (np.abs(xs - xs[index]) >= max_dx) | (
+            np.abs(ys - ys[index]) >= max_dy
+        )
+
+        remaining = np.flatnonzero(available[index + 1 :])
+        if remaining.size == 0:
+            break
+        index = index + 1 + int(remaining[0])
+
+    return np.asarray(keep, dtype=np.intp)
+
+
 # 创建全局实例
 template_matcher = TemplateMatchingEngine()
 
@@ -561,6 +1200,14 @@ def find_in_image(
     return template_matcher.find_template_in_image(template_path, target_path, **kwargs)
 
 
+def find_templates_in_frame(
+    templates: Sequence[Union[str, np.ndarray]], frame: np.ndarray = None, **kwargs
+) -> List[Optional[Dict[str, Any]]]:
+    """便捷函数：在同一帧中批量查找多个模板（region 为截图区域，其余参数作为匹配配置）"""
+    region = kwargs.pop("region", None)
+    return template_matcher.find_templates(templates, frame, kwargs, region)
+
+
 def find_all_on_screen(template_path: str, **kwargs) -> List[Dict[str, Any]]:
     """便捷函数：查找屏幕上所有匹配项"""
     return template_matcher.find_all_matches(template_path, **kwargs)
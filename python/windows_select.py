@@ -17,6 +17,8 @@ import logging
 import os
 import platform
 
+from .capture_backends import convert_pixels, dib_to_array, make_bitmap_info
+
 # 在导入pyautogui之前设置环境变量
 os.environ.setdefault("PYAUTOGUI_NO_FAILSAFE", "1")
 import pyautogui
@@ -383,166 +385,150 @@ class WindowSelector:
             logger.error(f"置于前台失败: {e}")
             return False
 
-    def capture_window_image(self, hwnd: int) -> Optional[bytes]:
+    def capture_window_array(
+        self, hwnd: int, output_format: str = "bgr"
+    ) -> Optional[np.ndarray]:
         """
-        捕获窗口图像
+        捕获窗口图像并直接返回数组（不经过PNG编码/解码）
 
         Args:
             hwnd: 窗口句柄
+            output_format: 输出格式 'bgr' / 'bgra' / 'gray'
 
         Returns:
-            图像数据，失败返回None
+            图像数组，失败返回None
         """
         try:
             window = WindowInfo(hwnd)
             rect = window.rect
 
-            # 尝试多种截图方法
-            screenshot = None
-            
             # 方法1：尝试使用PrintWindow API（最适合DPI环境）
             try:
-                screenshot = self._capture_window_with_printwindow(hwnd, rect)
-                if screenshot:
-                    logger.debug(f"PrintWindow API截图成功: {screenshot.size}")
+                image = self._capture_window_with_printwindow(hwnd, rect, output_format)
+                if image is not None:
+                    logger.debug(f"PrintWindow API截图成功: {image.shape}")
+                    return image
             except Exception as e:
                 logger.debug(f"PrintWindow API失败: {e}")
-            
+
             # 方法2：如果PrintWindow失败，使用PIL ImageGrab
-            if screenshot is None:
-                try:
-                    from PIL import ImageGrab
-                    x, y, width, height = rect["x"], rect["y"], rect["width"], rect["height"]
-                    
-                    # 直接使用逻辑坐标进行截图，让PIL自己处理DPI
-                    screenshot = ImageGrab.grab(bbox=(x, y, x + width, y + height))
-                    logger.debug(f"PIL截图: ({x}, {y}, {width}, {height}) -> {screenshot.size}")
-                    
-                except ImportError:
-                    # 方法3：回退到pyautogui
-                    screenshot = pyautogui.screenshot(
-                        region=(rect["x"], rect["y"], rect["width"], rect["height"])
-                    )
-                    logger.debug(f"PyAutoGUI截图: {screenshot.size}")
+            x, y, width, height = rect["x"], rect["y"], rect["width"], rect["height"]
+            try:
+                from PIL import ImageGrab
+
+                # 直接使用逻辑坐标进行截图，让PIL自己处理DPI
+                screenshot = ImageGrab.grab(bbox=(x, y, x + width, y + height))
+                logger.debug(f"PIL截图: ({x}, {y}, {width}, {height}) -> {screenshot.size}")
+
+            except ImportError:
+                # 方法3：回退到pyautogui
+                screenshot = pyautogui.screenshot(region=(x, y, width, height))
+                logger.debug(f"PyAutoGUI截图: {screenshot.size}")
 
             if screenshot is None:
                 logger.error("所有截图方法都失败了")
                 return None
 
-            # 转换为OpenCV格式
-            screenshot_cv = cv2.cvtColor(np.array(screenshot), cv2.COLOR_RGB2BGR)
-
-            # 编码为PNG
-            success, encoded_img = cv2.imencode(".png", screenshot_cv)
-            if success:
-                return encoded_img.tobytes()
-            else:
-                return None
+            return convert_pixels(
+                np.asarray(screenshot.convert("RGB")), "rgb", output_format
+            )
 
         except Exception as e:
             logger.error(f"捕获窗口图像失败: {e}")
             return None
-    
-    def _capture_window_with_printwindow(self, hwnd: int, rect: Dict[str, int]) -> Optional:
+
+    def capture_window_image(self, hwnd: int) -> Optional[bytes]:
+        """
+        捕获窗口图像并编码为PNG
+        只需要像素数据时应使用 capture_window_array，避免编码/解码开销
+
+        Args:
+            hwnd: 窗口句柄
+
+        Returns:
+            PNG图像数据，失败返回None
+        """
+        image = self.capture_window_array(hwnd)
+        if image is None:
+            return None
+
+        success, encoded_img = cv2.imencode(".png", image)
+        return encoded_img.tobytes() if success else None
+
+    def _capture_window_with_printwindow(
+        self, hwnd: int, rect: Dict[str, int], output_format: str = "bgr"
+    ) -> Optional[np.ndarray]:
         """
         使用PrintWindow API捕获窗口
         这个方法不受DPI缩放影响，能准确捕获窗口内容
         """
+        # 获取窗口尺寸
+        width = rect["width"]
+        height = rect["height"]
+
+        if width <= 0 or height <= 0:
+            return None
+
+        # 创建设备上下文
+        user32 = ctypes.windll.user32
+        gdi32 = ctypes.windll.gdi32
+
+        # 获取窗口DC
+        window_dc = user32.GetWindowDC(hwnd)
+        if not window_dc:
+            return None
+
+        mem_dc = bitmap = old_bitmap = None
         try:
-            import ctypes
-            from ctypes import wintypes
-            from PIL import Image
-            
-            # 获取窗口尺寸
-            width = rect["width"]
-            height = rect["height"]
-            
-            if width <= 0 or height <= 0:
-                return None
-            
-            # 创建设备上下文
-            user32 = ctypes.windll.user32
-            gdi32 = ctypes.windll.gdi32
-            
-            # 获取窗口DC
-            window_dc = user32.GetWindowDC(hwnd)
-            if not window_dc:
-                return None
-            
             # 创建内存DC
             mem_dc = gdi32.CreateCompatibleDC(window_dc)
             if not mem_dc:
-                user32.ReleaseDC(hwnd, window_dc)
                 return None
-            
+
             # 创建位图
             bitmap = gdi32.CreateCompatibleBitmap(window_dc, width, height)
             if not bitmap:
-                gdi32.DeleteDC(mem_dc)
-                user32.ReleaseDC(hwnd, window_dc)
                 return None
-            
+
             # 选择位图到内存DC
             old_bitmap = gdi32.SelectObject(mem_dc, bitmap)
-            
+
             # 使用PrintWindow捕获窗口内容
             # PW_CLIENTONLY = 0x1, PW_RENDERFULLCONTENT = 0x2
-            result = user32.PrintWindow(hwnd, mem_dc, 0x2)
-            
-            if result:
-                # 获取位图数据
-                bmp_info = wintypes.BITMAPINFO()
-                bmp_info.bmiHeader.biSize = ctypes.sizeof(bmp_info.bmiHeader)
-                bmp_info.bmiHeader.biWidth = width
-                bmp_info.bmiHeader.biHeight = -height  # 负值表示从上到下
-                bmp_info.bmiHeader.biPlanes = 1
-                bmp_info.bmiHeader.biBitCount = 32
-                bmp_info.bmiHeader.biCompression = 0  # BI_RGB
-                
-                # 创建缓冲区
-                buffer_size = width * height * 4
-                buffer = (ctypes.c_char * buffer_size)()
-                
-                # 获取位图数据
-                lines = gdi32.GetDIBits(
-                    mem_dc, bitmap, 0, height, buffer, 
-                    ctypes.byref(bmp_info), 0  # DIB_RGB_COLORS
-                )
-                
-                if lines == height:
-                    # 转换为PIL图像
-                    img_data = bytes(buffer)
-                    # Windows bitmap是BGRA格式，转换为RGBA
-                    import struct
-                    rgba_data = bytearray()
-                    for i in range(0, len(img_data), 4):
-                        b, g, r, a = struct.unpack_from('BBBB', img_data, i)
-                        rgba_data.extend([r, g, b, a])
-                    
-                    screenshot = Image.frombytes('RGBA', (width, height), bytes(rgba_data))
-                    # 转换为RGB
-                    screenshot = screenshot.convert('RGB')
-                    
-                    # 清理资源
-                    gdi32.SelectObject(mem_dc, old_bitmap)
-                    gdi32.DeleteObject(bitmap)
-                    gdi32.DeleteDC(mem_dc)
-                    user32.ReleaseDC(hwnd, window_dc)
-                    
-                    return screenshot
-            
-            # 清理资源
-            gdi32.SelectObject(mem_dc, old_bitmap)
-            gdi32.DeleteObject(bitmap)
-            gdi32.DeleteDC(mem_dc)
-            user32.ReleaseDC(hwnd, window_dc)
-            
-            return None
-            
+            if not user32.PrintWindow(hwnd, mem_dc, 0x2):
+                return None
+
+            # 获取位图数据
+            bmp_info = make_bitmap_info(width, height)
+
+            # 创建缓冲区
+            buffer = (ctypes.c_char * (width * height * 4))()
+
+            # 获取位图数据
+            lines = gdi32.GetDIBits(
+                mem_dc, bitmap, 0, height, buffer,
+                ctypes.byref(bmp_info), 0  # DIB_RGB_COLORS
+            )
+            if lines != height:
+                return None
+
+            # Windows bitmap是BGRA格式，整幅向量化转换
+            return dib_to_array(buffer, width, height, output_format)
+
         except Exception as e:
             logger.debug(f"PrintWindow API执行失败: {e}")
             return None
 
+        finally:
+            # 清理资源
+            if old_bitmap is not None:
+                gdi32.SelectObject(mem_dc, old_bitmap)
+            if bitmap:
+                gdi32.DeleteObject(bitmap)
+            if mem_dc:
+                gdi32.DeleteDC(mem_dc)
+            user32.ReleaseDC(hwnd, window_dc)
+
 
 # 创建全局实例
 window_selector = WindowSelector()
@@ -577,3 +563,8 @@ def get_active_window() -> Optional[Dict[str, Any]]:
 def bring_window_front(hwnd: int) -> bool:
     """便捷函数：将窗口置于前台"""
     return window_selector.bring_window_to_front(hwnd)
+
+
+def capture_window_array(hwnd: int, output_format: str = "bgr") -> Optional[np.ndarray]:
+    """便捷函数：捕获窗口图像并返回数组"""
+    return window_selector.capture_window_array(hwnd, output_format)
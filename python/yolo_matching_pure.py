@@ -4,16 +4,905 @@
 仅使用YOLO目标检测进行匹配，不包含ORB特征匹配
 """
 
+import ast
 import cv2
+import importlib.util
 import numpy as np
+import os
 import time
-from typing import Optional, Tuple, List, Dict, Any, Union
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple, List, Dict, Any, Union, Callable
 import logging
+from .screen_capture import FrameChangeDetector
 
 # 配置日志
 logger = logging.getLogger(__name__)
 
 
+class YOLOModelRegistry:
+    """
+    YOLO模型注册表
+    按 (模型路径, 文件修改时间, 设备, 后端) 缓存已加载并预热的模型，
+    供纯YOLO、YOLO+ORB以及模型信息查询共享，超出容量时按LRU淘汰
+    """
+
+    def __init__(self, max_models: int = 3):
+        self.max_models = max(1, int(max_models))
+        self._models: "OrderedDict[Tuple[str, float, str, str], Any]" = OrderedDict()
+        self._lock = threading.RLock()
+
+        # 缓存统计
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "last_load_time": 0.0,
+        }
+
+    @staticmethod
+    def make_key(
+        model_path: str, device: str, backend: str
+    ) -> Tuple[str, float, str, str]:
+        """
+        生成缓存键
+
+        Args:
+            model_path: 模型文件路径
+            device: 设备ID
+            backend: 推理后端名称
+
+        Returns:
+            (绝对路径, 文件修改时间, 设备, 后端)
+        """
+        abs_path = os.path.abspath(model_path)
+        return (abs_path, os.path.getmtime(abs_path), device, backend)
+
+    def get_model(
+        self,
+        model_path: str,
+        device: str,
+        backend: str,
+        loader: Callable[[str, str], Any],
+        warmup: Optional[Callable[[Any, str], None]] = None,
+    ) -> Any:
+        """
+        获取模型，未缓存时加载并预热
+
+        Args:
+            model_path: 模型文件路径
+            device: 设备ID
+            backend: 推理后端名称
+            loader: 加载函数 loader(model_path, device) -> model
+            warmup: 预热函数 warmup(model, device)，可选
+
+        Returns:
+            已加载的模型对象
+        """
+        key = self.make_key(model_path, device, backend)
+
+        # 加载过程也在锁内，避免多个线程重复加载同一个模型
+        with self._lock:
+            model = self._models.get(key)
+            if model is not None:
+                self._models.move_to_end(key)
+                self.stats["hits"] += 1
+                return model
+
+            self.stats["misses"] += 1
+
+            # 模型文件已更新，淘汰同一路径的旧版本
+            stale_keys = [
+                k for k in self._models if k[0] == key[0] and k[1] != key[1]
+            ]
+            for stale_key in stale_keys:
+                logger.info(f"模型文件已更新，淘汰旧缓存: {stale_key[0]}")
+                self._evict(stale_key)
+
+            start_time = time.time()
+            logger.info(f"加载YOLO模型: {key[0]} (设备: {device}, 后端: {backend})")
+            model = loader(model_path, device)
+
+            if warmup is not None:
+                try:
+                    warmup(model, device)
+                except Exception as e:
+                    logger.warning(f"YOLO模型预热失败: {e}")
+
+            self.stats["last_load_time"] = time.time() - start_time
+            logger.info(f"YOLO模型加载完成，耗时: {self.stats['last_load_time']:.2f}s")
+
+            self._models[key] = model
+            while len(self._models) > self.max_models:
+                self._evict(next(iter(self._models)))
+
+            return model
+
+    def invalidate(self, model_path: str = "") -> int:
+        """
+        使缓存失效
+
+        Args:
+            model_path: 模型文件路径，为空时清空全部缓存
+
+        Returns:
+            被移除的模型数量
+        """
+        with self._lock:
+            if model_path:
+                abs_path = os.path.abspath(model_path)
+                keys = [k for k in self._models if k[0] == abs_path]
+            else:
+                keys = list(self._models)
+
+            for key in keys:
+                self._evict(key)
+            return len(keys)
+
+    def set_max_models(self, max_models: int):
+        """设置最大缓存模型数量"""
+        with self._lock:
+            self.max_models = max(1, int(max_models))
+            while len(self._models) > self.max_models:
+                self._evict(next(iter(self._models)))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取缓存统计信息"""
+        with self._lock:
+            stats = self.stats.copy()
+            stats["cached_models"] = len(self._models)
+            stats["max_models"] = self.max_models
+            return stats
+
+    def _evict(self, key: Tuple[str, float, str, str]):
+        """移除一个缓存模型并释放显存"""
+        model = self._models.pop(key, None)
+        if model is None:
+            return
+
+        self.stats["evictions"] += 1
+        logger.info(f"释放YOLO模型缓存: {key[0]} (设备: {key[2]}, 后端: {key[3]})")
+        del model
+
+        if key[2].startswith("cuda"):
+            try:
+                import torch
+
+                torch.cuda.empty_cache()
+            except Exception:
+                pass
+
+
+# 全局模型注册表，所有YOLO相关引擎共享
+yolo_model_registry = YOLOModelRegistry(max_models=3)
+
+
+# 可选依赖的检查结果缓存
+_MODULE_AVAILABILITY: Dict[str, bool] = {}
+
+
+def _module_available(name: str) -> bool:
+    """检查可选依赖是否已安装（不导入模块）"""
+    if name not in _MODULE_AVAILABILITY:
+        _MODULE_AVAILABILITY[name] = importlib.util.find_spec(name) is not None
+    return _MODULE_AVAILABILITY[name]
+
+
+def letterbox(
+    image: np.ndarray,
+    new_shape: Tuple[int, int],
+    color: int = 114,
+    out: Optional[np.ndarray] = None,
+) -> Tuple[np.ndarray, float, Tuple[int, int]]:
+    """
+    保持长宽比缩放图像并居中填充到模型输入尺寸（与ultralytics的letterbox一致）
+
+    Args:
+        image: BGR图像
+        new_shape: 模型输入尺寸 (width, height)
+        color: 填充灰度值
+        out: 预分配的 (height, width, 3) uint8 画布，None时新分配
+
+    Returns:
+        (填充后的图像, 缩放比例, (左侧填充, 顶部填充))
+    """
+    target_width, target_height = new_shape
+    height, width = image.shape[:2]
+    ratio = min(target_width / width, target_height / height)
+    resized_width = max(1, int(round(width * ratio)))
+    resized_height = max(1, int(round(height * ratio)))
+    pad_x = (target_width - resized_width) // 2
+    pad_y = (target_height - resized_height) // 2
+
+    if out is None:
+        out = np.empty((target_height, target_width, 3), dtype=np.uint8)
+    out.fill(color)
+
+    if (resized_width, resized_height) != (width, height):
+        image = cv2.resize(
+            image, (resized_width, resized_height), interpolation=cv2.INTER_LINEAR
+        )
+    out[pad_y : pad_y + resized_height, pad_x : pad_x + resized_width] = image
+    return out, ratio, (pad_x, pad_y)
+
+
+def non_max_suppression(
+    boxes: np.ndarray,
+    scores: np.ndarray,
+    class_ids: np.ndarray,
+    iou_threshold: float,
+    max_detections: int = 300,
+    metric: str = "iou",
+) -> np.ndarray:
+    """
+    按类别的非极大值抑制（向量化IoU计算）
+    不同类别的框加上按类别编号的偏移量后一起处理，彼此不会互相抑制
+
+    Args:
+        boxes: (N, 4) x1, y1, x2, y2
+        scores: (N,) 置信度
+        class_ids: (N,) 类别编号
+        iou_threshold: 重叠度阈值
+        max_detections: 最多保留的检测框数量
+        metric: 重叠度 "iou"（交并比）或 "ios"（交集 / 较小框面积，
+            切片推理合并时用来去掉被切片边界截断的残缺框）
+
+    Returns:
+        保留的下标，按置信度从高到低排列
+    """
+    if len(boxes) == 0:
+        return np.empty(0, dtype=np.int64)
+
+    offset = class_ids.astype(np.float32)[:, None] * (float(boxes.max()) + 1.0)
+    shifted = boxes + offset
+    x1, y1, x2, y2 = shifted.T
+    areas = (x2 - x1).clip(0) * (y2 - y1).clip(0)
+
+    order = np.argsort(-scores, kind="stable")
+    keep = []
+    while order.size > 0 and len(keep) < max_detections:
+        index = order[0]
+        keep.append(index)
+        rest = order[1:]
+
+        width = (np.minimum(x2[index], x2[rest]) - np.maximum(x1[index], x1[rest])).clip(0)
+        height = (np.minimum(y2[index], y2[rest]) - np.maximum(y1[index], y1[rest])).clip(0)
+        intersection = width * height
+        if metric == "ios":
+            overlap = intersection / (np.minimum(areas[index], areas[rest]) + 1e-7)
+        else:
+            overlap = intersection / (areas[index] + areas[rest] - intersection + 1e-7)
+        order = rest[overlap <= iou_threshold]
+
+    return np.asarray(keep, dtype=np.int64)
+
+
+# 检测结果结构化数组：坐标为图像物理像素（左上角 + 宽高），类别名称由类别表另行查询
+DETECTION_DTYPE = np.dtype(
+    [
+        ("x", np.float32),
+        ("y", np.float32),
+        ("width", np.float32),
+        ("height", np.float32),
+        ("confidence", np.float32),
+        ("class_id", np.int32),
+    ]
+)
+
+
+def make_detection_array(
+    xyxy: np.ndarray, confidence: np.ndarray, class_ids: np.ndarray
+) -> np.ndarray:
+    """
+    由角点坐标、置信度和类别编号构造检测结果结构化数组
+
+    Args:
+        xyxy: (N, 4) x1, y1, x2, y2
+        confidence: (N,) 置信度
+        class_ids: (N,) 类别编号
+
+    Returns:
+        DETECTION_DTYPE 结构化数组
+    """
+    xyxy = np.asarray(xyxy, dtype=np.float32).reshape(-1, 4)
+    detections = np.empty(len(xyxy), dtype=DETECTION_DTYPE)
+    detections["x"] = xyxy[:, 0]
+    detections["y"] = xyxy[:, 1]
+    detections["width"] = xyxy[:, 2] - xyxy[:, 0]
+    detections["height"] = xyxy[:, 3] - xyxy[:, 1]
+    detections["confidence"] = np.asarray(confidence).reshape(-1)
+    detections["class_id"] = np.asarray(class_ids).reshape(-1)
+    return detections
+
+
+def empty_detections() -> np.ndarray:
+    """空的检测结果结构化数组"""
+    return np.empty(0, dtype=DETECTION_DTYPE)
+
+
+def detections_to_array(
+    detections: Union[np.ndarray, List[Dict[str, Any]]]
+) -> np.ndarray:
+    """检测结果字典列表转换为结构化数组（已经是结构化数组时直接返回）"""
+    if isinstance(detections, np.ndarray):
+        return detections
+    return np.array(
+        [
+            (
+                d["x"],
+                d["y"],
+                d["width"],
+                d["height"],
+                d.get("confidence", 0.0),
+                d.get("class_id", 0),
+            )
+            for d in detections
+        ],
+        dtype=DETECTION_DTYPE,
+    )
+
+
+def detections_to_dicts(
+    detections: np.ndarray, class_names: Dict[int, str] = None
+) -> List[Dict[str, Any]]:
+    """
+    检测结果结构化数组转换为字典列表（界面和匹配结果使用的格式）
+
+    Args:
+        detections: DETECTION_DTYPE 结构化数组
+        class_names: 类别编号 -> 名称
+
+    Returns:
+        检测结果列表，x/y/width/height 为整数像素
+    """
+    class_names = class_names or {}
+    boxes = np.stack(
+        [detections["x"], detections["y"], detections["width"], detections["height"]],
+        axis=1,
+    ).astype(np.int64)
+    return [
+        {
+            "x": x,
+            "y": y,
+            "width": width,
+            "height": height,
+            "confidence": confidence,
+            "class_id": class_id,
+            "class_name": class_names.get(class_id, f"class_{class_id}"),
+        }
+        for (x, y, width, height), confidence, class_id in zip(
+            boxes.tolist(),
+            detections["confidence"].tolist(),
+            detections["class_id"].tolist(),
+        )
+    ]
+
+
+def decode_yolo_output(
+    output: np.ndarray,
+    confidence_threshold: float,
+    nms_threshold: float,
+    ratio: float,
+    pad: Tuple[int, int],
+    image_shape: Tuple[int, ...],
+    max_detections: int = 300,
+    nms: Callable[..., np.ndarray] = None,
+) -> np.ndarray:
+    """
+    解析YOLO ONNX模型的原始输出（向量化）
+
+    支持两种输出布局：
+    - YOLOv8/v11: (1, 4 + 类别数, 候选框数)，没有目标置信度
+    - YOLOv5: (1, 候选框数, 5 + 类别数)，第5列为目标置信度
+
+    Args:
+        output: 模型输出
+        confidence_threshold: 置信度阈值
+        nms_threshold: NMS阈值
+        ratio: letterbox缩放比例
+        pad: letterbox填充 (左侧, 顶部)
+        image_shape: 原图形状，用于裁剪坐标
+        max_detections: 最多保留的检测框数量
+        nms: NMS函数（参数同 non_max_suppression），None时使用 non_max_suppression
+
+    Returns:
+        DETECTION_DTYPE 结构化数组，按置信度从高到低排列
+    """
+    predictions = output.reshape(output.shape[-2:]) if output.ndim > 2 else output
+    if predictions.shape[0] < predictions.shape[1]:
+        # YOLOv8布局：每列一个候选框
+        predictions = predictions.T
+        class_scores = predictions[:, 4:]
+        scores = class_scores.max(axis=1)
+    else:
+        class_scores = predictions[:, 5:] * predictions[:, 4:5]
+        scores = class_scores.max(axis=1)
+
+    mask = scores >= confidence_threshold
+    if not mask.any():
+        return empty_detections()
+
+    candidates = predictions[mask]
+    scores = scores[mask]
+    class_ids = class_scores[mask].argmax(axis=1)
+
+    # 中心点格式 -> 角点格式，并映射回原图坐标
+    boxes = np.empty((len(candidates), 4), dtype=np.float32)
+    half_width = candidates[:, 2] / 2
+    half_height = candidates[:, 3] / 2
+    boxes[:, 0] = candidates[:, 0] - half_width
+    boxes[:, 1] = candidates[:, 1] - half_height
+    boxes[:, 2] = candidates[:, 0] + half_width
+    boxes[:, 3] = candidates[:, 1] + half_height
+    boxes -= np.array([pad[0], pad[1], pad[0], pad[1]], dtype=np.float32)
+    boxes /= ratio
+
+    height, width = image_shape[:2]
+    boxes[:, [0, 2]] = boxes[:, [0, 2]].clip(0, width)
+    boxes[:, [1, 3]] = boxes[:, [1, 3]].clip(0, height)
+
+    keep = (nms or non_max_suppression)(
+        boxes, scores, class_ids, nms_threshold, max_detections
+    )
+
+    return make_detection_array(boxes[keep], scores[keep], class_ids[keep])
+
+
+def opencv_nms(
+    boxes: np.ndarray,
+    scores: np.ndarray,
+    class_ids: np.ndarray,
+    iou_threshold: float,
+    max_detections: int = 300,
+) -> np.ndarray:
+    """按类别的非极大值抑制（cv2.dnn.NMSBoxesBatched，参数同 non_max_suppression）"""
+    if len(boxes) == 0:
+        return np.empty(0, dtype=np.int64)
+
+    xywh = boxes.copy()
+    xywh[:, 2:] -= xywh[:, :2]
+    keep = cv2.dnn.NMSBoxesBatched(
+        xywh.tolist(), scores.tolist(), class_ids.tolist(), 0.0, iou_threshold
+    )
+    keep = np.asarray(keep, dtype=np.int64).reshape(-1)
+    # NMSBoxesBatched 的结果按类别分组，重新按置信度排序
+    keep = keep[np.argsort(-scores[keep], kind="stable")]
+    return keep[:max_detections]
+
+
+def parse_class_names(names: Any) -> Dict[int, str]:
+    """
+    解析模型元数据中的类别名称
+    ultralytics导出的ONNX模型把类别写在元数据 names 中，格式为 "{0: 'person', ...}"
+    """
+    if isinstance(names, dict):
+        return {int(k): str(v) for k, v in names.items()}
+    if isinstance(names, (list, tuple)):
+        return {i: str(v) for i, v in enumerate(names)}
+    if isinstance(names, str) and names.strip():
+        try:
+            return parse_class_names(ast.literal_eval(names))
+        except (ValueError, SyntaxError):
+            logger.warning(f"无法解析模型类别名称: {names[:50]}")
+    return {}
+
+
+def _read_varint(data: bytes, position: int) -> Tuple[int, int]:
+    """读取protobuf变长整数，返回 (值, 新位置)"""
+    value = shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, position
+        shift += 7
+
+
+def _parse_metadata_props(data: bytes) -> Dict[str, str]:
+    """
+    从序列化的 ModelProto 中只解析 metadata_props（字段14，StringStringEntryProto: key=1, value=2），
+    其余字段（包括权重）直接跳过
+    """
+    metadata = {}
+    position = 0
+    while position < len(data):
+        tag, position = _read_varint(data, position)
+        field, wire_type = tag >> 3, tag & 0x7
+        if wire_type == 0:
+            _, position = _read_varint(data, position)
+        elif wire_type == 1:
+            position += 8
+        elif wire_type == 5:
+            position += 4
+        elif wire_type == 2:
+            length, position = _read_varint(data, position)
+            if field == 14:
+                entry = data[position : position + length]
+                values = {}
+                entry_position = 0
+                while entry_position < len(entry):
+                    entry_tag, entry_position = _read_varint(entry, entry_position)
+                    if entry_tag & 0x7 != 2:
+                        break
+                    size, entry_position = _read_varint(entry, entry_position)
+                    values[entry_tag >> 3] = entry[entry_position : entry_position + size]
+                    entry_position += size
+                key = values.get(1, b"").decode("utf-8", "replace")
+                metadata[key] = values.get(2, b"").decode("utf-8", "replace")
+            position += length
+        else:
+            raise ValueError(f"不支持的protobuf字段类型: {wire_type}")
+    return metadata
+
+
+def read_onnx_metadata(model_path: str) -> Dict[str, str]:
+    """
+    读取ONNX模型的自定义元数据（ultralytics导出时写入 names、imgsz 等）
+    安装了onnx时使用onnx解析，否则直接解析protobuf中的 metadata_props，
+    不依赖onnxruntime
+
+    Args:
+        model_path: .onnx模型路径
+
+    Returns:
+        元数据字典，读取失败时为空字典
+    """
+    try:
+        if _module_available("onnx"):
+            import onnx
+
+            model = onnx.load(model_path, load_external_data=False)
+            return {prop.key: prop.value for prop in model.metadata_props}
+
+        with open(model_path, "rb") as f:
+            return _parse_metadata_props(f.read())
+
+    except Exception as e:
+        logger.warning(f"读取ONNX模型元数据失败: {e}")
+        return {}
+
+
+class ONNXRuntimeYOLOModel:
+    """
+    ONNX Runtime YOLO模型
+    持有一个常驻的 InferenceSession 和预分配的输入缓冲区，
+    自己完成letterbox预处理、输出解析和NMS，不依赖torch/ultralytics
+    """
+
+    # 图优化级别名称 -> ONNX Runtime枚举名
+    GRAPH_OPTIMIZATION_LEVELS = {
+        "disable": "ORT_DISABLE_ALL",
+        "basic": "ORT_ENABLE_BASIC",
+        "extended": "ORT_ENABLE_EXTENDED",
+        "all": "ORT_ENABLE_ALL",
+    }
+
+    def __init__(
+        self,
+        model_path: str,
+        device: str = "cpu",
+        input_size: Tuple[int, int] = (640, 640),
+        intra_op_threads: int = 0,
+        inter_op_threads: int = 0,
+        graph_optimization: str = "all",
+    ):
+        """
+        Args:
+            model_path: .onnx模型路径
+            device: 设备ID（cpu / cuda:N）
+            input_size: 模型输入为动态尺寸时使用的输入尺寸 (width, height)
+            intra_op_threads: 算子内并行线程数，0表示由ONNX Runtime决定
+            inter_op_threads: 算子间并行线程数，0表示由ONNX Runtime决定
+            graph_optimization: 图优化级别 disable / basic / extended / all
+        """
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = int(intra_op_threads)
+        options.inter_op_num_threads = int(inter_op_threads)
+        level = self.GRAPH_OPTIMIZATION_LEVELS.get(graph_optimization, "ORT_ENABLE_ALL")
+        options.graph_optimization_level = getattr(ort.GraphOptimizationLevel, level)
+
+        providers = ["CPUExecutionProvider"]
+        if device.startswith("cuda") and "CUDAExecutionProvider" in ort.get_available_providers():
+            device_id = int(device.split(":")[1]) if ":" in device else 0
+            providers.insert(0, ("CUDAExecutionProvider", {"device_id": device_id}))
+
+        self.session = ort.InferenceSession(model_path, options, providers=providers)
+        self.providers = self.session.get_providers()
+
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        self.output_name = self.session.get_outputs()[0].name
+
+        # 静态输入尺寸以模型为准，动态尺寸使用配置的输入尺寸
+        shape = model_input.shape
+        height = shape[2] if isinstance(shape[2], int) else input_size[1]
+        width = shape[3] if isinstance(shape[3], int) else input_size[0]
+        self.input_size = (int(width), int(height))
+        self.input_dtype = np.float16 if model_input.type == "tensor(float16)" else np.float32
+        # 模型的批大小，0表示动态批大小（导出时 dynamic=True）
+        self.batch_size = shape[0] if isinstance(shape[0], int) else 0
+
+        metadata = self.session.get_modelmeta().custom_metadata_map
+        self.names = parse_class_names(metadata.get("names", ""))
+
+        # 预分配的letterbox画布和NCHW输入张量，每帧原地写入
+        self._canvas = np.empty((height, width, 3), dtype=np.uint8)
+        self._input = np.empty((max(1, self.batch_size), 3, height, width), dtype=self.input_dtype)
+        self._lock = threading.Lock()
+
+    def preprocess(
+        self, image: np.ndarray, index: int = 0
+    ) -> Tuple[float, Tuple[int, int]]:
+        """letterbox + BGR转RGB + HWC转CHW + 归一化，结果写入预分配输入张量的第 index 个位置"""
+        canvas, ratio, pad = letterbox(image, self.input_size, out=self._canvas)
+        np.multiply(
+            canvas[:, :, ::-1].transpose(2, 0, 1),
+            1.0 / 255.0,
+            out=self._input[index],
+            casting="unsafe",
+        )
+        return ratio, pad
+
+    def _reserve_batch(self, count: int):
+        """动态批大小的模型按需扩大预分配的输入张量"""
+        if len(self._input) < count:
+            self._input = np.empty((count,) + self._input.shape[1:], dtype=self.input_dtype)
+
+    def predict_batch(
+        self,
+        images: List[np.ndarray],
+        confidence_threshold: float = 0.5,
+        nms_threshold: float = 0.4,
+        max_detections: int = 300,
+    ) -> List[np.ndarray]:
+        """
+        批量检测：多张图像letterbox到同一个输入张量，一次前向推理
+        静态批大小为1的模型逐张推理
+
+        Args:
+            images: BGR图像列表
+            confidence_threshold: 置信度阈值
+            nms_threshold: NMS阈值
+            max_detections: 每张图像最多保留的检测框数量
+
+        Returns:
+            每张图像的 DETECTION_DTYPE 结构化数组（坐标为各自图像内的像素）
+        """
+        if self.batch_size == 1:
+            return [
+                self(image, confidence_threshold, nms_threshold, max_detections)
+                for image in images
+            ]
+
+        chunk = self.batch_size or len(images)
+        results = []
+        for start in range(0, len(images), chunk):
+            group = images[start : start + chunk]
+            with self._lock:
+                self._reserve_batch(len(group))
+                transforms = [self.preprocess(image, i) for i, image in enumerate(group)]
+                # 静态批大小的模型必须输入完整的批，多余位置的结果直接丢弃
+                batch = self._input if self.batch_size else self._input[: len(group)]
+                output = self.session.run([self.output_name], {self.input_name: batch})[0]
+
+            for i, (image, (ratio, pad)) in enumerate(zip(group, transforms)):
+                results.append(
+                    decode_yolo_output(
+                        output[i].astype(np.float32, copy=False),
+                        confidence_threshold,
+                        nms_threshold,
+                        ratio,
+                        pad,
+                        image.shape,
+                        max_detections,
+                    )
+                )
+        return results
+
+    def __call__(
+        self,
+        image: np.ndarray,
+        confidence_threshold: float = 0.5,
+        nms_threshold: float = 0.4,
+        max_detections: int = 300,
+    ) -> np.ndarray:
+        """
+        检测图像中的目标
+
+        Args:
+            image: BGR图像
+            confidence_threshold: 置信度阈值
+            nms_threshold: NMS阈值
+            max_detections: 最多保留的检测框数量
+
+        Returns:
+            DETECTION_DTYPE 结构化数组（类别名称见 self.names）
+        """
+        # 输入缓冲区是共享的，同一模型的推理需要串行
+        with self._lock:
+            ratio, pad = self.preprocess(image)
+            output = self.session.run([self.output_name], {self.input_name: self._input[:1]})[0]
+
+        return decode_yolo_output(
+            output.astype(np.float32, copy=False),
+            confidence_threshold,
+            nms_threshold,
+            ratio,
+            pad,
+            image.shape,
+            max_detections,
+        )
+
+
+class OpenCVDNNYOLOModel:
+    """
+    OpenCV DNN YOLO模型
+    只依赖OpenCV：网络用 cv2.dnn.readNetFromONNX 创建一次后复用，
+    预处理使用 cv2.dnn.blobFromImage，NMS使用 cv2.dnn.NMSBoxesBatched
+    """
+
+    # ultralytics导出ONNX的默认输入尺寸，配置的尺寸与静态输入不符时回退使用
+    DEFAULT_EXPORT_SIZE = (640, 640)
+
+    def __init__(
+        self,
+        model_path: str,
+        device: str = "cpu",
+        input_size: Tuple[int, int] = (640, 640),
+    ):
+        """
+        Args:
+            model_path: .onnx模型路径
+            device: 设备ID（cpu / cuda:N），OpenCV编译了CUDA支持时才使用GPU
+            input_size: 模型输入尺寸 (width, height)
+        """
+        self.net = cv2.dnn.readNetFromONNX(model_path)
+        self.backend = "cpu"
+        if device.startswith("cuda") and cv2.cuda.getCudaEnabledDeviceCount() > 0:
+            self.net.setPreferableBackend(cv2.dnn.DNN_BACKEND_CUDA)
+            self.net.setPreferableTarget(cv2.dnn.DNN_TARGET_CUDA)
+            self.backend = "cuda"
+        else:
+            self.net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+            self.net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
+
+        self.output_names = self.net.getUnconnectedOutLayersNames()
+        self.input_size = tuple(int(v) for v in input_size)
+        # ONNX元数据不经过OpenCV，直接从模型文件读取类别名称
+        self.names = parse_class_names(read_onnx_metadata(model_path).get("names", ""))
+
+        self._canvas: Optional[np.ndarray] = None
+        # 是否支持批量输入（静态批大小的模型在第一次批量推理失败后改为逐张推理）
+        self.supports_batch = True
+        self._lock = threading.Lock()
+
+    def _forward(self, image: np.ndarray) -> Tuple[np.ndarray, float, Tuple[int, int]]:
+        width, height = self.input_size
+        if self._canvas is None or self._canvas.shape[:2] != (height, width):
+            self._canvas = np.empty((height, width, 3), dtype=np.uint8)
+
+        canvas, ratio, pad = letterbox(image, self.input_size, out=self._canvas)
+        blob = cv2.dnn.blobFromImage(canvas, 1.0 / 255.0, swapRB=True)
+        self.net.setInput(blob)
+        return self.net.forward(self.output_names[0]), ratio, pad
+
+    def warmup(self):
+        """
+        空跑一次完成网络初始化；配置的输入尺寸与模型的静态输入不符时
+        回退到ultralytics导出的默认尺寸
+        """
+        width, height = self.input_size
+        with self._lock:
+            try:
+                self._forward(np.zeros((height, width, 3), dtype=np.uint8))
+            except cv2.error:
+                if self.input_size == self.DEFAULT_EXPORT_SIZE:
+                    raise
+                logger.warning(
+                    f"输入尺寸 {width}x{height} 与模型不符，"
+                    f"改用 {self.DEFAULT_EXPORT_SIZE[0]}x{self.DEFAULT_EXPORT_SIZE[1]}"
+                )
+                self.input_size = self.DEFAULT_EXPORT_SIZE
+                width, height = self.input_size
+                self._forward(np.zeros((height, width, 3), dtype=np.uint8))
+
+    def __call__(
+        self,
+        image: np.ndarray,
+        confidence_threshold: float = 0.5,
+        nms_threshold: float = 0.4,
+        max_detections: int = 300,
+    ) -> np.ndarray:
+        """检测图像中的目标（参数同 ONNXRuntimeYOLOModel.__call__）"""
+        # cv2.dnn.Net 不能被多个线程同时使用
+        with self._lock:
+            output, ratio, pad = self._forward(image)
+
+        return decode_yolo_output(
+            output,
+            confidence_threshold,
+            nms_threshold,
+            ratio,
+            pad,
+            image.shape,
+            max_detections,
+            opencv_nms,
+        )
+
+    def predict_batch(
+        self,
+        images: List[np.ndarray],
+        confidence_threshold: float = 0.5,
+        nms_threshold: float = 0.4,
+        max_detections: int = 300,
+    ) -> List[np.ndarray]:
+        """批量检测（cv2.dnn.blobFromImages 一次前向推理，参数同 ONNXRuntimeYOLOModel.predict_batch）"""
+        if self.supports_batch and len(images) > 1:
+            transforms = []
+            canvases = []
+            for image in images:
+                canvas, ratio, pad = letterbox(image, self.input_size)
+                canvases.append(canvas)
+                transforms.append((ratio, pad))
+            blob = cv2.dnn.blobFromImages(canvases, 1.0 / 255.0, swapRB=True)
+
+            try:
+                with self._lock:
+                    self.net.setInput(blob)
+                    output = self.net.forward(self.output_names[0])
+                if output.shape[0] != len(images):
+                    raise cv2.error(f"输出批大小 {output.shape[0]} 与输入 {len(images)} 不一致")
+            except cv2.error as e:
+                logger.warning(f"模型不支持批量输入，改为逐张推理: {e}")
+                self.supports_batch = False
+            else:
+                return [
+                    decode_yolo_output(
+                        output[i],
+                        confidence_threshold,
+                        nms_threshold,
+                        ratio,
+                        pad,
+                        image.shape,
+                        max_detections,
+                        opencv_nms,
+                    )
+                    for i, (image, (ratio, pad)) in enumerate(zip(images, transforms))
+                ]
+
+        return [
+            self(image, confidence_threshold, nms_threshold, max_detections)
+            for image in images
+        ]
+
+
+class DetectionCache:
+    """
+    帧变化检测的参考帧和缓存结果（见 PureYOLOMatchingEngine.detect_objects_gated_array）
+    每个实时检测流水线各持有一份，不同调用方的参考帧和缓存结果互不覆盖
+    """
+
+    def __init__(self):
+        self.change_detector = FrameChangeDetector()
+        self.detections: Optional[np.ndarray] = None  # 参考帧的检测结果
+        self.class_names: Dict[int, str] = {}  # 产生缓存结果的模型的类别表
+        self.key: Optional[Tuple] = None  # 缓存对应的模型和参数
+        self.skipped = 0  # 连续复用缓存结果的帧数
+        self.lock = threading.Lock()
+
+    def reset(self):
+        """清除参考帧和缓存结果"""
+        with self.lock:
+            self.change_detector.reset()
+            self.detections = None
+            self.class_names = {}
+            self.key = None
+            self.skipped = 0
+
+
 class PureYOLOMatchingEngine:
     """
     纯YOLO匹配引擎
@@ -27,7 +916,24 @@ class PureYOLOMatchingEngine:
             "nms_threshold": 0.4,  # NMS阈值
             "input_size": (416, 416),  # 输入尺寸
             "model_path": "",  # YOLO模型路径
-            "device": "cpu",  # 设备选择: cpu, cuda
+            "device": "",  # 设备选择: cpu, cuda:0 等，为空时使用 set_device 设置的设备
+            "backend": "pytorch",  # 推理后端: pytorch（ultralytics）, onnxruntime, opencv_dnn, auto
+            "max_detections": 300,  # 每帧最多保留的检测框数量
+            "ort_intra_op_threads": 0,  # ONNX Runtime算子内线程数，0表示自动
+            "ort_inter_op_threads": 0,  # ONNX Runtime算子间线程数，0表示自动
+            "ort_graph_optimization": "all",  # ONNX Runtime图优化级别: disable, basic, extended, all
+            "tiled_inference": False,  # 切片推理：大画面切成重叠的小块批量推理，小目标不会因整体缩小而丢失
+            "tile_size": 640,  # 切片边长（像素），与模型输入尺寸一致时切片不再缩放
+            "tile_overlap": 0.2,  # 相邻切片的重叠比例
+            "tile_batch_size": 8,  # 一次前向推理的最大切片数
+            "tile_merge_threshold": 0.6,  # 跨切片合并的重叠度阈值（交集 / 较小框面积）
+            "tile_include_full_frame": True,  # 额外推理一次整帧缩小图，保留跨切片的大目标
+            "max_batch_size": 16,  # 多区域批量检测一次前向推理的最大图像数
+            "skip_unchanged_frames": False,  # 画面未变化时跳过推理，复用上一次的检测结果
+            "dirty_region_only": False,  # 画面局部变化时只对变化区域推理
+            "dirty_region_max_ratio": 0.5,  # 变化网格块比例超过该值时仍做整帧推理
+            "dirty_region_margin": 32,  # 变化区域向外扩展的像素
+            "max_skipped_frames": 30,  # 连续复用缓存结果的最大帧数，到达后强制重新推理
         }
 
         # YOLO网络（如果可用）
@@ -38,18 +944,43 @@ class PureYOLOMatchingEngine:
         # 设备设置
         self.device = "cpu"  # 默认使用CPU
 
+        # 是否已提示过PyTorch后端不可用（只提示一次）
+        self._backend_fallback_warned = False
+
+        # 帧变化检测：未指定缓存时使用的默认缓存
+        self.detection_cache = DetectionCache()
+
+        # 每个线程最近一次推理所用模型的类别表（见 class_names）
+        self._local = threading.local()
+
         # 性能统计
         self.performance_stats = {
             "fps": 0.0,
             "latency_ms": 0.0,
             "last_inference_time": 0.0,
             "inference_count": 0,
-            "total_time": 0.0
+            "total_time": 0.0,
+            "frames_total": 0,  # 经过变化检测的帧数
+            "frames_skipped": 0,  # 画面未变化而跳过推理的帧数
+            "frames_partial": 0,  # 只对变化区域推理的帧数
+            "skip_ratio": 0.0,  # 跳过推理的帧比例
         }
 
         # 初始化YOLO（如果模型可用）
         self._init_yolo()
 
+    @property
+    def class_names(self) -> Dict[int, str]:
+        """
+        当前线程最近一次推理所用模型的类别表（结构化数组转换为字典时查询类别名称）
+        按线程保存：实时检测和单次匹配在不同线程使用不同模型时互不覆盖
+        """
+        return getattr(self._local, "class_names", {})
+
+    @class_names.setter
+    def class_names(self, names: Dict[int, str]):
+        self._local.class_names = names
+
     def update_performance_stats(self, inference_time: float):
         """
         更新性能统计数据
@@ -100,11 +1031,234 @@ class PureYOLOMatchingEngine:
         try:
             logger.info(f"重新加载YOLO模型: {model_path}")
             self._init_yolo(model_path)
-            return True
+            yolo_model_registry.invalidate(model_path)
+            return self.load_model(model_path) is not None
         except Exception as e:
             logger.error(f"重新加载YOLO模型失败: {e}")
             return False
 
+    def load_model(
+        self, model_path: str, input_size: Tuple[int, int] = None, device: str = None
+    ):
+        """
+        从全局注册表获取已加载的ultralytics模型，未加载时加载并预热
+
+        Args:
+            model_path: YOLO模型文件路径
+            input_size: 预热使用的输入尺寸 (width, height)
+            device: 设备ID，为None时使用 set_device 设置的设备
+
+        Returns:
+            ultralytics YOLO模型，失败返回None
+        """
+        try:
+            if not model_path or not os.path.exists(model_path):
+                logger.error(f"YOLO模型文件不存在: {model_path}")
+                return None
+
+            if input_size is None:
+                input_size = self.default_yolo_config["input_size"]
+
+            device = self._resolve_device(model_path, device)
+
+            def warmup(model, warmup_device):
+                dummy = np.zeros((input_size[1], input_size[0], 3), dtype=np.uint8)
+                model(dummy, verbose=False, device=warmup_device)
+
+            return yolo_model_registry.get_model(
+                model_path,
+                device,
+                "ultralytics",
+                self._create_ultralytics_model,
+                warmup,
+            )
+
+        except ImportError:
+            logger.error("未安装ultralytics库")
+            logger.error("请使用命令安装: pip install ultralytics")
+            return None
+        except Exception as e:
+            logger.error(f"获取YOLO模型失败: {e}")
+            return None
+
+    def load_onnxruntime_model(
+        self, model_path: str, config: Dict[str, Any] = None
+    ) -> Optional[ONNXRuntimeYOLOModel]:
+        """
+        从全局注册表获取ONNX Runtime模型，未加载时创建会话并预热
+
+        Args:
+            model_path: .onnx模型路径
+            config: YOLO配置参数（输入尺寸和会话选项）
+
+        Returns:
+            ONNX Runtime YOLO模型，失败返回None
+        """
+        try:
+            if not model_path or not os.path.exists(model_path):
+                logger.error(f"YOLO模型文件不存在: {model_path}")
+                return None
+
+            yolo_config = self.default_yolo_config.copy()
+            if config:
+                yolo_config.update(config)
+
+            input_size = tuple(yolo_config["input_size"])
+            intra_op_threads = yolo_config["ort_intra_op_threads"]
+            inter_op_threads = yolo_config["ort_inter_op_threads"]
+            graph_optimization = yolo_config["ort_graph_optimization"]
+            device = yolo_config.get("device") or self.device
+            device = device if device.startswith("cuda") else "cpu"
+
+            # 会话选项不同的模型分别缓存
+            backend = (
+                f"onnxruntime:{intra_op_threads}:{inter_op_threads}:"
+                f"{graph_optimization}:{input_size[0]}x{input_size[1]}"
+            )
+
+            def loader(path, load_device):
+                return ONNXRuntimeYOLOModel(
+                    path,
+                    load_device,
+                    input_size,
+                    intra_op_threads,
+                    inter_op_threads,
+                    graph_optimization,
+                )
+
+            def warmup(model, warmup_device):
+                width, height = model.input_size
+                model(np.zeros((height, width, 3), dtype=np.uint8))
+
+            return yolo_model_registry.get_model(model_path, device, backend, loader, warmup)
+
+        except ImportError:
+            logger.error("未安装onnxruntime库")
+            logger.error("请使用命令安装: pip install onnxruntime")
+            return None
+        except Exception as e:
+            logger.error(f"创建ONNX Runtime会话失败: {e}")
+            return None
+
+    def load_opencv_dnn_model(
+        self, model_path: str, config: Dict[str, Any] = None
+    ) -> Optional[OpenCVDNNYOLOModel]:
+        """
+        从全局注册表获取OpenCV DNN模型，未加载时读取网络并预热
+
+        Args:
+            model_path: .onnx模型路径
+            config: YOLO配置参数（输入尺寸）
+
+        Returns:
+            OpenCV DNN YOLO模型，失败返回None
+        """
+        try:
+            if not model_path or not os.path.exists(model_path):
+                logger.error(f"YOLO模型文件不存在: {model_path}")
+                return None
+
+            yolo_config = self.default_yolo_config.copy()
+            if config:
+                yolo_config.update(config)
+
+            input_size = tuple(yolo_config["input_size"])
+            device = yolo_config.get("device") or self.device
+            device = device if device.startswith("cuda") else "cpu"
+            backend = f"opencv_dnn:{input_size[0]}x{input_size[1]}"
+
+            def loader(path, load_device):
+                return OpenCVDNNYOLOModel(path, load_device, input_size)
+
+            def warmup(model, warmup_device):
+                model.warmup()
+
+            return yolo_model_registry.get_model(model_path, device, backend, loader, warmup)
+
+        except Exception as e:
+            logger.error(f"创建OpenCV DNN网络失败: {e}")
+            return None
+
+    def resolve_backend(self, backend: str, model_path: str = "") -> str:
+        """
+        确定实际使用的推理后端
+        auto 或 pytorch 缺少依赖时，.onnx模型依次回退到 onnxruntime、opencv_dnn
+
+        Args:
+            backend: 配置的后端名称
+            model_path: YOLO模型文件路径
+
+        Returns:
+            实际使用的后端名称
+        """
+        if backend in ("onnxruntime", "opencv_dnn"):
+            return backend
+
+        pytorch_available = _module_available("torch") and _module_available("ultralytics")
+        if pytorch_available or not model_path.endswith(".onnx"):
+            return "pytorch"
+
+        fallback = "onnxruntime" if _module_available("onnxruntime") else "opencv_dnn"
+        if backend != "auto" and not self._backend_fallback_warned:
+            logger.warning(f"PyTorch/ultralytics未安装，改用{fallback}后端")
+            self._backend_fallback_warned = True
+        return fallback
+
+    def _resolve_device(self, model_path: str, device: str = None) -> str:
+        """
+        根据设备设置和模型格式确定实际推理设备
+
+        Args:
+            model_path: YOLO模型文件路径
+            device: 请求的设备ID，为空时使用 set_device 设置的设备
+
+        Returns:
+            实际使用的设备ID
+        """
+        device = device or self.device
+
+        if not device.startswith("cuda"):
+            return device
+
+        # 检查CUDA可用性
+        try:
+            import torch
+
+            if not torch.cuda.is_available():
+                logger.warning(f"CUDA设备 {device} 不可用，回退到CPU")
+                return "cpu"
+        except ImportError:
+            logger.warning("PyTorch未安装，回退到CPU")
+            return "cpu"
+
+        if model_path.endswith(".onnx"):
+            # ONNX模型需要检查ONNX Runtime的CUDA支持
+            try:
+                import onnxruntime as ort
+
+                providers = ort.get_available_providers()
+                if "CUDAExecutionProvider" not in providers:
+                    logger.warning("ONNX Runtime不支持CUDA，使用CPU")
+                    return "cpu"
+            except ImportError:
+                logger.warning("未找到onnxruntime，ONNX推理可能失败")
+
+        return device
+
+    @staticmethod
+    def _create_ultralytics_model(model_path: str, device: str):
+        """创建ultralytics模型并移动到目标设备"""
+        from ultralytics import YOLO
+
+        model = YOLO(model_path)
+
+        # .pt模型可以使用model.to()移动到设备，ONNX模型由推理时的device参数决定
+        if not model_path.endswith(".onnx") and device != "cpu":
+            model.to(device)
+            logger.info(f"PyTorch模型已移动到设备: {device}")
+
+        return model
+
     def get_model_info(self, model_path: str = ""):
         """
         获取模型信息，包括类别数量和类别名称
@@ -124,34 +1278,36 @@ class PureYOLOMatchingEngine:
                     "model_type": "default_coco"
                 }
 
-            # 尝试加载模型获取类别信息
-            if model_path.endswith('.pt'):
-                try:
-                    # 尝试使用ultralytics加载
-                    from ultralytics import YOLO
-                    model = YOLO(model_path)
-                    if hasattr(model, 'names') and model.names:
+            # 从共享注册表获取模型类别信息（同时完成模型加载和预热）
+            if model_path.endswith((".pt", ".onnx")):
+                model = self.load_model(model_path)
+                if model is not None and getattr(model, "names", None):
+                    return {
+                        "classes": model.names,
+                        "num_classes": len(model.names),
+                        "model_type": (
+                            "ultralytics_pt"
+                            if model_path.endswith(".pt")
+                            else "ultralytics_onnx"
+                        ),
+                    }
+
+                if model_path.endswith(".onnx"):
+                    # 没有ultralytics时直接从ONNX元数据读取类别（不需要onnxruntime）
+                    names = parse_class_names(read_onnx_metadata(model_path).get("names", ""))
+                    if names:
                         return {
-                            "classes": model.names,
-                            "num_classes": len(model.names),
-                            "model_type": "ultralytics_pt"
+                            "classes": names,
+                            "num_classes": len(names),
+                            "model_type": "onnx_metadata",
                         }
-                except ImportError:
-                    logger.warning("ultralytics库不可用，无法获取详细模型信息")
-                except Exception as e:
-                    logger.warning(f"加载PT模型信息失败: {e}")
 
-            elif model_path.endswith('.onnx'):
-                try:
-                    # 对于ONNX模型，尝试从文件名或其他方式推断
-                    # 这里可以根据实际需要扩展
+                    # 无法读取ONNX元数据时按COCO类别推断
                     return {
                         "classes": {i: f"class_{i}" for i in range(80)},
                         "num_classes": 80,
-                        "model_type": "onnx_inferred"
+                        "model_type": "onnx_inferred",
                     }
-                except Exception as e:
-                    logger.warning(f"获取ONNX模型信息失败: {e}")
 
             # 默认返回COCO类别
             return {
@@ -178,10 +1334,9 @@ class PureYOLOMatchingEngine:
         try:
             self.device = device_id
             logger.info(f"纯YOLO匹配器设备设置为: {device_id}")
-            
-            # 如果设备改变，可能需要重新加载模型
-            # 这里可以添加模型重新加载的逻辑
-            
+
+            # 模型注册表按设备区分缓存，下次推理时自动取用对应设备的模型
+
         except Exception as e:
             logger.error(f"设置纯YOLO设备失败: {e}")
             self.device = "cpu"  # 回退到CPU
@@ -199,6 +1354,22 @@ class PureYOLOMatchingEngine:
         Returns:
             检测结果列表
         """
+        return detections_to_dicts(self.detect_objects_array(image, config), self.class_names)
+
+    def detect_objects_array(
+        self, image: np.ndarray, config: Dict[str, Any] = None
+    ) -> np.ndarray:
+        """
+        使用YOLO检测图像中的对象，结果保持为结构化数组
+        （类别名称见 self.class_names，需在调用线程中读取）
+
+        Args:
+            image: 输入图像
+            config: YOLO配置参数
+
+        Returns:
+            DETECTION_DTYPE 结构化数组
+        """
         try:
             if config is None:
                 config = self.default_yolo_config.copy()
@@ -209,11 +1380,13 @@ class PureYOLOMatchingEngine:
 
             logger.info("开始YOLO目标检测")
 
-            # 检查是否需要重新加载模型
+            # 模型由全局注册表缓存，这里不再每帧重新加载
             model_path = yolo_config.get("model_path", "")
             if model_path and model_path.strip():
-                self.reload_model(model_path)
-                # 如果有模型文件，尝试使用真实的YOLO检测
+                if yolo_config.get("tiled_inference", False) and max(
+                    image.shape[:2]
+                ) > yolo_config.get("tile_size", 640):
+                    return self._detect_tiled(image, yolo_config)
                 return self._detect_with_real_yolo(image, yolo_config)
             else:
                 # 没有模型文件，无法进行检测
@@ -221,15 +1394,382 @@ class PureYOLOMatchingEngine:
                 logger.error(
                     "请在算法参数设置中选择有效的YOLO模型文件(.onnx, .pt, .weights)"
                 )
-                return []
+                return empty_detections()
 
         except Exception as e:
             logger.error(f"YOLO检测失败: {e}")
+            return empty_detections()
+
+    def detect_batch(
+        self,
+        images: List[np.ndarray],
+        config: Dict[str, Any] = None,
+        origins: List[Tuple[int, int]] = None,
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        多区域批量检测（见 detect_batch_array）
+
+        Returns:
+            每个区域的检测结果列表
+        """
+        return [
+            detections_to_dicts(detections, self.class_names)
+            for detections in self.detect_batch_array(images, config, origins)
+        ]
+
+    def detect_batch_array(
+        self,
+        images: List[np.ndarray],
+        config: Dict[str, Any] = None,
+        origins: List[Tuple[int, int]] = None,
+    ) -> List[np.ndarray]:
+        """
+        多区域批量检测
+        各区域分别letterbox到同一个输入张量，每 max_batch_size 张做一次前向推理，
+        检测框按各自的缩放和填充映射回所属区域
+
+        Args:
+            images: 各区域的BGR图像（尺寸可以不同）
+            config: YOLO配置参数
+            origins: 各区域左上角在原画面中的坐标 (x, y)，提供时检测框平移到原画面坐标
+
+        Returns:
+            与 images 一一对应的 DETECTION_DTYPE 结构化数组
+        """
+        if not images:
             return []
 
+        try:
+            yolo_config = self.default_yolo_config.copy()
+            if config:
+                yolo_config.update(config)
+
+            model_path = yolo_config.get("model_path", "")
+            if not model_path or not model_path.strip():
+                logger.error("无法进行YOLO批量检测：未提供模型文件路径")
+                return [empty_detections() for _ in images]
+            if not os.path.exists(model_path):
+                logger.error(f"YOLO模型文件不存在: {model_path}")
+                return [empty_detections() for _ in images]
+
+            batch_size = max(1, int(yolo_config.get("max_batch_size", 16)))
+            start_time = time.time()
+            results = []
+            for start in range(0, len(images), batch_size):
+                results.extend(
+                    self._detect_batch_arrays(images[start : start + batch_size], yolo_config)
+                )
+
+            if origins is not None:
+                for detections, (x, y) in zip(results, origins):
+                    detections["x"] += x
+                    detections["y"] += y
+
+            # 整个批量检测计为一次推理
+            self.update_performance_stats(time.time() - start_time)
+            logger.info(
+                f"批量检测: {len(images)} 个区域 (批大小 {batch_size}), "
+                f"共 {sum(len(detections) for detections in results)} 个目标"
+            )
+            return results
+
+        except Exception as e:
+            logger.error(f"YOLO批量检测失败: {e}")
+            return [empty_detections() for _ in images]
+
+    def detect_objects_gated(
+        self, image: np.ndarray, config: Dict[str, Any] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        带帧变化检测的YOLO检测（见 detect_objects_gated_array）
+
+        Args:
+            image: 输入图像
+            config: YOLO配置参数
+
+        Returns:
+            检测结果列表
+        """
+        return detections_to_dicts(
+            self.detect_objects_gated_array(image, config), self.class_names
+        )
+
+    def detect_objects_gated_array(
+        self,
+        image: np.ndarray,
+        config: Dict[str, Any] = None,
+        cache: Optional[DetectionCache] = None,
+    ) -> np.ndarray:
+        """
+        带帧变化检测的YOLO检测（供实时检测逐帧调用）
+        skip_unchanged_frames 开启时与产生缓存结果的参考帧比较：画面未变化则直接返回缓存结果，
+        连续复用超过 max_skipped_frames 帧时强制重新推理；
+        dirty_region_only 开启且只有局部变化时，只对变化区域推理并与缓存结果合并
+
+        Args:
+            image: 输入图像
+            config: YOLO配置参数
+            cache: 参考帧和缓存结果，为None时使用引擎的默认缓存
+
+        Returns:
+            DETECTION_DTYPE 结构化数组
+        """
+        yolo_config = self.default_yolo_config.copy()
+        if config:
+            yolo_config.update(config)
+
+        if not yolo_config.get("skip_unchanged_frames", False):
+            return self.detect_objects_array(image, yolo_config)
+
+        if cache is None:
+            cache = self.detection_cache
+
+        # 模型、后端、设备或参数变化后缓存失效
+        model_path = yolo_config.get("model_path", "")
+        cache_key = (
+            model_path,
+            self.resolve_backend(yolo_config.get("backend", "pytorch"), model_path),
+            tuple(yolo_config.get("input_size", ())),
+            yolo_config.get("device") or self.device,
+            yolo_config.get("confidence_threshold"),
+            yolo_config.get("nms_threshold"),
+            yolo_config.get("tiled_inference"),
+            yolo_config.get("tile_size"),
+            image.shape,
+        )
+
+        with cache.lock:
+            change = cache.change_detector.compare(image)
+            cached = cache.detections if cache.key == cache_key else None
+
+            stats = self.performance_stats
+            stats["frames_total"] += 1
+
+            if (
+                cached is not None
+                and not change["changed"]
+                and cache.skipped < yolo_config.get("max_skipped_frames", 30)
+            ):
+                cache.skipped += 1
+                stats["frames_skipped"] += 1
+                stats["skip_ratio"] = stats["frames_skipped"] / stats["frames_total"]
+                logger.info("画面未变化，复用上一次的检测结果")
+                self.class_names = cache.class_names
+                return cached.copy()
+
+            if (
+                cached is not None
+                and change["changed"]
+                and yolo_config.get("dirty_region_only", False)
+                and change["changed_ratio"] <= yolo_config.get("dirty_region_max_ratio", 0.5)
+            ):
+                detections = self._detect_in_dirty_region(
+                    image, change["dirty_region"], cached, yolo_config
+                )
+                stats["frames_partial"] += 1
+            else:
+                detections = self.detect_objects_array(image, yolo_config)
+
+            # 只有实际推理过的帧才成为新的参考帧
+            cache.change_detector.commit(change)
+            cache.detections = detections.copy()
+            cache.class_names = self.class_names
+            cache.key = cache_key
+            cache.skipped = 0
+            stats["skip_ratio"] = stats["frames_skipped"] / stats["frames_total"]
+            return detections
+
+    def _detect_in_dirty_region(
+        self,
+        image: np.ndarray,
+        dirty_region: Tuple[int, int, int, int],
+        cached: np.ndarray,
+        config: Dict[str, Any],
+    ) -> np.ndarray:
+        """
+        只对变化区域推理，区域外沿用缓存的检测结果
+
+        Args:
+            image: 输入图像
+            dirty_region: 变化区域 (x, y, width, height)
+            cached: 上一次的检测结果（结构化数组）
+            config: YOLO配置参数
+
+        Returns:
+            合并后的检测结果
+        """
+        height, width = image.shape[:2]
+        margin = config.get("dirty_region_margin", 32)
+        x, y, w, h = dirty_region
+        x0, y0 = max(0, x - margin), max(0, y - margin)
+        x1, y1 = min(width, x + w + margin), min(height, y + h + margin)
+
+        left, top = cached["x"], cached["y"]
+        right, bottom = left + cached["width"], top + cached["height"]
+
+        def overlaps():
+            return (left < x1) & (right > x0) & (top < y1) & (bottom > y0)
+
+        # 把与变化区域相交的旧目标并入推理区域，避免目标被区域边界截断
+        touched = overlaps()
+        if touched.any():
+            x0 = max(0, min(x0, int(left[touched].min())))
+            y0 = max(0, min(y0, int(top[touched].min())))
+            x1 = min(width, max(x1, int(np.ceil(right[touched].max()))))
+            y1 = min(height, max(y1, int(np.ceil(bottom[touched].max()))))
+
+        kept = cached[~overlaps()]
+        detections = self.detect_objects_array(image[y0:y1, x0:x1], config)
+        detections["x"] += x0
+        detections["y"] += y0
+
+        logger.info(
+            f"只对变化区域推理: ({x0}, {y0}, {x1 - x0}x{y1 - y0}), "
+            f"沿用 {len(kept)} 个旧目标, 新检测 {len(detections)} 个目标"
+        )
+        return np.concatenate([kept, detections])
+
+    @staticmethod
+    def _tile_origins(length: int, tile_size: int, stride: int) -> List[int]:
+        """一个方向上的切片起点，最后一块与边缘对齐"""
+        if length <= tile_size:
+            return [0]
+        origins = list(range(0, length - tile_size, stride))
+        origins.append(length - tile_size)
+        return origins
+
+    def _detect_tiled(self, image: np.ndarray, config: Dict[str, Any]) -> np.ndarray:
+        """
+        切片推理
+        画面切成重叠的切片（可选再加一张整帧缩小图），按 tile_batch_size 分批前向推理，
+        检测框平移回整帧坐标后做跨切片的按类别NMS
+
+        Args:
+            image: 输入图像
+            config: YOLO配置参数
+
+        Returns:
+            DETECTION_DTYPE 结构化数组
+        """
+        height, width = image.shape[:2]
+        tile_size = int(config.get("tile_size", 640))
+        overlap = min(max(float(config.get("tile_overlap", 0.2)), 0.0), 0.9)
+        stride = max(1, int(tile_size * (1.0 - overlap)))
+        batch_size = max(1, int(config.get("tile_batch_size", 8)))
+
+        origins = [
+            (x, y)
+            for y in self._tile_origins(height, tile_size, stride)
+            for x in self._tile_origins(width, tile_size, stride)
+        ]
+        tiles = [image[y : y + tile_size, x : x + tile_size] for x, y in origins]
+        if config.get("tile_include_full_frame", True):
+            origins.append((0, 0))
+            tiles.append(image)
+
+        start_time = time.time()
+        arrays = []
+        for start in range(0, len(tiles), batch_size):
+            results = self._detect_batch_arrays(tiles[start : start + batch_size], config)
+            for (x, y), detections in zip(origins[start : start + batch_size], results):
+                detections["x"] += x
+                detections["y"] += y
+                arrays.append(detections)
+
+        detections = np.concatenate(arrays) if arrays else empty_detections()
+        boxes = np.stack(
+            [
+                detections["x"],
+                detections["y"],
+                detections["x"] + detections["width"],
+                detections["y"] + detections["height"],
+            ],
+            axis=1,
+        )
+        keep = non_max_suppression(
+            boxes,
+            detections["confidence"],
+            detections["class_id"],
+            config.get("tile_merge_threshold", 0.6),
+            config.get("max_detections", 300),
+            metric="ios",
+        )
+        detections = detections[keep]
+
+        # 整个切片推理计为一次推理
+        self.update_performance_stats(time.time() - start_time)
+        logger.info(
+            f"切片推理: {len(tiles)} 块 (切片 {tile_size}px, 重叠 {overlap:.0%}, 批大小 {batch_size}), "
+            f"合并后 {len(detections)} 个目标"
+        )
+        return detections
+
+    def _detect_batch_arrays(
+        self, images: List[np.ndarray], config: Dict[str, Any]
+    ) -> List[np.ndarray]:
+        """
+        一次前向推理检测多张图像
+
+        Args:
+            images: BGR图像列表
+            config: YOLO配置参数（已合并默认值）
+
+        Returns:
+            每张图像的 DETECTION_DTYPE 结构化数组（坐标为各自图像内的像素）
+        """
+        model_path = config.get("model_path", "")
+        confidence_threshold = config.get("confidence_threshold", 0.5)
+        nms_threshold = config.get("nms_threshold", 0.4)
+        max_detections = config.get("max_detections", 300)
+
+        backend = self.resolve_backend(config.get("backend", "pytorch"), model_path)
+        if backend in ("onnxruntime", "opencv_dnn"):
+            loader = (
+                self.load_onnxruntime_model
+                if backend == "onnxruntime"
+                else self.load_opencv_dnn_model
+            )
+            model = loader(model_path, config) if model_path.endswith(".onnx") else None
+            if model is None:
+                return [empty_detections() for _ in images]
+            self.class_names = model.names
+            return model.predict_batch(
+                images, confidence_threshold, nms_threshold, max_detections
+            )
+
+        device = self._resolve_device(model_path, config.get("device"))
+        model = self.load_model(model_path, device=device)
+        if model is None:
+            return [empty_detections() for _ in images]
+
+        # ultralytics 接受图像列表，内部组成一个批次推理
+        results = model(
+            list(images),
+            conf=confidence_threshold,
+            iou=nms_threshold,
+            max_det=max_detections,
+            verbose=False,
+            device=device,
+        )
+        self.class_names = dict(model.names)
+
+        arrays = []
+        for result in results:
+            boxes = result.boxes
+            if boxes is None or not len(boxes):
+                arrays.append(empty_detections())
+                continue
+            data = boxes.data.cpu().numpy()
+            arrays.append(make_detection_array(data[:, :4], data[:, 4], data[:, 5]))
+        return arrays
+
+    def reset_change_detection(self):
+        """清除默认缓存的参考帧和缓存结果"""
+        self.detection_cache.reset()
+
     def _detect_with_real_yolo(
         self, image: np.ndarray, config: Dict[str, Any]
-    ) -> List[Dict[str, Any]]:
+    ) -> np.ndarray:
         """
         使用真实的YOLO模型进行检测
         """
@@ -241,15 +1781,22 @@ class PureYOLOMatchingEngine:
             if not os.path.exists(model_path):
                 logger.error(f"YOLO模型文件不存在: {model_path}")
                 logger.error("请检查模型文件路径是否正确")
-                return []
+                return empty_detections()
+
+            backend = self.resolve_backend(config.get("backend", "pytorch"), model_path)
+            if backend == "onnxruntime":
+                logger.info("使用ONNX Runtime后端")
+                return self._detect_with_onnxruntime(image, config)
+            if backend == "opencv_dnn":
+                logger.info("使用OpenCV DNN后端")
+                return self._detect_with_opencv_dnn(image, config)
 
-            # 只使用PyTorch后端进行推理
             logger.info("使用PyTorch后端")
             return self._detect_with_pytorch(image, config)
 
         except Exception as e:
             logger.error(f"真实YOLO检测失败: {e}")
-            return []
+            return empty_detections()
 
 
 
@@ -257,7 +1804,7 @@ class PureYOLOMatchingEngine:
 
     def _detect_with_pytorch(
         self, image: np.ndarray, config: Dict[str, Any]
-    ) -> List[Dict[str, Any]]:
+    ) -> np.ndarray:
         """
         使用PyTorch模型检测（支持.pt和.onnx格式）
         """
@@ -269,7 +1816,7 @@ class PureYOLOMatchingEngine:
             except ImportError as e:
                 logger.error(f"PyTorch库未安装: {e}")
                 logger.error("请使用命令安装: pip install torch torchvision")
-                return []
+                return empty_detections()
 
             model_path = config.get("model_path", "")
             confidence_threshold = config.get("confidence_threshold", 0.5)
@@ -278,56 +1825,93 @@ class PureYOLOMatchingEngine:
 
             # 支持的格式：.pt 和 .onnx
             if model_path.endswith((".pt", ".onnx")):
-                return self._load_ultralytics_model(image, model_path, confidence_threshold)
+                return self._load_ultralytics_model(
+                    image, model_path, confidence_threshold, config.get("device")
+                )
             else:
                 logger.error(f"不支持的模型格式: {model_path}")
                 logger.error("支持的格式: .pt（推荐）, .onnx")
-                return []
+                return empty_detections()
 
         except Exception as e:
             logger.error(f"PyTorch检测失败: {e}")
-            return []
+            return empty_detections()
+
+    def _detect_with_onnxruntime(
+        self, image: np.ndarray, config: Dict[str, Any]
+    ) -> np.ndarray:
+        """使用ONNX Runtime直接推理（只支持.onnx格式，会话由全局注册表缓存）"""
+        return self._detect_with_onnx_model(
+            image, config, self.load_onnxruntime_model, "ONNX Runtime"
+        )
+
+    def _detect_with_opencv_dnn(
+        self, image: np.ndarray, config: Dict[str, Any]
+    ) -> np.ndarray:
+        """使用OpenCV DNN推理（只支持.onnx格式，网络由全局注册表缓存）"""
+        return self._detect_with_onnx_model(
+            image, config, self.load_opencv_dnn_model, "OpenCV DNN"
+        )
+
+    def _detect_with_onnx_model(
+        self,
+        image: np.ndarray,
+        config: Dict[str, Any],
+        loader: Callable[[str, Dict[str, Any]], Any],
+        backend_name: str,
+    ) -> np.ndarray:
+        """
+        使用自带预处理和后处理的ONNX模型推理
+
+        Args:
+            image: 输入图像
+            config: YOLO配置参数
+            loader: 模型获取函数 loader(model_path, config) -> model
+            backend_name: 后端名称（日志显示用）
+        """
+        try:
+            model_path = config.get("model_path", "")
+            if not model_path.endswith(".onnx"):
+                logger.error(f"{backend_name}后端只支持.onnx模型: {model_path}")
+                return empty_detections()
+
+            model = loader(model_path, config)
+            if model is None:
+                return empty_detections()
+
+            start_time = time.time()
+            detections = model(
+                image,
+                config.get("confidence_threshold", 0.5),
+                config.get("nms_threshold", 0.4),
+                config.get("max_detections", 300),
+            )
+            self.update_performance_stats(time.time() - start_time)
+
+            stats = self.get_performance_stats()
+            logger.info(f"{backend_name} YOLO检测到 {len(detections)} 个目标")
+            logger.info(f"推理性能 - FPS: {stats['fps']:.1f}, 延迟: {stats['latency_ms']:.1f}ms")
+            self.class_names = model.names
+            return detections
+
+        except Exception as e:
+            logger.error(f"{backend_name}推理失败: {e}")
+            return empty_detections()
 
     def _load_ultralytics_model(
-        self, image: np.ndarray, model_path: str, confidence_threshold: float
-    ) -> List[Dict[str, Any]]:
-        """使用ultralytics加载YOLO模型（支持.pt和.onnx格式）"""
+        self,
+        image: np.ndarray,
+        model_path: str,
+        confidence_threshold: float,
+        device: str = None,
+    ) -> np.ndarray:
+        """使用ultralytics YOLO模型推理（支持.pt和.onnx格式，模型由全局注册表缓存）"""
         try:
-            from ultralytics import YOLO
-            import torch
+            device = self._resolve_device(model_path, device)
+            model = self.load_model(model_path, device=device)
+            if model is None:
+                return empty_detections()
 
-            model = YOLO(model_path)
-            
-            # 智能设备选择
-            device = self.device
-            
-            # 检查CUDA可用性
-            if device.startswith('cuda') and not torch.cuda.is_available():
-                logger.warning(f"CUDA设备 {device} 不可用，回退到CPU")
-                device = 'cpu'
-            
-            # 根据模型格式设置设备
-            if model_path.endswith('.onnx'):
-                # ONNX模型需要检查ONNX Runtime的CUDA支持
-                try:
-                    import onnxruntime as ort
-                    providers = ort.get_available_providers()
-                    if device.startswith('cuda') and 'CUDAExecutionProvider' in providers:
-                        logger.info(f"ONNX模型将使用CUDA设备: {device}")
-                        logger.info(f"ONNX Runtime providers: {providers}")
-                    elif device.startswith('cuda'):
-                        logger.warning("ONNX Runtime不支持CUDA，使用CPU")
-                        device = 'cpu'
-                    else:
-                        logger.info(f"ONNX模型使用CPU设备")
-                except ImportError:
-                    logger.warning("未找到onnxruntime，ONNX推理可能失败")
-            else:
-                # .pt模型可以使用model.to()移动到设备
-                if device != "cpu":
-                    model.to(device)
-                    logger.info(f"PyTorch模型已移动到设备: {device}")
-            
             # 执行推理并记录时间
             logger.info(f"开始推理，使用设备: {device}")
             start_time = time.time()
@@ -337,26 +1921,15 @@ class PureYOLOMatchingEngine:
             # 更新性能统计
             self.update_performance_stats(inference_time)
 
-            detections = []
+            arrays = []
             for result in results:
                 boxes = result.boxes
-                if boxes is not None:
-                    for box in boxes:
-                        x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
-                        conf = box.conf[0].cpu().numpy()
-                        cls = int(box.cls[0].cpu().numpy())
-
-                        detections.append(
-                            {
-                                "x": int(x1),
-                                "y": int(y1),
-                                "width": int(x2 - x1),
-                                "height": int(y2 - y1),
-                                "confidence": float(conf),
-                                "class_id": cls,
-                                "class_name": model.names.get(cls, f"class_{cls}"),
-                            }
-                        )
+                if boxes is not None and len(boxes):
+                    # 整个结果一次拷贝到主机内存：(N, 6) x1, y1, x2, y2, conf, cls
+                    data = boxes.data.cpu().numpy()
+                    arrays.append(make_detection_array(data[:, :4], data[:, 4], data[:, 5]))
+            detections = np.concatenate(arrays) if arrays else empty_detections()
+            self.class_names = dict(model.names)
 
             # 记录性能信息
             stats = self.get_performance_stats()
@@ -364,14 +1937,10 @@ class PureYOLOMatchingEngine:
             logger.info(f"推理性能 - FPS: {stats['fps']:.1f}, 延迟: {stats['latency_ms']:.1f}ms")
             return detections
 
-        except ImportError:
-            logger.error("未安装ultralytics库")
-            logger.error("请使用命令安装: pip install ultralytics")
-            return []
         except Exception as e:
-            logger.error(f"ultralytics模型加载失败: {e}")
+            logger.error(f"ultralytics模型推理失败: {e}")
             logger.error("建议：如果使用ONNX模型遇到问题，请尝试使用.pt格式的模型")
-            return []
+            return empty_detections()
 
     def _detect_with_simulated_yolo(
         self, image: np.ndarray, config: Dict[str, Any]
@@ -468,12 +2037,14 @@ class PureYOLOMatchingEngine:
 
             logger.info("开始纯YOLO匹配")
 
-            # 对目标图像进行YOLO检测
-            detections = self.detect_objects_yolo(target_image, config)
+            # 单次匹配总是重新检测（帧变化检测只用于实时检测）
+            detection_array = self.detect_objects_array(target_image, yolo_config)
+
+            if len(detection_array):
+                detections = detections_to_dicts(detection_array, self.class_names)
 
-            if detections:
                 # 找到置信度最高的检测结果
-                best_detection = max(detections, key=lambda x: x.get("confidence", 0))
+                best_detection = detections[int(detection_array["confidence"].argmax())]
 
                 # 获取性能统计
                 stats = self.get_performance_stats()
@@ -491,6 +2062,8 @@ class PureYOLOMatchingEngine:
                     "match_time": time.time(),
                     "detection_count": len(detections),
                     "all_detections": detections,  # 包含所有检测结果
+                    "detection_array": detection_array,  # 同一批检测结果的结构化数组
+                    "class_names": self.class_names,
                     "performance": stats,  # 添加性能数据
                 }
 
@@ -614,3 +2187,8 @@ def match_pure_yolo(template_image, target_image, **kwargs):
 def detect_yolo_objects(image, **kwargs):
     """便捷函数：YOLO目标检测"""
     return pure_yolo_matcher.detect_objects_yolo(image, kwargs)
+
+
+def detect_yolo_objects_batch(images, **kwargs):
+    """便捷函数：多区域YOLO批量检测"""
+    return pure_yolo_matcher.detect_batch(images, kwargs)
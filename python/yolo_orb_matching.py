@@ -6,10 +6,13 @@ YOLO+ORB混合匹配模块
 
 import cv2
 import numpy as np
+import os
 import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Optional, Tuple, List, Dict, Any, Union
 import logging
-from .feature_matching import orb_matcher
+from .feature_matching import orb_matcher, keypoints_to_array
 
 # 配置日志
 logger = logging.getLogger(__name__)
@@ -28,7 +31,7 @@ class YOLOORBMatchingEngine:
             "nms_threshold": 0.4,  # NMS阈值
             "input_size": (416, 416),  # 输入尺寸
             "model_path": "",  # YOLO模型路径
-            "device": "cpu",  # 设备选择: cpu, cuda
+            "device": "",  # 设备选择: cpu, cuda:0 等，为空时使用 set_device 设置的设备
         }
 
         # 默认ORB配置（复用feature_matching的配置）
@@ -53,6 +56,10 @@ class YOLOORBMatchingEngine:
             "orb_fallback": True,  # YOLO失败时是否回退到纯ORB匹配
             "multi_scale_matching": True,  # 多尺度匹配
             "scale_factors": [0.8, 1.0, 1.2],  # 尺度因子
+            "shared_frame_features": True,  # 整帧只提取一次特征，再按ROI划分
+            "max_frame_features": 5000,  # 整帧特征点数量上限
+            "parallel_rois": True,  # 并行评估各ROI
+            "early_exit_confidence": 0.8,  # 任一ROI达到该置信度即提前结束（None表示不提前结束）
         }
 
         # YOLO网络（如果可用）
@@ -63,6 +70,10 @@ class YOLOORBMatchingEngine:
         # 设备设置
         self.device = "cpu"  # 默认使用CPU
 
+        # ROI并行匹配线程池（延迟创建）
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
         # 初始化YOLO（如果模型可用）
         self._init_yolo()
 
@@ -108,17 +119,17 @@ class YOLOORBMatchingEngine:
             # 尝试加载模型获取类别信息
             if model_path.endswith('.pt'):
                 try:
-                    # 尝试使用ultralytics加载
-                    from ultralytics import YOLO
-                    model = YOLO(model_path)
-                    if hasattr(model, 'names') and model.names:
+                    # 从纯YOLO模块的共享注册表获取模型，避免重复加载
+                    from .yolo_matching_pure import pure_yolo_matcher
+
+                    # 设备显式传入，不修改纯YOLO引擎的设备设置
+                    model = pure_yolo_matcher.load_model(model_path, device=self.device)
+                    if model is not None and getattr(model, "names", None):
                         return {
                             "classes": model.names,
                             "num_classes": len(model.names),
                             "model_type": "ultralytics_yolo_orb"
                         }
-                except ImportError:
-                    logger.warning("ultralytics库不可用，无法获取详细模型信息")
                 except Exception as e:
                     logger.warning(f"加载PT模型信息失败: {e}")
 
@@ -195,12 +206,11 @@ class YOLOORBMatchingEngine:
 
             logger.info("开始YOLO目标检测（使用纯YOLO模块）")
 
-            # 导入并使用纯YOLO模块
+            # 导入并使用纯YOLO模块（设备随配置传入，不修改纯YOLO引擎的设备设置）
             from .yolo_matching_pure import pure_yolo_matcher
-            
-            # 设置设备
-            pure_yolo_matcher.set_device(self.device)
-            
+
+            yolo_config["device"] = yolo_config.get("device") or self.device
+
             # 执行检测
             detections = pure_yolo_matcher.detect_objects_yolo(image, yolo_config)
 
@@ -242,7 +252,13 @@ class YOLOORBMatchingEngine:
             if hybrid_config.get("use_yolo_preprocessing", True):
                 yolo_detections = self.detect_objects_yolo(target_image, config)
 
-                if yolo_detections:
+                if yolo_detections and hybrid_config.get("shared_frame_features", True):
+                    # 整帧提取一次特征，在各YOLO检测区域内匹配缓存的模板描述子
+                    best_result = self._match_detections(
+                        template_image, target_image, yolo_detections, hybrid_config
+                    )
+
+                elif yolo_detections:
                     # 在YOLO检测区域内进行ORB匹配
                     best_result = None
                     best_confidence = 0
@@ -259,9 +275,9 @@ class YOLOORBMatchingEngine:
                             best_result = roi_result
                             best_confidence = roi_result["confidence"]
 
-                    if best_result:
-                        logger.info("YOLO+ORB匹配成功")
-                        return best_result
+                if yolo_detections and best_result:
+                    logger.info("YOLO+ORB匹配成功")
+                    return best_result
 
             # 第二阶段：回退到纯ORB匹配
             if hybrid_config.get("orb_fallback", True):
@@ -284,6 +300,194 @@ class YOLOORBMatchingEngine:
             logger.error(f"YOLO+ORB混合匹配异常: {e}")
             return None
 
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """获取ROI匹配线程池"""
+        with self._executor_lock:
+            if self._executor is None:
+                max_workers = min(8, os.cpu_count() or 4)
+                self._executor = ThreadPoolExecutor(
+                    max_workers=max_workers, thread_name_prefix="yolo_orb_roi"
+                )
+            return self._executor
+
+    @staticmethod
+    def _detection_rois(
+        detections: List[Dict[str, Any]], image_shape: Tuple[int, ...], expansion: float
+    ) -> np.ndarray:
+        """
+        计算扩展后的检测区域
+
+        Args:
+            detections: YOLO检测结果
+            image_shape: 目标图像形状
+            expansion: 扩展比例
+
+        Returns:
+            (R, 4) 的 [x0, y0, x1, y1] 数组，已裁剪到图像范围内
+        """
+        boxes = np.array(
+            [[d["x"], d["y"], d["width"], d["height"]] for d in detections],
+            dtype=np.int64,
+        ).reshape(-1, 4)
+        expand = (boxes[:, 2:] * expansion).astype(np.int64)
+
+        rois = np.empty_like(boxes)
+        rois[:, :2] = boxes[:, :2] - expand
+        rois[:, 2:] = boxes[:, :2] + boxes[:, 2:] + expand
+        rois[:, [0, 2]] = np.clip(rois[:, [0, 2]], 0, image_shape[1])
+        rois[:, [1, 3]] = np.clip(rois[:, [1, 3]], 0, image_shape[0])
+        return rois
+
+    def _match_detections(
+        self,
+        template_image: np.ndarray,
+        target_image: np.ndarray,
+        detections: List[Dict[str, Any]],
+        config: Dict[str, Any],
+    ) -> Optional[Dict[str, Any]]:
+        """
+        在所有YOLO检测区域内匹配模板
+        整帧（只在检测区域内）提取一次ORB特征，按ROI用向量化掩码划分关键点和描述子，
+        每个ROI与缓存的模板描述子匹配；各ROI并行评估，达到高置信度时提前结束
+
+        Args:
+            template_image: 模板图像
+            target_image: 目标图像
+            detections: YOLO检测结果
+            config: 混合匹配配置
+
+        Returns:
+            置信度最高的匹配结果
+        """
+        try:
+            match_config = orb_matcher.default_orb_config.copy()
+            match_config.update(orb_matcher.default_match_config)
+            match_config.update(self.default_orb_config)
+            match_config.update(config)
+            orb_config = orb_matcher._extract_orb_config(match_config)
+
+            # 模板特征走缓存
+            kp1, des1 = orb_matcher.get_template_features(template_image, orb_config)
+            if des1 is None or len(des1) < 4:
+                logger.warning("模板描述子不足")
+                return None
+            template_points = keypoints_to_array(kp1)
+
+            rois = self._detection_rois(
+                detections, target_image.shape, config.get("yolo_roi_expansion", 0.1)
+            )
+
+            # 只在检测区域内检测特征；特征点总数按ROI数量放大，保持每个ROI的特征密度
+            mask = np.zeros(target_image.shape[:2], dtype=np.uint8)
+            for x0, y0, x1, y1 in rois:
+                mask[y0:y1, x0:x1] = 255
+
+            frame_config = orb_config.copy()
+            frame_config["nfeatures"] = int(
+                min(
+                    orb_config["nfeatures"] * len(rois),
+                    max(orb_config["nfeatures"], config.get("max_frame_features", 5000)),
+                )
+            )
+            kp2, des2 = orb_matcher.detect_and_compute(target_image, frame_config, mask)
+            if des2 is None or len(des2) < 4:
+                logger.warning("检测区域内描述子不足")
+                return None
+            frame_points = keypoints_to_array(kp2)
+
+            # (R, N) 关键点归属矩阵
+            inside = (
+                (frame_points[None, :, 0] >= rois[:, 0, None])
+                & (frame_points[None, :, 0] < rois[:, 2, None])
+                & (frame_points[None, :, 1] >= rois[:, 1, None])
+                & (frame_points[None, :, 1] < rois[:, 3, None])
+            )
+
+            min_matches = match_config.get("min_matches", 10)
+
+            def evaluate(roi_index: int) -> Optional[Dict[str, Any]]:
+                frame_idx = np.flatnonzero(inside[roi_index]).astype(np.int32)
+                if len(frame_idx) < 4:
+                    return None
+
+                query_idx, train_idx, distances = orb_matcher._match_descriptor_arrays(
+                    des1, des2[frame_idx], match_config
+                )
+                if len(distances) < min_matches:
+                    return None
+
+                result = orb_matcher._analyze_match_arrays(
+                    template_points,
+                    frame_points,
+                    query_idx,
+                    frame_idx[train_idx],
+                    distances,
+                    template_image.shape[:2],
+                    target_image.shape[:2],
+                    match_config,
+                )
+
+                detection = detections[roi_index]
+                result["x"] = int(detection["x"])
+                result["y"] = int(detection["y"])
+                result["width"] = int(detection["width"])
+                result["height"] = int(detection["height"])
+                result["yolo_confidence"] = detection["confidence"]
+                result["method"] = "YOLO+ORB"
+                return result
+
+            # 按YOLO置信度从高到低评估，更可能先命中高置信度匹配
+            order = sorted(
+                range(len(detections)),
+                key=lambda i: detections[i].get("confidence", 0),
+                reverse=True,
+            )
+            early_exit = config.get("early_exit_confidence", 0.8)
+            best_result = None
+
+            def is_better(result):
+                return result is not None and (
+                    best_result is None
+                    or result["confidence"] > best_result["confidence"]
+                )
+
+            if config.get("parallel_rois", True) and len(order) > 1:
+                futures = [self._get_executor().submit(evaluate, i) for i in order]
+                try:
+                    for future in as_completed(futures):
+                        result = future.result()
+                        if is_better(result):
+                            best_result = result
+                        if (
+                            early_exit is not None
+                            and best_result
+                            and best_result["confidence"] >= early_exit
+                        ):
+                            logger.info("ROI达到高置信度阈值，提前结束")
+                            break
+                finally:
+                    # 取消尚未开始的ROI评估
+                    for future in futures:
+                        future.cancel()
+            else:
+                for i in order:
+                    result = evaluate(i)
+                    if is_better(result):
+                        best_result = result
+                    if (
+                        early_exit is not None
+                        and best_result
+                        and best_result["confidence"] >= early_exit
+                    ):
+                        logger.info("ROI达到高置信度阈值，提前结束")
+                        break
+
+            return best_result
+
+        except Exception as e:
+            logger.error(f"YOLO检测区域ORB匹配失败: {e}")
+            return None
+
     def _match_in_roi(
         self,
         template_image: np.ndarray,
@@ -199,8 +199,9 @@ ApplicationWindow {
             font.bold: true
             Layout.topMargin: 5
 
-            // 只有在屏幕窗口模式且为纯YOLO算法时才启用
-            enabled: controller.currentMode === 1 && controller.algorithmMode === 3 && controller.selectedWindow
+            // 只有在屏幕窗口模式时才启用（除纯YOLO外需要模板图片）
+            enabled: controller.currentMode === 1 && controller.selectedWindow
+                     && (controller.algorithmMode === 3 || controller.image1Path !== "")
 
             onClicked: {
                 if (controller.realtimeDetectionActive) {
@@ -237,7 +238,7 @@ ApplicationWindow {
         RowLayout {
             Layout.fillWidth: true
             Layout.topMargin: 5
-            visible: controller.currentMode === 1 && controller.algorithmMode === 3
+            visible: controller.currentMode === 1
 
             Label {
                 text: "检测间隔:"
@@ -1007,8 +1008,11 @@ ApplicationWindow {
                             ComboBox {
                                 id: pureYoloBackendCombo
                                 Layout.fillWidth: true
-                                model: ["PyTorch"]
+                                model: ["PyTorch", "ONNX Runtime", "OpenCV DNN", "自动"]
                                 currentIndex: 0
+
+                                // 与下拉项一一对应的后端名称（传给纯YOLO引擎的backend参数）
+                                property var backendIds: ["pytorch", "onnxruntime", "opencv_dnn", "auto"]
                                 
                                 onCurrentIndexChanged: {
                                     // 更新后端提示信息
@@ -1193,7 +1197,13 @@ ApplicationWindow {
         
         // 更新纯YOLO后端信息
         if (typeof pureYoloBackendCombo !== "undefined" && pureYoloBackendInfo) {
-            pureYoloBackendInfo.text = backendText;
+            var pureYoloBackendTexts = {
+                "pytorch": backendText,
+                "onnxruntime": "ONNX Runtime：仅支持.onnx模型，不依赖PyTorch，CPU推理延迟更低",
+                "opencv_dnn": "OpenCV DNN：仅支持.onnx模型，只依赖OpenCV，无需安装PyTorch或ONNX Runtime",
+                "auto": "自动：优先PyTorch，未安装时.onnx模型依次使用ONNX Runtime、OpenCV DNN"
+            };
+            pureYoloBackendInfo.text = pureYoloBackendTexts[pureYoloBackendCombo.backendIds[pureYoloBackendCombo.currentIndex]];
         }
     }
 
@@ -1238,6 +1248,7 @@ ApplicationWindow {
                 confidence_threshold: pureYoloConfidenceSlider.value,
                 nms_threshold: pureYoloNmsSlider.value,
                 model_path: pureYoloModelPathText.fullPath || "",
+                backend: pureYoloBackendCombo.backendIds[pureYoloBackendCombo.currentIndex],
                 device: currentDevice
             };
             break;
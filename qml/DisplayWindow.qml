@@ -50,6 +50,8 @@ ApplicationWindow {
     property real currentFPS: 0.0
     property real currentLatency: 0.0
     property string deviceInfo: "CPU"
+    property int droppedTicks: 0
+    property int queueDepth: 0
 
     StackLayout {
         id: displayStack
@@ -295,10 +297,10 @@ ApplicationWindow {
                             Image {
                                 id: screenAreaImage
                                 anchors.fill: parent
-                                source: controller.screenAreaImagePath ? "file:///" + controller.screenAreaImagePath : ""
+                                source: controller.screenAreaImageUrl
                                 fillMode: Image.PreserveAspectFit  // 保持宽高比并适应容器
-                                visible: controller.screenAreaImagePath !== ""
-                                cache: false  // 禁用缓存以确保实时更新
+                                visible: controller.screenAreaImageUrl !== ""
+                                cache: false  // 每个版本只显示一次，不需要缓存
                                 smooth: true  // 启用平滑缩放
                                 
                                 // 添加背景以便看清图片边界
@@ -328,8 +330,12 @@ ApplicationWindow {
                                     
                                     onClicked: function(mouse) {
                                         if (mouse.button === Qt.RightButton) {
-                                            if (controller.screenAreaImagePath) {
-                                                Qt.openUrlExternally("file:///" + controller.screenAreaImagePath);
+                                            if (controller.screenAreaImageUrl) {
+                                                // 实时画面只在内存中，打开前先保存一份快照
+                                                var snapshotPath = controller.saveScreenAreaSnapshot();
+                                                if (snapshotPath) {
+                                                    Qt.openUrlExternally("file:///" + snapshotPath);
+                                                }
                                             }
                                         }
                                     }
@@ -570,7 +576,7 @@ ApplicationWindow {
         clearDetectionResults();
         
         // 在显示窗口内显示单个匹配结果
-        if (controller.screenAreaImagePath && detectionResultsModel) {
+        if (controller.screenAreaImageUrl && detectionResultsModel) {
             // 获取原始图像尺寸（从控制器）
             let originalWidth = controller.selectedWindowRect ? controller.selectedWindowRect.width : 1920;
             let originalHeight = controller.selectedWindowRect ? controller.selectedWindowRect.height : 1080;
@@ -603,7 +609,7 @@ ApplicationWindow {
                 addLog(`显示 ${detections.length} 个检测结果`, "success");
             }
 
-            if (controller.screenAreaImagePath && detectionResultsModel) {
+            if (controller.screenAreaImageUrl && detectionResultsModel) {
                 // 获取原始图像尺寸
                 let originalWidth = controller.selectedWindowRect ? controller.selectedWindowRect.width : 1920;
                 let originalHeight = controller.selectedWindowRect ? controller.selectedWindowRect.height : 1080;
@@ -691,17 +697,16 @@ ApplicationWindow {
             clearAllDetections();
         }
 
-        function onScreenAreaImageChanged(imagePath) {
-            // 强制刷新图像显示
+        function onScreenAreaImageChanged(imageUrl) {
+            // 地址带版本号，直接替换即可触发重新请求
             if (screenAreaImage) {
-                screenAreaImage.source = "";
-                screenAreaImage.source = imagePath ? "file:///" + imagePath : "";
+                screenAreaImage.source = imageUrl;
             }
         }
 
-        function onPerformanceInfoUpdated(fps, latency, device) {
+        function onPerformanceInfoUpdated(fps, latency, device, statsJson) {
             console.log("QML接收到性能信息:", fps, latency, device);
-            updatePerformanceInfo(fps, latency, device);
+            updatePerformanceInfo(fps, latency, device, statsJson);
         }
     }
 
@@ -725,7 +730,7 @@ ApplicationWindow {
             Text {
                 text: {
                     if (!controller.selectedWindow) return "未选择区域"
-                    if (!controller.screenAreaImagePath) return `已选择: ${controller.selectedWindow}`
+                    if (!controller.screenAreaImageUrl) return `已选择: ${controller.selectedWindow}`
                     
                     // 直接使用selectedWindow，避免重复显示尺寸信息
                     return `实时显示: ${controller.selectedWindow}`
@@ -768,16 +773,35 @@ ApplicationWindow {
                     font.pixelSize: 11
                     font.bold: true
                 }
+
+                // 实时调度：丢弃的触发次数和排队深度
+                Text {
+                    visible: controller.realtimeDetectionActive
+                    text: `丢帧: ${droppedTicks}  队列: ${queueDepth}`
+                    color: droppedTicks > 0 ? "#FFC107" : "#4CAF50"
+                    font.pixelSize: 11
+                    font.bold: true
+                }
             }
         }
     }
 
     // 更新状态栏信息的函数
-    function updatePerformanceInfo(fps, latency, device) {
+    function updatePerformanceInfo(fps, latency, device, statsJson) {
         console.log("更新性能信息:", fps, latency, device);
         currentFPS = fps || 0.0;
         currentLatency = latency || 0.0;
         deviceInfo = device || "CPU";
+
+        // 实时调度统计（单次匹配时没有这些字段）
+        try {
+            var stats = statsJson ? JSON.parse(statsJson) : {};
+            droppedTicks = stats.dropped_ticks || 0;
+            queueDepth = stats.queue_depth || 0;
+        } catch (e) {
+            droppedTicks = 0;
+            queueDepth = 0;
+        }
         console.log("更新后的值:", currentFPS, currentLatency, deviceInfo);
     }
 }